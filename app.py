@@ -1,4 +1,18 @@
-import React, { useState, useEffect, useRef } from 'react';
+import React, { useState, useEffect, useRef, useMemo, useCallback, useReducer } from 'react';
+import { isDateAvailable, normalizeStaffAvailability, toggleDateAvailability } from './lib/availability.mjs';
+import { getMonthModel } from './lib/monthModel.mjs';
+import { createWriteBehindStore } from './lib/persistence.mjs';
+import { parseSeed } from './lib/random.mjs';
+import { canRedoSchedule, canUndoSchedule, createScheduleHistory, keepUnchangedDays, removeDatesPatch, scheduleHistoryReducer } from './lib/scheduleHistory.mjs';
+import { createShiftMonthStore, monthKeyOf, monthKeysAround, monthKeysBetween } from './lib/shiftStorage.mjs';
+import { openStorageBackend } from './lib/storageBackend.mjs';
+import { buildDateStaffIndex, findAffectedDates, getPeriodDayRange, parseDateKey } from './lib/shiftScheduler.mjs';
+import { countScheduleExportRows, downloadBlob, rowsToCsvBlob, rowsToXlsxBlob, scheduleExportRows } from './lib/exportEngine.mjs';
+import { SCHEDULE_FILE_EXTENSION } from './lib/scheduleGrid.mjs';
+import { encodeAppDataFile, isInvalidAppDataFile } from './lib/appDataFile.mjs';
+import { loadAppDataFile } from './lib/appDataFileClient.mjs';
+import { createShiftWorkerClient, isShiftGenerationCancelled } from './lib/shiftWorkerClient.mjs';
+import { importStaffRoster, mergeStaffNames } from './lib/staffImport.mjs';
 
 // ToastMessage Component: Displays a temporary message at the bottom of the screen
 const ToastMessage = ({ message, show, type = 'info' }) => {
@@ -44,14 +58,128 @@ const ConfirmationModal = ({ isOpen, message, onConfirm, onCancel }) => {
   );
 };
 
+// ShiftTableRow Component: One day of the generated shift table.
+// Memoized: a row re-renders only when its day's shifts, the staff list, its pin or its edit state change.
+const EMPTY_SHIFTS_BY_STAFF = new Map();
+
+const ShiftTableRow = React.memo(({ dateKey, label, isClosed, staff, shifts, shiftsByStaff, isPinned, editing, onEdit, onUnpin }) => (
+  <tr className="border-t border-teal-200 hover:bg-teal-50 transition duration-150">
+    <td className="py-2 px-2 whitespace-nowrap text-base font-medium text-gray-900">
+      {label}
+      {isPinned && (
+        <span className="ml-1 text-xs text-teal-600" title="手動編集済み（自動再計算の対象外）">📌</span>
+      )}
+    </td>
+    {staff.map((s) => {
+      if (isClosed) {
+        return (
+          <td key={s.id} className="py-2 px-2 text-center text-gray-500">
+            定休日
+          </td>
+        );
+      }
+      if (editing) {
+        const staffShifts = editing.shifts.filter(shift => shift.staff === s.name);
+        return (
+          <td key={s.id} className="py-2 px-2 text-center">
+            {staffShifts.length > 0 ? (
+              staffShifts.map((shift, idx) => (
+                <div key={idx} className="mb-1 flex flex-col items-center">
+                  <select
+                    value={shift.staff}
+                    onChange={(e) => editing.onChange(editing.shifts.indexOf(shift), 'staff', e.target.value)}
+                    className="p-1 border rounded-md text-sm w-full mb-1"
+                  >
+                    <option value="未割り当て">未割り当て</option>
+                    {staff.map(allStaff => (
+                      <option key={allStaff.id} value={allStaff.name}>
+                        {allStaff.name}
+                      </option>
+                    ))}
+                  </select>
+                  <div className="flex space-x-1 w-full">
+                    <input
+                      type="time"
+                      value={shift.startTime || ''}
+                      onChange={(e) => editing.onChange(editing.shifts.indexOf(shift), 'startTime', e.target.value)}
+                      className="p-1 border rounded-md text-sm w-1/2"
+                    />
+                    <span className="flex items-center">-</span>
+                    <input
+                      type="time"
+                      value={shift.endTime || ''}
+                      onChange={(e) => editing.onChange(editing.shifts.indexOf(shift), 'endTime', e.target.value)}
+                      className="p-1 border rounded-md text-sm w-1/2"
+                    />
+                  </div>
+                </div>
+              ))
+            ) : (
+              <select
+                value="未割り当て"
+                onChange={(e) => {}}
+                className="p-1 border rounded-md text-sm w-full"
+                disabled
+              >
+                <option value="未割り当て">—</option>
+              </select>
+            )}
+          </td>
+        );
+      }
+
+      const displayTimes = (shiftsByStaff.get(s.id) || []).map(shift => {
+        return `(${shift.startTime} - ${shift.endTime})`;
+      }).join(', ');
+      return (
+        <td key={s.id} className="py-2 px-2 text-center text-base text-gray-700">
+          {displayTimes || '—'}
+        </td>
+      );
+    })}
+    <td className="py-2 px-2 whitespace-nowrap text-center">
+      {editing ? (
+        <div className="flex flex-col space-y-2">
+          <button
+            onClick={editing.onSave}
+            className="bg-green-500 hover:bg-green-600 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
+          >
+            保存
+          </button>
+          <button
+            onClick={editing.onCancel}
+            className="bg-gray-400 hover:bg-gray-500 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
+          >
+            キャンセル
+          </button>
+        </div>
+      ) : (
+        <div className="flex flex-col space-y-2">
+          <button
+            onClick={() => onEdit(dateKey, shifts)}
+            className="bg-blue-500 hover:bg-blue-600 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
+          >
+            編集
+          </button>
+          {isPinned && (
+            <button
+              onClick={() => onUnpin(dateKey)}
+              className="bg-gray-400 hover:bg-gray-500 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
+            >
+              固定解除
+            </button>
+          )}
+        </div>
+      )}
+    </td>
+  </tr>
+));
+
 
 // Main Application Component
 const App = () => {
-  // State to manage the list of staff
-  const [staff, setStaff] = useState(() => {
-    const savedStaff = localStorage.getItem('staff');
-    return savedStaff ? JSON.parse(savedStaff) : [];
-  });
+  // State to manage the list of staff (filled once the storage backend has been read)
+  const [staff, setStaff] = useState([]);
   // State for new staff name input
   const [newStaffName, setNewStaffName] = useState('');
   // State for new staff type input (initial value 'fixed')
@@ -60,12 +188,15 @@ const App = () => {
   const [newStaffCanWorkLateShift, setNewStaffCanWorkLateShift] = useState(true);
   // State for new staff comments
   const [newStaffComments, setNewStaffComments] = useState('');
-
-  // State to manage the generated shift
-  const [generatedShift, setGeneratedShift] = useState(() => {
-    const savedShift = localStorage.getItem('generatedShift');
-    return savedShift ? JSON.parse(savedShift) : {};
-  });
+  // Hidden file input and busy flag for the CSV/TSV staff import
+  const staffImportInputRef = useRef(null);
+  const [isImportingStaff, setIsImportingStaff] = useState(false);
+
+  // State to manage the generated shift (only the loaded months; the visible month and its neighbours
+  // are loaded at startup, others when the calendar moves to them), with undo/redo of edits. The pinned
+  // dates and month seeds are part of the same history, so an undo restores them with the days.
+  const [scheduleHistory, dispatchSchedule] = useReducer(scheduleHistoryReducer, undefined, () => createScheduleHistory());
+  const generatedShift = scheduleHistory.schedule;
   // List of days of the week (for Japanese display)
   const daysOfWeekJapanese = ['日', '月', '火', '水', '木', '金', '土'];
   // List of days of the week (corresponds to Date.getDay() result)
@@ -82,12 +213,19 @@ const App = () => {
 
   // Shift generation period selection (full_month, first_half, second_half)
   const [shiftPeriod, setShiftPeriod] = useState('full_month');
+  // Shift generation method (optimal: whole-period solver, greedy: fast day-by-day fill)
+  const [shiftSolverMode, setShiftSolverMode] = useState('optimal');
+  // Whether availability changes re-solve the affected days of the generated shift
+  const [incrementalResolve, setIncrementalResolve] = useState(true);
+  // Dates edited by hand; incremental re-solves never touch them
+  const pinnedShiftDates = scheduleHistory.pinnedDates;
+  // Seed used for each generated month ({ 'YYYY-MM': seed }), so a schedule can be reproduced exactly
+  const shiftSeeds = scheduleHistory.seeds;
+  // Seed typed by the user for the next generation (empty: pick a new one)
+  const [shiftSeedInput, setShiftSeedInput] = useState('');
 
   // State to store previously used staff names
-  const [previousStaffNames, setPreviousStaffNames] = useState(() => {
-    const savedNames = localStorage.getItem('previousStaffNames');
-    return savedNames ? JSON.parse(savedNames) : [];
-  });
+  const [previousStaffNames, setPreviousStaffNames] = useState([]);
 
   // Staff edit modal state
   const [isStaffEditModalOpen, setIsStaffEditModalOpen] = useState(false);
@@ -110,41 +248,148 @@ const App = () => {
   // Reference to the hidden file input element for file loading
   const fileInputRef = useRef(null);
 
+  // Export date range ('YYYY-MM-DD'; empty means the displayed month and period) and export progress
+  const [exportStartDate, setExportStartDate] = useState('');
+  const [exportEndDate, setExportEndDate] = useState('');
+  const [exportProgress, setExportProgress] = useState(null);
+  // Progress of loading a save file ({ phase: 'read', done, total } in bytes, then { phase: 'parse' })
+  const [fileLoadProgress, setFileLoadProgress] = useState(null);
+
+  // Shift worker client (created on first generation) and progress of the running generation
+  const shiftWorkerRef = useRef(null);
+  const [generationProgress, setGenerationProgress] = useState(null);
+  // Separate worker client for re-solves after staff changes, so they neither cancel nor wait for a
+  // generation, and the dates still waiting to be re-solved (a newer change cancels the running re-solve)
+  const resolveWorkerRef = useRef(null);
+  const pendingResolveDatesRef = useRef(new Set());
+  // Latest schedule and pins, read when a re-solve finishes to leave out days that changed while it ran
+  const latestShiftRef = useRef(generatedShift);
+  latestShiftRef.current = generatedShift;
+  const latestPinnedDatesRef = useRef(pinnedShiftDates);
+  latestPinnedDatesRef.current = pinnedShiftDates;
+
+  // Stop the shift workers when the app unmounts
+  useEffect(() => {
+    return () => {
+      shiftWorkerRef.current?.dispose();
+      resolveWorkerRef.current?.dispose();
+    };
+  }, []);
+
+
+  // Persistence: the storage backend (IndexedDB, or localStorage as a fallback) is opened
+  // asynchronously at startup. State changes are batched by a write-behind store and written once they
+  // settle (during idle time, or immediately when the page is hidden), one partition per changed value.
+  // Generated shifts are stored per month through the shift month store.
+  const persistenceRef = useRef(null);
+  const shiftStoreRef = useRef(null);
+  // Nothing is persisted until the stored data has been loaded into state
+  const [isDataLoaded, setIsDataLoaded] = useState(false);
 
-  // useEffect for data persistence (local storage)
+  // Load stored data on app startup
   useEffect(() => {
-    localStorage.setItem('staff', JSON.stringify(staff));
-  }, [staff]);
+    let cancelled = false;
+    let detachPageLifecycle = () => {};
+
+    const loadStoredData = async () => {
+      const backend = await openStorageBackend();
+      // Flush timings are available from persistence.getStats()
+      const persistence = createWriteBehindStore({
+        backend,
+        onFlush: ({ entries, error }) => {
+          if (!error) shiftStoreRef.current?.confirmWrites(entries);
+        },
+      });
+      const shiftStore = await createShiftMonthStore({
+        backend,
+        write: (key, value) => (value === undefined ? persistence.remove(key) : persistence.set(key, value)),
+      });
+      const [savedStaff, savedNames, savedPinnedDates, savedSeeds] = await Promise.all([
+        backend.read('staff'),
+        backend.read('previousStaffNames'),
+        backend.read('pinnedShiftDates'),
+        backend.read('shiftSeeds'),
+      ]);
+      if (cancelled) return;
+
+      // Older versions stored flexible availability as an array of dates; convert it to month bitmasks
+      const loadedStaff = (savedStaff || []).map(normalizeStaffAvailability);
+      const loadedNames = savedNames || [];
+      const loadedPinnedDates = savedPinnedDates || [];
+      const loadedSeeds = savedSeeds || {};
+      // Values just read from storage do not need to be written back
+      persistence.seed({
+        staff: loadedStaff,
+        previousStaffNames: loadedNames,
+        pinnedShiftDates: loadedPinnedDates,
+        shiftSeeds: loadedSeeds,
+      });
+      persistenceRef.current = persistence;
+      shiftStoreRef.current = shiftStore;
+      detachPageLifecycle = persistence.attachPageLifecycle();
+
+      setStaff(loadedStaff);
+      setPreviousStaffNames(loadedNames);
+      dispatchSchedule({ type: 'reset', schedule: {}, pinnedDates: loadedPinnedDates, seeds: loadedSeeds });
+      setIsDataLoaded(true);
+
+      // Display message only if actual data exists
+      if (loadedStaff.length > 0 || shiftStore.hasStoredMonths() || loadedNames.length > 0) {
+        setToastMessage('保存されたデータがロードされました。');
+        setToastType('success');
+        setShowToast(true);
+        setTimeout(() => setShowToast(false), 3000);
+      }
+    };
+
+    loadStoredData().catch(error => {
+      setToastMessage('保存されたデータの読み込み中にエラーが発生しました。');
+      setToastType('error');
+      setShowToast(true);
+      setTimeout(() => setShowToast(false), 3000);
+      console.error("Error loading stored data:", error);
+    });
+
+    // Flush pending writes when the app unmounts
+    return () => {
+      cancelled = true;
+      detachPageLifecycle();
+      persistenceRef.current?.flush();
+    };
+  }, []);
 
   useEffect(() => {
-    localStorage.setItem('generatedShift', JSON.stringify(generatedShift));
-  }, [generatedShift]);
+    if (isDataLoaded) persistenceRef.current.set('staff', staff);
+  }, [staff, isDataLoaded]);
 
   useEffect(() => {
-    localStorage.setItem('previousStaffNames', JSON.stringify(previousStaffNames));
-  }, [previousStaffNames]);
+    if (isDataLoaded) shiftStoreRef.current.sync(generatedShift);
+  }, [generatedShift, isDataLoaded]);
 
-  // Message indicating data has been loaded on app startup
   useEffect(() => {
-    const savedStaff = localStorage.getItem('staff');
-    const savedShift = localStorage.getItem('generatedShift');
-    const savedNames = localStorage.getItem('previousStaffNames');
-
-    // Display message only if actual data exists
-    if (
-      (savedStaff && JSON.parse(savedStaff).length > 0) ||
-      (savedShift && Object.keys(JSON.parse(savedShift)).length > 0) ||
-      (savedNames && JSON.parse(savedNames).length > 0)
-    ) {
-      setToastMessage('保存されたデータがロードされました。');
-      setToastType('success');
-      setShowToast(true);
-      const timer = setTimeout(() => {
-        setShowToast(false);
-      }, 3000);
-      return () => clearTimeout(timer);
-    }
-  }, []);
+    if (isDataLoaded) persistenceRef.current.set('previousStaffNames', previousStaffNames);
+  }, [previousStaffNames, isDataLoaded]);
+
+  useEffect(() => {
+    if (isDataLoaded) persistenceRef.current.set('pinnedShiftDates', pinnedShiftDates);
+  }, [pinnedShiftDates, isDataLoaded]);
+
+  useEffect(() => {
+    if (isDataLoaded) persistenceRef.current.set('shiftSeeds', shiftSeeds);
+  }, [shiftSeeds, isDataLoaded]);
+
+  // Load the stored shifts of the visible month and its neighbours (at startup and when the calendar moves)
+  useEffect(() => {
+    if (!isDataLoaded) return;
+    const shiftStore = shiftStoreRef.current;
+    const monthKeys = monthKeysAround(currentDate).filter(monthKey => !shiftStore.isLoaded(monthKey));
+    if (monthKeys.length === 0) return;
+    shiftStore.load(monthKeys).then(loadedShift => {
+      if (Object.keys(loadedShift).length > 0) {
+        dispatchSchedule({ type: 'load', schedule: loadedShift });
+      }
+    }).catch(error => console.error("Error loading shifts:", error));
+  }, [currentDate, isDataLoaded]);
 
 
   // Helper function to format date to 'YYYY-MM-DD' string
@@ -155,24 +400,9 @@ const App = () => {
     return `${year}-${month}-${day}`;
   };
 
-  // List of Japanese holidays for 2025 (in YYYY-MM-DD format)
-  const japaneseHolidays2025 = [
-    "2025-01-01", "2025-01-13", "2025-02-11", "2025-02-24", "2025-03-20",
-    "2025-04-29", "2025-05-03", "2025-05-04", "2025-05-05", "2025-05-06",
-    "2025-07-21", "2025-08-11", "2025-09-15", "2025-09-23", "2025-10-13",
-    "2025-11-03", "2025-11-24",
-  ];
-
-  // Function to check if a given date is a holiday
-  const isHoliday = (date) => {
-    if (!date) return false;
-    const formatted = formatDate(date);
-    return japaneseHolidays2025.includes(formatted);
-  };
-
-
-  // Function to add a new staff member
+  // Function to add a new staff member (not before the stored staff have been loaded, which would replace it)
   const addStaff = () => {
+    if (!isDataLoaded) return;
     if (newStaffName.trim() === '') {
       setToastMessage('スタッフ名が空です。');
       setToastType('error');
@@ -189,23 +419,18 @@ const App = () => {
       availability: newStaffType === 'fixed'
         ? daysOfWeek.reduce((acc, day) => ({ ...acc, [day]: false }), {})
         : newStaffType === 'flexible'
-          ? []
+          ? {}
           : true,
       canWorkLateShift: newStaffCanWorkLateShift,
       comments: newStaffComments,
     };
-    setStaff([...staff, newStaff]);
+    setStaff(prevStaff => [...prevStaff, newStaff]);
     setToastMessage(`${trimmedName} を追加しました`);
     setToastType('success');
     setShowToast(true);
     setTimeout(() => setShowToast(false), 3000);
 
-    setPreviousStaffNames(prevNames => {
-      const uniqueNames = new Set(prevNames);
-      uniqueNames.add(trimmedName);
-      const updatedNames = Array.from(uniqueNames).sort();
-      return updatedNames;
-    });
+    setPreviousStaffNames(prevNames => mergeStaffNames(prevNames, [trimmedName]));
 
     setNewStaffName('');
     setNewStaffType('fixed');
@@ -213,6 +438,46 @@ const App = () => {
     setNewStaffComments('');
   };
 
+  // Function to import a CSV/TSV staff roster. All new staff are added in one state update, so the
+  // write-behind store persists the roster and the name list in a single flush.
+  const handleImportStaff = async (event) => {
+    const file = event.target.files[0];
+    if (!file || !isDataLoaded) {
+      return;
+    }
+    event.target.value = null;
+
+    setIsImportingStaff(true);
+    try {
+      const { added, skipped, warnings } = await importStaffRoster(file, staff);
+      if (added.length > 0) {
+        setStaff(prevStaff => [...prevStaff, ...added]);
+        setPreviousStaffNames(prevNames => mergeStaffNames(prevNames, added.map(s => s.name)));
+      }
+      if (skipped.length > 0) {
+        console.warn("Skipped roster rows:", skipped);
+      }
+      if (warnings.length > 0) {
+        console.warn("Corrected roster rows:", warnings);
+      }
+      const duplicateCount = skipped.filter(entry => entry.reason === 'duplicate').length;
+      const invalidCount = skipped.length - duplicateCount;
+      setToastMessage(`${added.length}人を追加しました` +
+        (duplicateCount > 0 ? `（重複 ${duplicateCount}件をスキップ）` : '') +
+        (invalidCount > 0 ? `（読み込めない行 ${invalidCount}件）` : '') +
+        (warnings.length > 0 ? `（定休日の月曜を除外 ${warnings.length}件）` : ''));
+      setToastType(added.length > 0 ? 'success' : 'info');
+    } catch (error) {
+      setToastMessage('スタッフ一覧の読み込み中にエラーが発生しました。');
+      setToastType('error');
+      console.error("Error importing staff:", error);
+    } finally {
+      setIsImportingStaff(false);
+    }
+    setShowToast(true);
+    setTimeout(() => setShowToast(false), 3000);
+  };
+
   // Function to open staff deletion confirmation modal
   const openDeleteStaffConfirmModal = (id) => {
     setStaffIdToDelete(id);
@@ -223,7 +488,8 @@ const App = () => {
   const confirmDeleteStaff = () => {
     const staffToDelete = staff.find(s => s.id === staffIdToDelete);
     if (staffToDelete) {
-      setStaff(staff.filter(s => s.id !== staffIdToDelete));
+      const updatedStaff = staff.filter(s => s.id !== staffIdToDelete);
+      setStaff(updatedStaff);
       setToastMessage(`${staffToDelete.name} を削除しました。`);
       setToastType('info');
       setShowToast(true);
@@ -232,6 +498,7 @@ const App = () => {
       if (editingFlexibleStaffId === staffIdToDelete) {
         setEditingFlexibleStaffId(null);
       }
+      resolveShiftsForStaffChange(staffToDelete, null, updatedStaff);
     }
     setIsDeleteStaffConfirmModalOpen(false);
     setStaffIdToDelete(null);
@@ -243,6 +510,77 @@ const App = () => {
     setStaffIdToDelete(null);
   };
 
+  // Function to re-solve only the generated days affected by a change to one staff member (runs in a worker).
+  // Dates of earlier changes whose re-solve was cancelled are included, solved against the latest staff list.
+  // Days that are edited, pinned, regenerated or undone while the worker runs keep their newer shifts.
+  const resolveShiftsForStaffChange = async (previousStaffMember, nextStaffMember, nextStaffList) => {
+    if (!incrementalResolve || Object.keys(generatedShift).length === 0) return;
+
+    const pinnedDates = new Set(pinnedShiftDates);
+    const affectedDates = findAffectedDates({
+      previousStaffMember,
+      nextStaffMember,
+      schedule: generatedShift,
+      pinnedDates,
+    });
+    const pendingDates = pendingResolveDatesRef.current;
+    affectedDates.forEach(dateKey => pendingDates.add(dateKey));
+    // Queued dates may have been pinned or removed since their change
+    [...pendingDates].forEach(dateKey => {
+      if (pinnedDates.has(dateKey) || !(dateKey in generatedShift)) pendingDates.delete(dateKey);
+    });
+    const dates = [...pendingDates].sort();
+    if (dates.length === 0) return;
+
+    if (!resolveWorkerRef.current) {
+      resolveWorkerRef.current = createShiftWorkerClient();
+    }
+    try {
+      const { schedule, stats } = await resolveWorkerRef.current.resolve({
+        staff: nextStaffList,
+        schedule: generatedShift,
+        dates,
+        mode: shiftSolverMode,
+        seed: parseSeed(shiftSeedInput),
+      });
+      dates.forEach(dateKey => pendingDates.delete(dateKey));
+      const latestPinnedDates = new Set(latestPinnedDatesRef.current);
+      const patch = keepUnchangedDays(latestShiftRef.current, generatedShift, Object.fromEntries(
+        Object.entries(schedule).filter(([dateKey]) => !latestPinnedDates.has(dateKey))
+      ));
+      const resolvedDates = Object.keys(patch);
+      if (resolvedDates.length === 0) return;
+      // As for generation, the seed of the last solver run is kept for every month it changed.
+      // The reducer checks against the schedule sent to the worker again, in case an update is still pending.
+      const monthKeys = [...new Set(resolvedDates.map(dateKey => dateKey.slice(0, 7)))];
+      dispatchSchedule({
+        type: 'edit',
+        patch,
+        base: generatedShift,
+        seeds: Object.fromEntries(monthKeys.map(monthKey => [monthKey, stats.seed])),
+      });
+      setToastMessage(`${resolvedDates.length}日分のシフトを再計算しました。`);
+      setToastType('info');
+    } catch (error) {
+      // A newer change cancelled this re-solve; its dates are solved with that one
+      if (isShiftGenerationCancelled(error)) return;
+      dates.forEach(dateKey => pendingDates.delete(dateKey));
+      setToastMessage('シフトの再計算中にエラーが発生しました。');
+      setToastType('error');
+      console.error("Error re-solving shifts:", error);
+    }
+    setShowToast(true);
+    setTimeout(() => setShowToast(false), 3000);
+  };
+
+  // Function to stop a running re-solve when the schedule is replaced (generation, file load, undo/redo).
+  // Its dates stay queued for the next staff change, except those for which `forgetDate(dateKey)` holds.
+  const cancelShiftResolve = (forgetDate = () => false) => {
+    resolveWorkerRef.current?.cancel();
+    const pendingDates = pendingResolveDatesRef.current;
+    [...pendingDates].filter(forgetDate).forEach(dateKey => pendingDates.delete(dateKey));
+  };
+
   // Function to update fixed shift staff's availability
   const updateFixedStaffAvailability = (staffId, day, isAvailable) => {
     if (day === '月') {
@@ -253,33 +591,31 @@ const App = () => {
       return;
     }
 
-    setStaff(
-      staff.map((s) =>
-        s.id === staffId && s.type === 'fixed'
-          ? { ...s, availability: { ...s.availability, [day]: isAvailable } }
-          : s
-      )
+    const previousStaffMember = staff.find(s => s.id === staffId);
+    const updatedStaff = staff.map((s) =>
+      s.id === staffId && s.type === 'fixed'
+        ? { ...s, availability: { ...s.availability, [day]: isAvailable } }
+        : s
     );
+    setStaff(updatedStaff);
+    resolveShiftsForStaffChange(previousStaffMember, updatedStaff.find(s => s.id === staffId), updatedStaff);
   };
 
   // Function to toggle flexible shift staff's availability (date)
   const toggleFlexibleStaffAvailability = (staffId, date) => {
-    setStaff(
-      staff.map((s) => {
-        if (s.id === staffId && s.type === 'flexible') {
-          const dateString = formatDate(date);
-          const newAvailability = s.availability.includes(dateString)
-            ? s.availability.filter((d) => d !== dateString)
-            : [...s.availability, dateString];
-          return { ...s, availability: newAvailability };
-        }
-        return s;
-      })
-    );
+    const previousStaffMember = staff.find(s => s.id === staffId);
+    const updatedStaff = staff.map((s) => {
+      if (s.id === staffId && s.type === 'flexible') {
+        return { ...s, availability: toggleDateAvailability(s.availability, formatDate(date)) };
+      }
+      return s;
+    });
+    setStaff(updatedStaff);
+    resolveShiftsForStaffChange(previousStaffMember, updatedStaff.find(s => s.id === staffId), updatedStaff);
   };
 
-  // Function to automatically generate shifts
-  const generateShift = () => {
+  // Function to automatically generate shifts (runs in the shift worker)
+  const generateShift = async () => {
     if (staff.length === 0) {
       setToastMessage('スタッフが登録されていません。');
       setToastType('error');
@@ -288,112 +624,58 @@ const App = () => {
       return;
     }
 
-    const newShift = {};
-    const year = currentDate.getFullYear();
-    const month = currentDate.getMonth();
-
-    const numDaysInMonth = new Date(year, month + 1, 0).getDate();
-    let startDay = 1;
-    let endDay = numDaysInMonth;
-
-    if (shiftPeriod === 'first_half') {
-      endDay = Math.floor(numDaysInMonth / 2);
-    } else if (shiftPeriod === 'second_half') {
-      startDay = Math.floor(numDaysInMonth / 2) + 1;
+    if (!shiftWorkerRef.current) {
+      shiftWorkerRef.current = createShiftWorkerClient();
     }
 
-    for (let i = startDay; i <= endDay; i++) {
-      const currentDayDate = new Date(year, month, i);
-      const dayOfWeekIndex = currentDayDate.getDay();
-      const dayOfWeekName = daysOfWeek[dayOfWeekIndex];
-      const formattedDate = formatDate(currentDayDate);
-
-      // Mondays are regular holidays
-      if (dayOfWeekName === '月') {
-        newShift[formattedDate] = [{ staff: '定休日', startTime: '', endTime: '', comments: '' }];
-        continue;
-      }
-
-      let requiredShifts = [];
-      if (dayOfWeekName === '土') {
-        requiredShifts = [{ startTime: '19:00', endTime: '23:00' }, { startTime: '17:00', endTime: '22:00' }];
-      } else if (['火', '水', '木'].includes(dayOfWeekName)) {
-        requiredShifts = [{ startTime: '18:00', endTime: '22:00' }];
-      } else if (['金', '日'].includes(dayOfWeekName)) {
-        requiredShifts = [{ startTime: '17:00', endTime: '22:00' }];
-      }
-
-      if (isHoliday(currentDayDate)) {
-        requiredShifts = requiredShifts.map(shift => ({
-          ...shift,
-          startTime: '17:00'
-        }));
-      }
-
-      const assignedStaffForDay = [];
-      const assignedStaffIds = new Set();
-
-      for (const shift of requiredShifts) {
-        let staffToAssign = null;
-
-        const getEligibleStaff = (staffType) => {
-          const eligible = staff.filter(s => {
-            if (s.type !== staffType) return false;
-
-            const isAvailableByType =
-              (s.type === 'flexible' && s.availability.includes(formattedDate)) ||
-              (s.type === 'fixed' && s.availability[dayOfWeekName]) ||
-              (s.type === 'anytime' && s.availability === true);
-
-            const canWorkLateShift = s.comments?.includes('遅番不可') ? shift.startTime !== '19:00' : true;
-            const canWorkThisShiftTime = (shift.startTime === '19:00' && s.canWorkLateShift) || shift.startTime !== '19:00';
-            const isNotAlreadyAssigned = !assignedStaffIds.has(s.id);
-
-            return isAvailableByType && canWorkLateShift && canWorkThisShiftTime && isNotAlreadyAssigned;
-          });
-
-          for (let k = eligible.length - 1; k > 0; k--) {
-            const j = Math.floor(Math.random() * (k + 1));
-            [eligible[k], eligible[j]] = [eligible[j], eligible[k]];
-          }
-          return eligible;
-        };
-
-        const availableFlexibleStaff = getEligibleStaff('flexible');
-        if (availableFlexibleStaff.length > 0) {
-          staffToAssign = availableFlexibleStaff[0];
-        }
-
-        if (!staffToAssign) {
-          const availableFixedStaff = getEligibleStaff('fixed');
-          if (availableFixedStaff.length > 0) {
-            staffToAssign = availableFixedStaff[0];
-          }
-        }
-
-        if (!staffToAssign) {
-          const availableAnytimeStaff = getEligibleStaff('anytime');
-          if (availableAnytimeStaff.length > 0) {
-            staffToAssign = availableAnytimeStaff[0];
-          }
-        }
-
-        if (staffToAssign) {
-          assignedStaffForDay.push({ staff: staffToAssign.name, startTime: shift.startTime, endTime: shift.endTime, comments: '' });
-          assignedStaffIds.add(staffToAssign.id);
-        } else {
-          assignedStaffForDay.push({ staff: '未割り当て', startTime: shift.startTime, endTime: shift.endTime, comments: '' });
-        }
+    const monthKey = monthKeyOf(currentDate);
+    setGenerationProgress({ phase: 'solve', done: 0, total: 0 });
+    try {
+      const { schedule, stats } = await shiftWorkerRef.current.generate(
+        {
+          staff,
+          year: currentDate.getFullYear(),
+          month: currentDate.getMonth(),
+          period: shiftPeriod,
+          mode: shiftSolverMode,
+          // Without a seed the worker picks one; it is returned in stats.seed
+          seed: parseSeed(shiftSeedInput),
+        },
+        { onProgress: setGenerationProgress }
+      );
+      // Generated days replace their previous shifts (and lose their pins); other months are kept
+      cancelShiftResolve(dateKey => dateKey in schedule);
+      dispatchSchedule({
+        type: 'edit',
+        patch: schedule,
+        pins: Object.fromEntries(pinnedShiftDates.filter(dateKey => dateKey in schedule).map(dateKey => [dateKey, false])),
+        seeds: { [monthKey]: stats.seed },
+      });
+      setToastMessage(stats.solverTimedOut
+        ? 'シフトを自動生成しました（時間制限のため一部は簡易割り当てです）。'
+        : 'シフトを自動生成しました。');
+      setToastType('success');
+    } catch (error) {
+      if (isShiftGenerationCancelled(error)) {
+        setToastMessage('シフト生成をキャンセルしました。');
+        setToastType('info');
+      } else {
+        setToastMessage('シフト生成中にエラーが発生しました。');
+        setToastType('error');
+        console.error("Error generating shift:", error);
       }
-      newShift[formattedDate] = assignedStaffForDay;
+    } finally {
+      setGenerationProgress(null);
     }
-    setGeneratedShift(newShift);
-    setToastMessage('シフトを自動生成しました。');
-    setToastType('success');
     setShowToast(true);
     setTimeout(() => setShowToast(false), 3000);
   };
 
+  // Function to cancel a running shift generation
+  const cancelShiftGeneration = () => {
+    shiftWorkerRef.current?.cancel();
+  };
+
   // Function to move to the previous month in the calendar
   const goToPreviousMonth = () => {
     setCurrentDate(prevDate => {
@@ -416,44 +698,45 @@ const App = () => {
     setEditingShiftDate(null);
   };
 
-  // Function to generate calendar days for the specified month
-  const generateCalendarDays = (date) => {
-    const year = date.getFullYear();
-    const month = date.getMonth();
-
-    const firstDayOfMonth = new Date(year, month, 1);
-    const lastDayOfMonth = new Date(year, month + 1, 0);
-    const numDaysInMonth = lastDayOfMonth.getDate();
-
-    const calendarDays = [];
-
-    for (let i = 0; i < firstDayOfMonth.getDay(); i++) {
-      calendarDays.push(null);
-    }
-
-    for (let i = 1; i <= numDaysInMonth; i++) {
-      calendarDays.push(new Date(year, month, i));
-    }
-
-    const totalCells = calendarDays.length;
-    const remainingCells = 42 - totalCells;
-    for (let i = 0; i < remainingCells; i++) {
-      calendarDays.push(null);
-    }
-
-    return calendarDays;
-  };
-
-  const calendarDays = generateCalendarDays(currentDate);
+  // Calendar facts of the visible month (shared, cached per month) and its six-week grid
+  const monthModel = getMonthModel(currentDate.getFullYear(), currentDate.getMonth());
+  const calendarDays = monthModel.calendarCells;
 
   // Get information of the flexible shift staff currently being edited
   const currentFlexibleStaff = staff.find(s => s.id === editingFlexibleStaffId);
 
   // Function to enter shift editing mode
-  const handleEditShift = (date) => {
+  const handleEditShift = useCallback((date, shiftsForDay) => {
     setEditingShiftDate(date);
-    setTempEditingShifts([...(generatedShift[date] || [])]);
-  };
+    setTempEditingShifts([...(shiftsForDay || [])]);
+  }, []);
+
+  // Function to release a hand-edited day so incremental re-solves may change it again
+  const handleUnpinShiftDate = useCallback((date) => {
+    dispatchSchedule({ type: 'pins', pins: { [date]: false } });
+  }, []);
+
+  // Index of the generated shift by date and staff id, rebuilt when the shift or staff list changes.
+  // Dates whose shifts did not change keep their per-staff map, so their table rows are not re-rendered.
+  const shiftIndexCacheRef = useRef({ staff: null, cache: new WeakMap() });
+  const shiftTableIndex = useMemo(() => {
+    if (shiftIndexCacheRef.current.staff !== staff) {
+      shiftIndexCacheRef.current = { staff, cache: new WeakMap() };
+    }
+    return buildDateStaffIndex(generatedShift, staff, shiftIndexCacheRef.current.cache);
+  }, [generatedShift, staff]);
+
+  // Rows of the shift table: the days of the visible month within the selected period
+  const shiftTableDays = useMemo(() => {
+    const { startDay, endDay } = getPeriodDayRange(monthModel.year, monthModel.month, shiftPeriod);
+    return monthModel.days.slice(startDay - 1, endDay).map(day => ({
+      dateKey: day.dateKey,
+      label: `${monthModel.month + 1}月${day.day}日 (${day.dayOfWeekName})`,
+      isClosed: day.isClosed,
+    }));
+  }, [monthModel, shiftPeriod]);
+
+  const pinnedShiftDateSet = useMemo(() => new Set(pinnedShiftDates), [pinnedShiftDates]);
 
   // Function to temporarily reflect staff or time changes in editing mode
   const handleShiftDetailChange = (shiftIndex, field, value) => {
@@ -464,10 +747,8 @@ const App = () => {
 
   // Function to save shift edits
   const handleSaveShift = () => {
-    setGeneratedShift(prev => ({
-      ...prev,
-      [editingShiftDate]: tempEditingShifts,
-    }));
+    // Hand-edited days stay as they are when availability changes are re-solved
+    dispatchSchedule({ type: 'edit', patch: { [editingShiftDate]: tempEditingShifts }, pins: { [editingShiftDate]: true } });
     setEditingShiftDate(null);
     setTempEditingShifts([]);
     setToastMessage('シフトを保存しました。');
@@ -486,9 +767,10 @@ const App = () => {
     setTimeout(() => setShowToast(false), 3000);
   };
 
-  // Function to export generated shifts as CSV
-  const exportShiftToCsv = () => {
-    if (Object.keys(generatedShift).length === 0) {
+  // Function to export generated shifts of a date range as CSV or XLSX.
+  // The range defaults to the displayed month and period; months that are not loaded are read from storage.
+  const exportShiftTable = async (format) => {
+    if (!hasAnyShift) {
       setToastMessage('生成されたシフトがありません。');
       setToastType('error');
       setShowToast(true);
@@ -496,55 +778,40 @@ const App = () => {
       return;
     }
 
-    const csvRows = [];
-    const staffNames = staff.map(s => s.name);
-
-    csvRows.push(['\uFEFF日付', ...staffNames].join(','));
-
-    const filteredCalendarDays = calendarDays.filter(day => {
-      if (!day || day.getMonth() !== currentDate.getMonth()) return false;
-      const dayOfMonth = day.getDate();
-      const numDays = new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 0).getDate();
-      const halfPoint = Math.floor(numDays / 2);
-      if (shiftPeriod === 'first_half' && dayOfMonth > halfPoint) return false;
-      if (shiftPeriod === 'second_half' && dayOfMonth <= halfPoint) return false;
-      return true;
-    });
-
-    filteredCalendarDays.forEach(day => {
-      const formattedDate = formatDate(day);
-      const shiftsForDay = generatedShift[formattedDate] || [];
-      const row = [
-        `${day.getMonth() + 1}月${day.getDate()}日 (${daysOfWeekJapanese[day.getDay()]})`
-      ];
-
-      if (day.getDay() === 1) {
-        row.push(...Array(staffNames.length).fill('定休日'));
-      } else {
-        staffNames.forEach(sName => {
-          const staffShifts = shiftsForDay.filter(shift => shift.staff === sName);
-          const displayTimes = staffShifts.map(shift => {
-            return `${shift.startTime || ''}-${shift.endTime || ''}`;
-          }).join(';');
-          row.push(displayTimes || '');
-        });
-      }
-      csvRows.push(row.join('\n'));
-    });
+    const year = currentDate.getFullYear();
+    const month = currentDate.getMonth();
+    const { startDay, endDay } = getPeriodDayRange(year, month, shiftPeriod);
+    const startDate = exportStartDate ? parseDateKey(exportStartDate) : new Date(year, month, startDay);
+    const endDate = exportEndDate ? parseDateKey(exportEndDate) : new Date(year, month, endDay);
+    if (endDate < startDate) {
+      setToastMessage('出力期間の終了日は開始日以降にしてください。');
+      setToastType('error');
+      setShowToast(true);
+      setTimeout(() => setShowToast(false), 3000);
+      return;
+    }
 
-    const csvString = csvRows.join('\n');
-    const blob = new Blob([csvString], { type: 'text/csv;charset=utf-8;' });
-    const url = URL.createObjectURL(blob);
-    const link = document.createElement('a');
-    link.href = url;
-    link.download = `shift_schedule_${formatDate(currentDate)}_${shiftPeriod}.csv`;
-    document.body.appendChild(link);
-    link.click();
-    document.body.removeChild(link);
-    URL.revokeObjectURL(url);
-
-    setToastMessage('シフトデータをCSVとしてエクスポートしました。');
-    setToastType('success');
+    const totalRows = countScheduleExportRows(startDate, endDate);
+    setExportProgress({ done: 0, total: totalRows });
+    try {
+      const schedule = await shiftStoreRef.current.readMonths(monthKeysBetween(startDate, endDate), generatedShift);
+      const rows = scheduleExportRows({ schedule, staffList: staff, startDate, endDate });
+      const options = { totalRows, onProgress: setExportProgress };
+      const blob = format === 'xlsx'
+        ? await rowsToXlsxBlob(rows, { ...options, sheetName: 'シフト表' })
+        : await rowsToCsvBlob(rows, options);
+      downloadBlob(blob, `shift_schedule_${formatDate(startDate)}_${formatDate(endDate)}.${format}`);
+      setToastMessage(format === 'xlsx'
+        ? 'シフトデータをExcelファイルとしてエクスポートしました。'
+        : 'シフトデータをCSVとしてエクスポートしました。');
+      setToastType('success');
+    } catch (error) {
+      setToastMessage('シフトデータのエクスポート中にエラーが発生しました。');
+      setToastType('error');
+      console.error("Error exporting shifts:", error);
+    } finally {
+      setExportProgress(null);
+    }
     setShowToast(true);
     setTimeout(() => setShowToast(false), 3000);
   };
@@ -596,9 +863,13 @@ const App = () => {
   // Handler to save staff edits in modal
   const saveStaffEdit = () => {
     if (currentEditingStaff) {
-      setStaff(prevStaff => prevStaff.map(s =>
-        s.id === currentEditingStaff.id ? currentEditingStaff : s
-      ));
+      // The type may have changed in the modal, so reshape the availability to match it
+      const editedStaffMember = normalizeStaffAvailability(currentEditingStaff);
+      const previousStaffMember = staff.find(s => s.id === editedStaffMember.id);
+      const updatedStaff = staff.map(s =>
+        s.id === editedStaffMember.id ? editedStaffMember : s
+      );
+      setStaff(updatedStaff);
       setPreviousStaffNames(prevNames => {
         const uniqueNames = new Set(prevNames);
         uniqueNames.add(currentEditingStaff.name);
@@ -608,22 +879,29 @@ const App = () => {
       setToastType('success');
       setShowToast(true);
       setTimeout(() => setShowToast(false), 3000);
+      resolveShiftsForStaffChange(previousStaffMember, editedStaffMember, updatedStaff);
       closeStaffEditModal();
     }
   };
 
   // Function to clear all data from local storage
   const handleClearAllData = () => {
+    if (!isDataLoaded) return;
     setIsClearConfirmModalOpen(true);
   };
 
   const confirmClearData = () => {
-    localStorage.removeItem('staff');
-    localStorage.removeItem('generatedShift');
-    localStorage.removeItem('previousStaffNames');
+    const persistence = persistenceRef.current;
+    persistence.remove('staff');
+    shiftStoreRef.current.replaceAll();
+    persistence.remove('previousStaffNames');
+    persistence.remove('pinnedShiftDates');
+    persistence.remove('shiftSeeds');
+    cancelShiftResolve(() => true);
     setStaff([]);
-    setGeneratedShift({});
+    dispatchSchedule({ type: 'reset', schedule: {} });
     setPreviousStaffNames([]);
+    setShiftSeedInput('');
     setNewStaffName('');
     setNewStaffType('fixed');
     setNewStaffComments('');
@@ -643,8 +921,10 @@ const App = () => {
   };
 
   // Function to save app data as a file
-  const handleSaveToFile = () => {
-    if (staff.length === 0 && Object.keys(generatedShift).length === 0) {
+  // format: 'binary' (gzip-compressed schedule grid, see lib/appDataFile.mjs) or 'json' (the original shape)
+  const handleSaveToFile = async (format = 'binary') => {
+    if (!isDataLoaded) return;
+    if (staff.length === 0 && !hasAnyShift) {
       setToastMessage('保存するデータがありません。');
       setToastType('error');
       setShowToast(true);
@@ -654,75 +934,75 @@ const App = () => {
 
     const appData = {
       staff: staff,
-      generatedShift: generatedShift,
       previousStaffNames: previousStaffNames,
+      pinnedShiftDates: pinnedShiftDates,
+      shiftSeeds: shiftSeeds,
     };
-    const jsonString = JSON.stringify(appData, null, 2);
-
-    const now = new Date();
-    const filename = `shift_data_${formatDate(now)}_${now.getHours()}${String(now.getMinutes()).padStart(2, '0')}${String(now.getSeconds()).padStart(2, '0')}.json`;
-
-    const blob = new Blob([jsonString], { type: 'application/json' });
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a');
-    a.href = url;
-    a.download = filename;
-    document.body.appendChild(a);
-    a.click();
-    document.body.removeChild(a);
-    URL.revokeObjectURL(url);
-
-    setToastMessage('アプリデータをファイルに保存しました。');
-    setToastType('success');
+
+    try {
+      const schedule = await shiftStoreRef.current.readAll(generatedShift);
+      const now = new Date();
+      const baseName = `shift_data_${formatDate(now)}_${now.getHours()}${String(now.getMinutes()).padStart(2, '0')}${String(now.getSeconds()).padStart(2, '0')}`;
+      if (format === 'json') {
+        const jsonString = JSON.stringify({ ...appData, generatedShift: schedule });
+        downloadBlob(new Blob([jsonString], { type: 'application/json' }), `${baseName}.json`);
+      } else {
+        const bytes = await encodeAppDataFile(schedule, appData);
+        downloadBlob(new Blob([bytes], { type: 'application/octet-stream' }), `${baseName}${SCHEDULE_FILE_EXTENSION}`);
+      }
+      setToastMessage('アプリデータをファイルに保存しました。');
+      setToastType('success');
+    } catch (error) {
+      setToastMessage('ファイルの保存中にエラーが発生しました。');
+      setToastType('error');
+      console.error("Error saving file:", error);
+    }
     setShowToast(true);
     setTimeout(() => setShowToast(false), 3000);
   };
 
-  // Function to load app data from a file
-  const handleLoadFromFile = (event) => {
+  // Function to load app data from a file (read, decompressed and validated in a worker)
+  const handleLoadFromFile = async (event) => {
     const file = event.target.files[0];
     if (!file) {
       return;
     }
+    event.target.value = null;
 
-    const reader = new FileReader();
-    reader.onload = (e) => {
-      try {
-        const loadedData = JSON.parse(e.target.result);
-        if (loadedData.staff && loadedData.generatedShift && loadedData.previousStaffNames) {
-          const updatedStaff = loadedData.staff.map(s => ({
-            ...s,
-            canWorkLateShift: s.canWorkLateShift !== undefined ? s.canWorkLateShift : true,
-            comments: s.comments !== undefined ? s.comments : '',
-          }));
-
-          setStaff(updatedStaff);
-          setGeneratedShift(loadedData.generatedShift);
-          setPreviousStaffNames(loadedData.previousStaffNames);
-          setToastMessage('アプリデータをファイルから読み込みました。');
-          setToastType('success');
-          setShowToast(true);
-          setTimeout(() => setShowToast(false), 3000);
-        } else {
-          setToastMessage('無効なファイル形式です。');
-          setToastType('error');
-          setShowToast(true);
-          setTimeout(() => setShowToast(false), 3000);
-        }
-      } catch (error) {
+    setFileLoadProgress({ phase: 'read', done: 0, total: file.size });
+    try {
+      const loadedData = await loadAppDataFile(file, { onProgress: setFileLoadProgress });
+      cancelShiftResolve(() => true);
+      setStaff(loadedData.staff);
+      // The file holds the complete history; stored months it does not contain are removed
+      shiftStoreRef.current.replaceAll();
+      dispatchSchedule({
+        type: 'reset',
+        schedule: loadedData.generatedShift,
+        pinnedDates: loadedData.pinnedShiftDates,
+        seeds: loadedData.shiftSeeds,
+      });
+      setPreviousStaffNames(loadedData.previousStaffNames);
+      setToastMessage('アプリデータをファイルから読み込みました。');
+      setToastType('success');
+    } catch (error) {
+      if (isInvalidAppDataFile(error)) {
+        setToastMessage('無効なファイル形式です。');
+      } else {
         setToastMessage('ファイルの読み込み中にエラーが発生しました。');
-        setToastType('error');
-        setShowToast(true);
-        setTimeout(() => setShowToast(false), 3000);
-        console.error("Error loading file:", error);
       }
-    };
-    reader.readAsText(file);
-    event.target.value = null;
+      setToastType('error');
+      console.error("Error loading file:", error);
+    } finally {
+      setFileLoadProgress(null);
+    }
+    setShowToast(true);
+    setTimeout(() => setShowToast(false), 3000);
   };
 
   // Trigger the hidden file input element when "Load from File" button is clicked
   const triggerFileInput = () => {
+    if (!isDataLoaded) return;
     fileInputRef.current.click();
   };
 
@@ -746,13 +1026,11 @@ const App = () => {
   // Function to confirm clearing current month's shifts
   const confirmClearCurrentMonthShift = () => {
     const currentMonthYear = `${currentDate.getFullYear()}-${String(currentDate.getMonth() + 1).padStart(2, '0')}`;
-    const updatedShift = {};
-    for (const dateKey in generatedShift) {
-      if (!dateKey.startsWith(currentMonthYear)) {
-        updatedShift[dateKey] = generatedShift[dateKey];
-      }
-    }
-    setGeneratedShift(updatedShift);
+    dispatchSchedule({
+      type: 'edit',
+      patch: removeDatesPatch(generatedShift, dateKey => dateKey.startsWith(currentMonthYear)),
+      pins: Object.fromEntries(pinnedShiftDates.filter(dateKey => dateKey.startsWith(currentMonthYear)).map(dateKey => [dateKey, false])),
+    });
     setToastMessage('当月のシフトをクリアしました。');
     setToastType('info');
     setShowToast(true);
@@ -765,6 +1043,24 @@ const App = () => {
     setIsClearCurrentMonthShiftConfirmModalOpen(false);
   };
 
+  // Functions to undo and redo shift changes (generation, edits, re-solves and month clears), with their pins and seeds
+  const undoShiftChange = () => {
+    setEditingShiftDate(null);
+    setTempEditingShifts([]);
+    cancelShiftResolve();
+    dispatchSchedule({ type: 'undo' });
+  };
+
+  const redoShiftChange = () => {
+    setEditingShiftDate(null);
+    setTempEditingShifts([]);
+    cancelShiftResolve();
+    dispatchSchedule({ type: 'redo' });
+  };
+
+  // Whether any shift exists, including stored months that are not loaded
+  const hasAnyShift = Object.keys(generatedShift).length > 0 || Boolean(shiftStoreRef.current?.hasUnloadedMonths());
+
   // Determine if there is shift data for the current month to enable/disable the clear button
   const hasCurrentMonthShift = Object.keys(generatedShift).some(dateKey =>
     dateKey.startsWith(`${currentDate.getFullYear()}-${String(currentDate.getMonth() + 1).padStart(2, '0')}`)
@@ -839,10 +1135,28 @@ const App = () => {
             </div>
             <button
               onClick={addStaff}
-              className="w-full bg-indigo-500 hover:bg-indigo-600 text-white font-semibold py-3 px-6 rounded-lg shadow-md transform hover:scale-105 transition duration-200 ease-in-out"
+              disabled={!isDataLoaded}
+              className={`w-full text-white font-semibold py-3 px-6 rounded-lg shadow-md ${isDataLoaded ? 'bg-indigo-500 hover:bg-indigo-600 transform hover:scale-105 transition duration-200 ease-in-out' : 'bg-indigo-300 cursor-not-allowed'}`}
             >
               追加
             </button>
+            <input
+              type="file"
+              ref={staffImportInputRef}
+              onChange={handleImportStaff}
+              style={{ display: 'none' }}
+              accept=".csv,.tsv,.txt"
+            />
+            <button
+              onClick={() => staffImportInputRef.current.click()}
+              disabled={isImportingStaff || !isDataLoaded}
+              className={`w-full text-white font-semibold py-3 px-6 rounded-lg shadow-md ${isImportingStaff || !isDataLoaded ? 'bg-blue-300 cursor-not-allowed' : 'bg-blue-500 hover:bg-blue-600 transform hover:scale-105 transition duration-200 ease-in-out'}`}
+            >
+              {isImportingStaff ? '読み込み中...' : 'CSV/TSVから一括追加'}
+            </button>
+            <p className="text-sm text-gray-500">
+              1行目は見出し（名前, タイプ, 曜日, 遅番不可, 特記事項）。登録済みの名前は追加されません。
+            </p>
           </div>
         </section>
 
@@ -1084,12 +1398,88 @@ const App = () => {
               <span className="ml-2 text-gray-700 text-sm sm:text-base">後半</span>
             </label>
           </div>
-          <button
-            onClick={generateShift}
-            className="w-full bg-green-500 hover:bg-green-600 text-white font-bold py-4 px-10 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-xl"
-          >
-            シフトを自動生成
-          </button>
+          <div className="flex justify-center space-x-2 sm:space-x-4 mb-6">
+            <label className="inline-flex items-center">
+              <input
+                type="radio"
+                name="shiftSolverMode"
+                value="optimal"
+                checked={shiftSolverMode === 'optimal'}
+                onChange={(e) => setShiftSolverMode(e.target.value)}
+                className="form-radio h-4 w-4 text-green-600"
+              />
+              <span className="ml-2 text-gray-700 text-sm sm:text-base">最適化（期間全体）</span>
+            </label>
+            <label className="inline-flex items-center">
+              <input
+                type="radio"
+                name="shiftSolverMode"
+                value="greedy"
+                checked={shiftSolverMode === 'greedy'}
+                onChange={(e) => setShiftSolverMode(e.target.value)}
+                className="form-radio h-4 w-4 text-green-600"
+              />
+              <span className="ml-2 text-gray-700 text-sm sm:text-base">高速（日ごと）</span>
+            </label>
+          </div>
+          <label className="inline-flex items-center mb-6">
+            <input
+              type="checkbox"
+              checked={incrementalResolve}
+              onChange={(e) => setIncrementalResolve(e.target.checked)}
+              className="form-checkbox h-5 w-5 text-green-600 rounded"
+            />
+            <span className="ml-2 text-gray-700 text-sm sm:text-base">出勤可能状況の変更を生成済みシフトに反映（手動編集した日は維持）</span>
+          </label>
+          <div className="flex flex-wrap items-center justify-center gap-2 mb-6 text-sm sm:text-base">
+            <label htmlFor="shiftSeed" className="text-gray-700">シード（任意）</label>
+            <input
+              id="shiftSeed"
+              type="text"
+              inputMode="numeric"
+              value={shiftSeedInput}
+              onChange={(e) => setShiftSeedInput(e.target.value)}
+              placeholder="空欄で毎回変わります"
+              className="w-44 p-2 border border-gray-300 rounded-lg focus:outline-none focus:ring-2 focus:ring-green-500"
+            />
+            {shiftSeeds[monthKeyOf(currentDate)] !== undefined && (
+              <button
+                type="button"
+                onClick={() => setShiftSeedInput(String(shiftSeeds[monthKeyOf(currentDate)]))}
+                className="text-green-700 hover:text-green-900 underline"
+                title="このシードで生成すると同じシフトを再現できます"
+              >
+                この月のシード: {shiftSeeds[monthKeyOf(currentDate)]}
+              </button>
+            )}
+          </div>
+          {generationProgress ? (
+            <div className="space-y-3">
+              <p className="text-green-700 font-semibold">
+                {generationProgress.phase === 'solve' ? '最適な割り当てを計算中' : 'シフトを作成中'}
+                {generationProgress.total > 0 && ` (${generationProgress.done} / ${generationProgress.total})`}
+              </p>
+              <div className="w-full bg-green-100 rounded-full h-3">
+                <div
+                  className="bg-green-500 h-3 rounded-full transition-all duration-200"
+                  style={{ width: `${generationProgress.total > 0 ? Math.round((generationProgress.done / generationProgress.total) * 100) : 0}%` }}
+                />
+              </div>
+              <button
+                onClick={cancelShiftGeneration}
+                className="w-full bg-gray-400 hover:bg-gray-500 text-white font-bold py-3 px-10 rounded-full shadow-lg transition duration-300 ease-in-out text-lg"
+              >
+                生成をキャンセル
+              </button>
+            </div>
+          ) : (
+            <button
+              onClick={generateShift}
+              className="w-full bg-green-500 hover:bg-green-600 text-white font-bold py-4 px-10 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-xl"
+            >
+              シフトを自動生成
+            </button>
+          )}
         </section>
 
         {/* 生成されたシフト表示セクション */}
@@ -1118,130 +1508,73 @@ const App = () => {
                   </tr>
                 </thead>
                 <tbody>
-                  {calendarDays.filter(day => {
-                    if (!day || day.getMonth() !== currentDate.getMonth()) return false;
-                    const dayOfMonth = day.getDate();
-                    const numDays = new Date(currentDate.getFullYear(), currentDate.getMonth() + 1, 0).getDate();
-                    const halfPoint = Math.floor(numDays / 2);
-                    if (shiftPeriod === 'first_half' && dayOfMonth > halfPoint) return false;
-                    if (shiftPeriod === 'second_half' && dayOfMonth <= halfPoint) return false;
-                    return true;
-                  }).map((day) => {
-                    const formattedDate = formatDate(day);
-                    const shiftsForDay = generatedShift[formattedDate] || [];
-                    const isMonday = day.getDay() === 1;
-
-                    return (
-                      <tr key={formattedDate} className="border-t border-teal-200 hover:bg-teal-50 transition duration-150">
-                        <td className="py-2 px-2 whitespace-nowrap text-base font-medium text-gray-900">
-                          {day.getMonth() + 1}月{day.getDate()}日 ({daysOfWeekJapanese[day.getDay()]})
-                        </td>
-                        {staff.map((s) => {
-                          if (isMonday) {
-                            return (
-                              <td key={s.id} className="py-2 px-2 text-center text-gray-500">
-                                定休日
-                              </td>
-                            );
-                          }
-                          if (editingShiftDate === formattedDate) {
-                            const staffShifts = tempEditingShifts.filter(shift => shift.staff === s.name);
-                            return (
-                              <td key={s.id} className="py-2 px-2 text-center">
-                                {staffShifts.length > 0 ? (
-                                  staffShifts.map((shift, idx) => (
-                                    <div key={idx} className="mb-1 flex flex-col items-center">
-                                      <select
-                                        value={shift.staff}
-                                        onChange={(e) => handleShiftDetailChange(tempEditingShifts.indexOf(shift), 'staff', e.target.value)}
-                                        className="p-1 border rounded-md text-sm w-full mb-1"
-                                      >
-                                        <option value="未割り当て">未割り当て</option>
-                                        {staff.map(allStaff => (
-                                          <option key={allStaff.id} value={allStaff.name}>
-                                            {allStaff.name}
-                                          </option>
-                                        ))}
-                                      </select>
-                                      <div className="flex space-x-1 w-full">
-                                        <input
-                                          type="time"
-                                          value={shift.startTime || ''}
-                                          onChange={(e) => handleShiftDetailChange(tempEditingShifts.indexOf(shift), 'startTime', e.target.value)}
-                                          className="p-1 border rounded-md text-sm w-1/2"
-                                        />
-                                        <span className="flex items-center">-</span>
-                                        <input
-                                          type="time"
-                                          value={shift.endTime || ''}
-                                          onChange={(e) => handleShiftDetailChange(tempEditingShifts.indexOf(shift), 'endTime', e.target.value)}
-                                          className="p-1 border rounded-md text-sm w-1/2"
-                                        />
-                                      </div>
-                                    </div>
-                                  ))
-                                ) : (
-                                  <select
-                                    value="未割り当て"
-                                    onChange={(e) => {}}
-                                    className="p-1 border rounded-md text-sm w-full"
-                                    disabled
-                                  >
-                                    <option value="未割り当て">—</option>
-                                  </select>
-                                )}
-                              </td>
-                            );
-                          }
-
-                          const staffShifts = shiftsForDay.filter(shift => shift.staff === s.name);
-                          const displayTimes = staffShifts.map(shift => {
-                            return `(${shift.startTime} - ${shift.endTime})`;
-                          }).join(', ');
-                          return (
-                            <td key={s.id} className="py-2 px-2 text-center text-base text-gray-700">
-                              {displayTimes || '—'}
-                            </td>
-                          );
-                        })}
-                        <td className="py-2 px-2 whitespace-nowrap text-center">
-                          {editingShiftDate === formattedDate ? (
-                            <div className="flex flex-col space-y-2">
-                              <button
-                                onClick={handleSaveShift}
-                                className="bg-green-500 hover:bg-green-600 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
-                              >
-                                保存
-                              </button>
-                              <button
-                                onClick={handleCancelEdit}
-                                className="bg-gray-400 hover:bg-gray-500 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
-                              >
-                                キャンセル
-                              </button>
-                            </div>
-                          ) : (
-                            <button
-                              onClick={() => handleEditShift(formattedDate)}
-                              className="bg-blue-500 hover:bg-blue-600 text-white text-sm font-semibold py-1 px-3 rounded-lg shadow-md"
-                            >
-                              編集
-                            </button>
-                          )}
-                        </td>
-                      </tr>
-                    );
-                  })}
+                  {shiftTableDays.map(({ dateKey, label, isClosed }) => (
+                    <ShiftTableRow
+                      key={dateKey}
+                      dateKey={dateKey}
+                      label={label}
+                      isClosed={isClosed}
+                      staff={staff}
+                      shifts={generatedShift[dateKey]}
+                      shiftsByStaff={shiftTableIndex.get(dateKey) || EMPTY_SHIFTS_BY_STAFF}
+                      isPinned={pinnedShiftDateSet.has(dateKey)}
+                      editing={editingShiftDate === dateKey ? {
+                        shifts: tempEditingShifts,
+                        onChange: handleShiftDetailChange,
+                        onSave: handleSaveShift,
+                        onCancel: handleCancelEdit,
+                      } : null}
+                      onEdit={handleEditShift}
+                      onUnpin={handleUnpinShiftDate}
+                    />
+                  ))}
                 </tbody>
               </table>
               {Object.keys(generatedShift).length > 0 && (
-                <div className="text-center mt-6">
-                  <button
-                    onClick={exportShiftToCsv}
-                    className="w-full sm:w-auto bg-purple-600 hover:bg-purple-700 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
-                  >
-                    スプレッドシートに出力
-                  </button>
+                <div className="text-center mt-6 space-y-4">
+                  <div className="flex flex-col sm:flex-row justify-center items-center gap-2 text-gray-700">
+                    <span className="font-medium">出力期間:</span>
+                    <input
+                      type="date"
+                      value={exportStartDate}
+                      onChange={(e) => setExportStartDate(e.target.value)}
+                      className="p-2 border border-gray-300 rounded-md"
+                    />
+                    <span>〜</span>
+                    <input
+                      type="date"
+                      value={exportEndDate}
+                      onChange={(e) => setExportEndDate(e.target.value)}
+                      className="p-2 border border-gray-300 rounded-md"
+                    />
+                    <span className="text-sm text-gray-500">（未指定の場合は表示中の期間）</span>
+                  </div>
+                  {exportProgress ? (
+                    <div className="max-w-md mx-auto">
+                      <div className="w-full bg-gray-200 rounded-full h-3">
+                        <div
+                          className="bg-purple-600 h-3 rounded-full transition-all duration-200"
+                          style={{ width: `${exportProgress.total ? Math.round((exportProgress.done / exportProgress.total) * 100) : 0}%` }}
+                        />
+                      </div>
+                      <p className="text-sm text-gray-600 mt-1">エクスポート中... {exportProgress.done}/{exportProgress.total}行</p>
+                    </div>
+                  ) : (
+                    <div className="flex flex-col sm:flex-row justify-center space-y-4 sm:space-y-0 sm:space-x-4">
+                      <button
+                        onClick={() => exportShiftTable('csv')}
+                        className="w-full sm:w-auto bg-purple-600 hover:bg-purple-700 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
+                      >
+                        CSVで出力
+                      </button>
+                      <button
+                        onClick={() => exportShiftTable('xlsx')}
+                        className="w-full sm:w-auto bg-purple-600 hover:bg-purple-700 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
+                      >
+                        Excelで出力
+                      </button>
+                    </div>
+                  )}
                 </div>
               )}
             </div>
@@ -1252,9 +1585,9 @@ const App = () => {
         <section className="text-center bg-gray-50 p-4 sm:p-6 rounded-lg shadow-inner">
           <h2 className="text-xl sm:text-2xl font-bold text-gray-700 mb-4">データ管理</h2>
           <div className="flex flex-col sm:flex-row justify-center space-y-4 sm:space-y-0 sm:space-x-4">
-            {staff.length > 0 || Object.keys(generatedShift).length > 0 ? (
+            {staff.length > 0 || hasAnyShift ? (
               <button
-                onClick={handleSaveToFile}
+                onClick={() => handleSaveToFile('binary')}
                 className="w-full sm:w-auto bg-indigo-600 hover:bg-indigo-700 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
               >
                 データをファイルに保存
@@ -1267,16 +1600,25 @@ const App = () => {
                 データをファイルに保存
               </button>
             )}
+            {(staff.length > 0 || hasAnyShift) && (
+              <button
+                onClick={() => handleSaveToFile('json')}
+                className="w-full sm:w-auto bg-indigo-400 hover:bg-indigo-500 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
+              >
+                JSON形式で保存
+              </button>
+            )}
             <input
               type="file"
               ref={fileInputRef}
               onChange={handleLoadFromFile}
               style={{ display: 'none' }}
-              accept=".json"
+              accept={`.json,${SCHEDULE_FILE_EXTENSION}`}
             />
             <button
               onClick={triggerFileInput}
-              className="w-full sm:w-auto bg-green-600 hover:bg-green-700 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
+              disabled={!!fileLoadProgress}
+              className={`w-full sm:w-auto text-white font-bold py-3 px-8 rounded-full shadow-lg text-lg ${fileLoadProgress ? 'bg-green-300 cursor-not-allowed' : 'bg-green-600 hover:bg-green-700 transform hover:scale-105 transition duration-300 ease-in-out'}`}
             >
               ファイルから読み込む
             </button>
@@ -1295,6 +1637,20 @@ const App = () => {
                 当月のシフトをクリア
               </button>
             )}
+            <button
+              onClick={undoShiftChange}
+              disabled={!canUndoSchedule(scheduleHistory)}
+              className={`w-full sm:w-auto text-white font-bold py-3 px-8 rounded-full shadow-lg text-lg ${canUndoSchedule(scheduleHistory) ? 'bg-gray-600 hover:bg-gray-700 transform hover:scale-105 transition duration-300 ease-in-out' : 'bg-gray-300 cursor-not-allowed'}`}
+            >
+              元に戻す
+            </button>
+            <button
+              onClick={redoShiftChange}
+              disabled={!canRedoSchedule(scheduleHistory)}
+              className={`w-full sm:w-auto text-white font-bold py-3 px-8 rounded-full shadow-lg text-lg ${canRedoSchedule(scheduleHistory) ? 'bg-gray-600 hover:bg-gray-700 transform hover:scale-105 transition duration-300 ease-in-out' : 'bg-gray-300 cursor-not-allowed'}`}
+            >
+              やり直す
+            </button>
             <button
               onClick={handleClearAllData}
               className="w-full sm:w-auto bg-red-600 hover:bg-red-700 text-white font-bold py-3 px-8 rounded-full shadow-lg transform hover:scale-105 transition duration-300 ease-in-out text-lg"
@@ -1302,6 +1658,19 @@ const App = () => {
                 全てのデータをクリア
             </button>
           </div>
+          {fileLoadProgress && (
+            <div className="max-w-md mx-auto mt-4">
+              <div className="w-full bg-gray-200 rounded-full h-3">
+                <div
+                  className="bg-green-600 h-3 rounded-full transition-all duration-200"
+                  style={{ width: `${fileLoadProgress.phase === 'parse' ? 100 : fileLoadProgress.total ? Math.round((fileLoadProgress.done / fileLoadProgress.total) * 100) : 0}%` }}
+                />
+              </div>
+              <p className="text-sm text-gray-600 mt-1">
+                {fileLoadProgress.phase === 'parse' ? 'データを検証中...' : `ファイルを読み込み中... ${Math.round(fileLoadProgress.done / 1024)}/${Math.round(fileLoadProgress.total / 1024)}KB`}
+              </p>
+            </div>
+          )}
         </section>
 
 
@@ -1339,12 +1708,13 @@ const App = () => {
               </div>
             ))}
             {calendarDays.map((day, index) => {
-              const isCurrentMonth = day && day.getMonth() === currentDate.getMonth();
+              // Every non-empty cell belongs to the visible month
+              const isCurrentMonth = day !== null;
               const isFlexibleStaffEditing = editingFlexibleStaffId !== null;
-              const isMonday = day && day.getDay() === 1;
-              const isCurrentDayHoliday = isHoliday(day);
+              const isMonday = Boolean(day?.isClosed);
+              const isCurrentDayHoliday = Boolean(day?.isHoliday);
 
-              const isAvailableForEditingStaff = currentFlexibleStaff && day && currentFlexibleStaff.availability.includes(formatDate(day));
+              const isAvailableForEditingStaff = currentFlexibleStaff && day && isDateAvailable(currentFlexibleStaff.availability, day.dateKey);
 
               return (
                 <div
@@ -1365,15 +1735,18 @@ const App = () => {
                   `}
                   onClick={() => {
                     if (isFlexibleStaffEditing && isCurrentMonth && day && !isMonday) {
-                      toggleFlexibleStaffAvailability(editingFlexibleStaffId, day);
+                      toggleFlexibleStaffAvailability(editingFlexibleStaffId, day.date);
                     }
                   }}
                 >
                   {day && (
                     <>
-                      <span className="text-lg font-semibold">{day.getDate()}</span>
+                      <span className="text-lg font-semibold">{day.day}</span>
+                      {isCurrentDayHoliday && (
+                        <span className="text-xs text-yellow-700">{day.holidayName}</span>
+                      )}
                       <span className="text-sm text-indigo-600 font-medium mt-1">
-                        {generatedShift[formatDate(day)]?.map((s, idx) => (
+                        {generatedShift[day.dateKey]?.map((s, idx) => (
                           <div key={idx} className="text-xs">
                             {s.staff} {s.startTime && s.endTime ? `(${s.startTime} - ${s.endTime})` : ''}
                           </div>
@@ -1408,13 +1781,13 @@ const App = () => {
       />
       <ConfirmationModal
         isOpen={isDeleteStaffConfirmModalOpen}
-        message={`${staff.find(s => s.id === staffIdToDelete)?.name} を本当に削除してもよろしいですか？`}
+        message={`${staff.find(s => s.id === staffIdToDelete)?.name} を本当に削除してもよろしいですか？スタッフの削除は元に戻せません（再計算されたシフトは「元に戻す」で取り消せます）。`}
         onConfirm={confirmDeleteStaff}
         onCancel={cancelDeleteStaff}
       />
       <ConfirmationModal
         isOpen={isClearCurrentMonthShiftConfirmModalOpen}
-        message="当月のシフトデータを全てクリアしてもよろしいですか？この操作は元に戻せません。"
+        message="当月のシフトデータを全てクリアしてもよろしいですか？クリアしたシフトは「元に戻す」で取り消せます。"
         onConfirm={confirmClearCurrentMonthShift}
         onCancel={cancelClearCurrentMonthShift}
       />
@@ -0,0 +1,163 @@
+// Headless benchmark for shift generation (no browser needed).
+//
+//   node --expose-gc bench/scheduleBench.mjs [--sizes 10,50,200,500,2000] [--densities 0.3,0.6]
+//        [--modes optimal,greedy] [--scopes period,month,year] [--variants app,firestore]
+//        [--runs 3] [--year 2026] [--month 4] [--seed 1] [--out results.json]
+//
+// Scopes: 'period' generates the first and second half of --month, 'month' the whole of --month
+// (1-based), 'year' every month of --year in turn. Variants: 'app' uses the built-in Japanese holiday
+// calendar like app.py, 'firestore' passes no holidays like the Firestore variant.
+// Results are written as JSON (stdout unless --out is given); progress goes to stderr.
+// --expose-gc makes the heap figures reliable by collecting garbage before every run.
+import { writeFile } from 'node:fs/promises';
+import { performance } from 'node:perf_hooks';
+import { generateSchedule } from '../lib/shiftScheduler.mjs';
+import { createSyntheticRoster } from './syntheticRoster.mjs';
+
+const DEFAULT_OPTIONS = {
+  sizes: [10, 50, 200, 500, 2000],
+  densities: [0.3, 0.6],
+  modes: ['optimal', 'greedy'],
+  scopes: ['period', 'month', 'year'],
+  variants: ['app', 'firestore'],
+  runs: 3,
+  year: 2026,
+  month: 4,
+  seed: 1,
+  out: null,
+};
+
+const LIST_OPTIONS = new Set(['sizes', 'densities', 'modes', 'scopes', 'variants']);
+const NUMBER_OPTIONS = new Set(['sizes', 'densities', 'runs', 'year', 'month', 'seed']);
+
+const parseArgs = (argv) => {
+  const options = { ...DEFAULT_OPTIONS };
+  for (let i = 0; i < argv.length; i += 2) {
+    const name = argv[i].replace(/^--/, '');
+    const value = argv[i + 1];
+    if (!(name in DEFAULT_OPTIONS) || value === undefined) {
+      throw new Error(`Unknown or incomplete option: ${argv[i]}`);
+    }
+    const toValue = NUMBER_OPTIONS.has(name) ? Number : String;
+    options[name] = LIST_OPTIONS.has(name) ? value.split(',').map(toValue) : toValue(value);
+  }
+  return options;
+};
+
+// The generateSchedule calls one scenario makes: [{ year, month (0-based), period }]
+const scopeRuns = (scope, year, month) => {
+  if (scope === 'period') {
+    return [{ year, month, period: 'first_half' }, { year, month, period: 'second_half' }];
+  }
+  if (scope === 'month') return [{ year, month, period: 'full_month' }];
+  if (scope === 'year') return Array.from({ length: 12 }, (_, m) => ({ year, month: m, period: 'full_month' }));
+  throw new Error(`Unknown scope: ${scope}`);
+};
+
+const median = (values) => {
+  const sorted = [...values].sort((a, b) => a - b);
+  const middle = Math.floor(sorted.length / 2);
+  return sorted.length % 2 === 1 ? sorted[middle] : (sorted[middle - 1] + sorted[middle]) / 2;
+};
+
+const round = (value, digits = 2) => Number(value.toFixed(digits));
+
+// Runs one scenario `runs` times with the same roster and seed
+const runScenario = ({ size, density, mode, scope, variant, runs, year, month, seed }) => {
+  const calls = scopeRuns(scope, year, month);
+  const roster = createSyntheticRoster({
+    size,
+    density,
+    months: calls.map(call => ({ year: call.year, month: call.month })),
+    seed,
+  });
+
+  const samples = [];
+  for (let run = 0; run < runs; run++) {
+    globalThis.gc?.();
+    const heapBefore = process.memoryUsage().heapUsed;
+    let peakHeapDelta = 0;
+    let totalSlots = 0;
+    let unassignedSlots = 0;
+    let solverTimedOut = false;
+
+    const startedAt = performance.now();
+    calls.forEach(call => {
+      const { stats } = generateSchedule({
+        staff: roster,
+        ...call,
+        holidays: variant === 'firestore' ? [] : undefined,
+        mode,
+        seed,
+      });
+      totalSlots += stats.totalSlots;
+      unassignedSlots += stats.unassignedSlots;
+      solverTimedOut ||= stats.solverTimedOut;
+      peakHeapDelta = Math.max(peakHeapDelta, process.memoryUsage().heapUsed - heapBefore);
+    });
+    const wallMs = performance.now() - startedAt;
+
+    samples.push({ wallMs, peakHeapDelta, totalSlots, unassignedSlots, solverTimedOut });
+  }
+
+  const wallTimes = samples.map(sample => sample.wallMs);
+  const { totalSlots, unassignedSlots } = samples[0];
+  return {
+    variant,
+    scope,
+    mode,
+    size,
+    density,
+    calls: calls.length,
+    runs,
+    wallMs: { min: round(Math.min(...wallTimes)), median: round(median(wallTimes)), max: round(Math.max(...wallTimes)) },
+    peakHeapDeltaBytes: Math.max(...samples.map(sample => sample.peakHeapDelta)),
+    totalSlots,
+    unassignedSlots,
+    coverage: totalSlots === 0 ? 1 : round(1 - unassignedSlots / totalSlots, 4),
+    solverTimedOut: samples.some(sample => sample.solverTimedOut),
+  };
+};
+
+const main = async () => {
+  const options = parseArgs(process.argv.slice(2));
+  const { runs, year, seed } = options;
+  const month = options.month - 1;
+
+  const results = [];
+  for (const variant of options.variants) {
+    for (const scope of options.scopes) {
+      for (const mode of options.modes) {
+        for (const size of options.sizes) {
+          for (const density of options.densities) {
+            const result = runScenario({ size, density, mode, scope, variant, runs, year, month, seed });
+            results.push(result);
+            process.stderr.write(
+              `${variant} ${scope} ${mode} size=${size} density=${density}: ` +
+              `${result.wallMs.median} ms, ${result.unassignedSlots}/${result.totalSlots} unassigned\n`
+            );
+          }
+        }
+      }
+    }
+  }
+
+  const report = {
+    createdAt: new Date().toISOString(),
+    node: process.version,
+    gcExposed: typeof globalThis.gc === 'function',
+    options: { ...options, out: undefined },
+    results,
+  };
+  const json = `${JSON.stringify(report, null, 2)}\n`;
+  if (options.out) {
+    await writeFile(options.out, json);
+  } else {
+    process.stdout.write(json);
+  }
+};
+
+main().catch(error => {
+  console.error(error);
+  process.exitCode = 1;
+});
@@ -0,0 +1,54 @@
+// Synthetic rosters for the scheduling benchmarks.
+// Staff are built in the shape generateSchedule expects (type 'fixed' | 'flexible' | 'anytime'),
+// from a seeded generator so every run of a scenario schedules exactly the same roster.
+import { availabilityFromDates } from '../lib/availability.mjs';
+import { createSeededRandom } from '../lib/random.mjs';
+import { DAYS_OF_WEEK, formatDateKey } from '../lib/shiftScheduler.mjs';
+
+// Share of each staff type in a roster (the rest of the roster is 'anytime')
+export const DEFAULT_TYPE_MIX = { fixed: 0.4, flexible: 0.45 };
+// Share of staff who cannot take late shifts, half through the flag and half through a 遅番不可 comment
+export const DEFAULT_LATE_RESTRICTED_SHARE = 0.2;
+
+// Every 'YYYY-MM-DD' of the given months ({ year, month } with a 0-based month)
+const datesOfMonths = (months) => months.flatMap(({ year, month }) => {
+  const daysInMonth = new Date(year, month + 1, 0).getDate();
+  return Array.from({ length: daysInMonth }, (_, index) => formatDateKey(new Date(year, month, index + 1)));
+});
+
+// Builds `size` staff members. `density` (0-1) is the chance a flexible member can work a given date
+// and a fixed member a given weekday; flexible availability covers `months`.
+export const createSyntheticRoster = ({
+  size,
+  months,
+  density = 0.5,
+  typeMix = DEFAULT_TYPE_MIX,
+  lateRestrictedShare = DEFAULT_LATE_RESTRICTED_SHARE,
+  seed = 1,
+}) => {
+  const random = createSeededRandom(seed);
+  const dates = datesOfMonths(months);
+
+  return Array.from({ length: size }, (_, index) => {
+    const typeRoll = random();
+    const type = typeRoll < typeMix.fixed ? 'fixed' : typeRoll < typeMix.fixed + typeMix.flexible ? 'flexible' : 'anytime';
+    const lateRestricted = random() < lateRestrictedShare;
+    const restrictedByComment = lateRestricted && random() < 0.5;
+
+    let availability = true;
+    if (type === 'fixed') {
+      availability = Object.fromEntries(DAYS_OF_WEEK.map(dayOfWeekName => [dayOfWeekName, random() < density]));
+    } else if (type === 'flexible') {
+      availability = availabilityFromDates(dates.filter(() => random() < density));
+    }
+
+    return {
+      id: index + 1,
+      name: `スタッフ${index + 1}`,
+      type,
+      availability,
+      canWorkLateShift: !lateRestricted || restrictedByComment,
+      comments: restrictedByComment ? '遅番不可' : '',
+    };
+  });
+};
@@ -0,0 +1,120 @@
+#!/usr/bin/env node
+// Generates the schedules of many stores and months in one run, in parallel worker threads.
+//
+//   node bin/generate-schedules.mjs [--out-dir schedules] [--workers N] jobs/*.json
+//
+// Job files are described in lib/scheduleBatch.mjs. Each (job, month) is written to
+// <out-dir>/<name>.<YYYY-MM>.json; jobs whose output files would collide are rejected before anything runs.
+// A summary of every task is printed to stdout as JSON. The exit code is 1 when any task failed.
+import { mkdir, readFile, writeFile } from 'node:fs/promises';
+import { availableParallelism } from 'node:os';
+import { basename, extname, join } from 'node:path';
+import { Worker } from 'node:worker_threads';
+import { expandScheduleJobs } from '../lib/scheduleBatch.mjs';
+
+const parseArgs = (argv) => {
+  const options = { outDir: 'schedules', workers: Math.max(1, availableParallelism() - 1), files: [] };
+  for (let i = 0; i < argv.length; i++) {
+    if (argv[i] === '--out-dir') {
+      options.outDir = argv[++i];
+    } else if (argv[i] === '--workers') {
+      options.workers = Math.max(1, Number(argv[++i]) || 1);
+    } else {
+      options.files.push(argv[i]);
+    }
+  }
+  if (options.files.length === 0) {
+    throw new Error('Usage: generate-schedules.mjs [--out-dir dir] [--workers n] job.json...');
+  }
+  return options;
+};
+
+// Output file names keep letters (including Japanese), digits, '-' and '_'
+const toFileName = (name, monthKey) => `${name.replace(/[^\p{L}\p{N}_-]+/gu, '_')}.${monthKey}.json`;
+
+// Runs every task on a pool of workers; calls onSettled(taskIndex, { result } | { error }) as tasks finish.
+// A crashed worker or a failing onSettled stops the whole pool, so no idle worker keeps the process alive.
+const runOnWorkerPool = (tasks, workerCount, onSettled) => new Promise((resolve, reject) => {
+  let nextTaskIndex = 0;
+  let running = 0;
+  const workers = [];
+
+  const finish = () => {
+    workers.forEach(worker => worker.terminate());
+    resolve();
+  };
+
+  const fail = (error) => {
+    workers.forEach(worker => worker.terminate());
+    reject(error);
+  };
+
+  const dispatch = (worker) => {
+    if (nextTaskIndex >= tasks.length) {
+      if (running === 0) finish();
+      return;
+    }
+    const taskIndex = nextTaskIndex++;
+    running++;
+    worker.postMessage({ taskIndex, task: tasks[taskIndex] });
+  };
+
+  for (let i = 0; i < Math.min(workerCount, tasks.length); i++) {
+    const worker = new Worker(new URL('./scheduleBatchWorker.mjs', import.meta.url));
+    worker.on('message', ({ taskIndex, result, error }) => {
+      Promise.resolve(onSettled(taskIndex, { result, error }))
+        .then(() => {
+          running--;
+          dispatch(worker);
+        })
+        .catch(fail);
+    });
+    worker.on('error', fail);
+    workers.push(worker);
+    dispatch(worker);
+  }
+  if (tasks.length === 0) finish();
+});
+
+const main = async () => {
+  const options = parseArgs(process.argv.slice(2));
+
+  const tasks = [];
+  for (const file of options.files) {
+    const jobs = JSON.parse(await readFile(file, 'utf8'));
+    tasks.push(...expandScheduleJobs(jobs, basename(file, extname(file))));
+  }
+  const outputFiles = tasks.map(({ name, monthKey }) => join(options.outDir, toFileName(name, monthKey)));
+  const taskIndexByOutputFile = new Map();
+  outputFiles.forEach((outputFile, taskIndex) => {
+    if (taskIndexByOutputFile.has(outputFile)) {
+      const other = tasks[taskIndexByOutputFile.get(outputFile)];
+      throw new Error(`${tasks[taskIndex].name} and ${other.name} would both be written to ${outputFile}; give the jobs distinct names`);
+    }
+    taskIndexByOutputFile.set(outputFile, taskIndex);
+  });
+  await mkdir(options.outDir, { recursive: true });
+
+  const startedAt = Date.now();
+  const summary = [];
+  await runOnWorkerPool(tasks, options.workers, async (taskIndex, { result, error }) => {
+    const { name, monthKey } = tasks[taskIndex];
+    if (error) {
+      summary[taskIndex] = { name, monthKey, error };
+      process.stderr.write(`${name} ${monthKey}: ${error}\n`);
+      return;
+    }
+    const outputFile = outputFiles[taskIndex];
+    await writeFile(outputFile, `${JSON.stringify(result, null, 2)}\n`);
+    summary[taskIndex] = { name, monthKey, outputFile, ...result.stats };
+    process.stderr.write(`${name} ${monthKey}: ${result.stats.unassignedSlots} unassigned, ${result.stats.elapsedMs} ms\n`);
+  });
+
+  process.stdout.write(`${JSON.stringify({ elapsedMs: Date.now() - startedAt, workers: options.workers, tasks: summary }, null, 2)}\n`);
+  if (summary.some(entry => entry.error)) process.exitCode = 1;
+};
+
+main().catch(error => {
+  console.error(error.message || error);
+  process.exitCode = 1;
+});
@@ -0,0 +1,13 @@
+// worker_threads worker for generate-schedules.mjs.
+// Messages in:  { taskIndex, task }   (a task from expandScheduleJobs)
+// Messages out: { taskIndex, result } or { taskIndex, error }
+import { parentPort } from 'node:worker_threads';
+import { runScheduleTask } from '../lib/scheduleBatch.mjs';
+
+parentPort.on('message', ({ taskIndex, task }) => {
+  try {
+    parentPort.postMessage({ taskIndex, result: runScheduleTask(task) });
+  } catch (error) {
+    parentPort.postMessage({ taskIndex, error: error?.message || String(error) });
+  }
+});
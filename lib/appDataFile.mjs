@@ -0,0 +1,152 @@
+// Reading and writing the app's save files.
+//
+// Files are the binary schedule format of scheduleGrid.mjs compressed with gzip (CompressionStream).
+// Reading also accepts uncompressed binary files and the JSON files of earlier versions, compressed or
+// not: the format is recognised from the content, not the file name. Everything here works in a worker
+// (see appDataFileWorker.mjs), so large backups are decompressed, parsed and validated off the main thread.
+import { normalizeStaffAvailability } from './availability.mjs';
+import { decodeScheduleFile, encodeScheduleFile, isScheduleFile } from './scheduleGrid.mjs';
+
+const INVALID_FILE_ERROR_NAME = 'InvalidAppDataFileError';
+const GZIP_MAGIC = [0x1f, 0x8b];
+
+// True for the error readAppDataFile rejects with when the file is readable but not valid app data
+export const isInvalidAppDataFile = (error) => error?.name === INVALID_FILE_ERROR_NAME;
+
+// Also used by the worker client to rebuild the error from a worker message
+export const createInvalidAppDataFileError = (message) => {
+  const error = new Error(message);
+  error.name = INVALID_FILE_ERROR_NAME;
+  return error;
+};
+
+const createInvalidFileError = (detail) => createInvalidAppDataFileError(`Invalid app data file: ${detail}`);
+
+// Whether `bytes` starts with the gzip header
+export const isGzipFile = (bytes) => bytes.length >= 2 && bytes[0] === GZIP_MAGIC[0] && bytes[1] === GZIP_MAGIC[1];
+
+// Reads a byte stream into one Uint8Array
+const collectBytes = async (stream) => {
+  const chunks = [];
+  let length = 0;
+  const reader = stream.getReader();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    chunks.push(value);
+    length += value.length;
+  }
+  const bytes = new Uint8Array(length);
+  let offset = 0;
+  chunks.forEach(chunk => {
+    bytes.set(chunk, offset);
+    offset += chunk.length;
+  });
+  return bytes;
+};
+
+// gzip-compresses `bytes`; returns them unchanged where CompressionStream is not available
+export const compressBytes = async (bytes) => {
+  if (typeof CompressionStream === 'undefined') return bytes;
+  return collectBytes(new Blob([bytes]).stream().pipeThrough(new CompressionStream('gzip')));
+};
+
+// A staff member as stored by any version of the app, with the fields added later filled in and
+// flexible availability converted to month bitmasks
+export const normalizeAppStaffMember = (member) => normalizeStaffAvailability({
+  ...member,
+  canWorkLateShift: member.canWorkLateShift !== undefined ? member.canWorkLateShift : true,
+  comments: member.comments !== undefined ? member.comments : '',
+});
+
+const isPlainObject = (value) => value !== null && typeof value === 'object' && !Array.isArray(value);
+
+// Checks the shape of loaded app data and fills in fields added in later versions.
+// Returns { staff, generatedShift, previousStaffNames, pinnedShiftDates, shiftSeeds }.
+export const validateAppData = (data) => {
+  if (!isPlainObject(data)) throw createInvalidFileError('not an object');
+  const { staff, generatedShift, previousStaffNames, pinnedShiftDates = [], shiftSeeds = {} } = data;
+
+  if (!Array.isArray(staff)) throw createInvalidFileError('staff is missing');
+  staff.forEach((member, index) => {
+    if (!isPlainObject(member) || typeof member.name !== 'string') {
+      throw createInvalidFileError(`staff[${index}] has no name`);
+    }
+  });
+  if (!isPlainObject(generatedShift)) throw createInvalidFileError('generatedShift is missing');
+  Object.entries(generatedShift).forEach(([date, shifts]) => {
+    if (!/^\d{4}-\d{2}-\d{2}$/.test(date) || !Array.isArray(shifts)) {
+      throw createInvalidFileError(`generatedShift has an invalid day ${date}`);
+    }
+    shifts.forEach(shift => {
+      if (!isPlainObject(shift) || typeof shift.staff !== 'string') {
+        throw createInvalidFileError(`generatedShift has an invalid shift on ${date}`);
+      }
+    });
+  });
+  if (!Array.isArray(previousStaffNames) || previousStaffNames.some(name => typeof name !== 'string')) {
+    throw createInvalidFileError('previousStaffNames is missing');
+  }
+  if (!Array.isArray(pinnedShiftDates)) throw createInvalidFileError('pinnedShiftDates is not a list');
+  if (!isPlainObject(shiftSeeds)) throw createInvalidFileError('shiftSeeds is not an object');
+
+  return {
+    staff: staff.map(normalizeAppStaffMember),
+    generatedShift,
+    previousStaffNames,
+    pinnedShiftDates,
+    shiftSeeds,
+  };
+};
+
+// Encodes a schedule and the other app data as a (compressed) save file
+export const encodeAppDataFile = async (schedule, appData) => compressBytes(encodeScheduleFile(schedule, appData));
+
+// Reads a save file (Blob or File) of any supported format. Progress is reported as
+// onProgress({ phase: 'read', done, total }) in bytes of the file, then onProgress({ phase: 'parse' }).
+// Rejects with an error for which isInvalidAppDataFile() is true when the content is not app data.
+export const readAppDataFile = async (file, { onProgress = () => {} } = {}) => {
+  const total = file.size;
+  const head = new Uint8Array(await file.slice(0, GZIP_MAGIC.length).arrayBuffer());
+
+  let done = 0;
+  const stream = file.stream().pipeThrough(new TransformStream({
+    transform(chunk, controller) {
+      done += chunk.length;
+      onProgress({ phase: 'read', done, total });
+      controller.enqueue(chunk);
+    },
+  }));
+  let bytes;
+  if (isGzipFile(head)) {
+    if (typeof DecompressionStream === 'undefined') {
+      throw new Error('This browser cannot read compressed files');
+    }
+    try {
+      bytes = await collectBytes(stream.pipeThrough(new DecompressionStream('gzip')));
+    } catch (error) {
+      throw createInvalidFileError('corrupt compressed data');
+    }
+  } else {
+    bytes = await collectBytes(stream);
+  }
+
+  onProgress({ phase: 'parse' });
+  let data;
+  if (isScheduleFile(bytes)) {
+    let decoded;
+    try {
+      decoded = decodeScheduleFile(bytes);
+    } catch (error) {
+      throw createInvalidFileError(error.message);
+    }
+    data = { ...decoded.appData, generatedShift: decoded.schedule };
+  } else {
+    try {
+      data = JSON.parse(new TextDecoder().decode(bytes));
+    } catch (error) {
+      throw createInvalidFileError('not JSON or a schedule file');
+    }
+  }
+  return validateAppData(data);
+};
@@ -0,0 +1,45 @@
+// Promise-based client for appDataFileWorker.mjs.
+// Falls back to reading on the main thread when module workers are not available.
+import { createInvalidAppDataFileError, readAppDataFile } from './appDataFile.mjs';
+
+const spawnAppDataFileWorker = () => {
+  if (typeof Worker === 'undefined') return null;
+  try {
+    return new Worker(new URL('./appDataFileWorker.mjs', import.meta.url), { type: 'module' });
+  } catch (error) {
+    console.warn('File worker could not be started, reading on the main thread:', error);
+    return null;
+  }
+};
+
+// Reads a save file -> Promise<app data> (see readAppDataFile). Loads are rare, so each one gets its own
+// worker, which is terminated when it settles.
+export const loadAppDataFile = (file, { onProgress = () => {} } = {}) => {
+  const worker = spawnAppDataFileWorker();
+  if (!worker) return readAppDataFile(file, { onProgress });
+
+  const requestId = 1;
+  return new Promise((resolve, reject) => {
+    worker.onmessage = (event) => {
+      const { type } = event.data;
+      if (event.data.requestId !== requestId) return;
+      if (type === 'progress') {
+        const { phase, done, total } = event.data;
+        onProgress({ phase, done, total });
+        return;
+      }
+      worker.terminate();
+      if (type === 'result') {
+        resolve(event.data.data);
+      } else if (type === 'error') {
+        const { message, invalid } = event.data;
+        reject(invalid ? createInvalidAppDataFileError(message) : new Error(message));
+      }
+    };
+    worker.onerror = (event) => {
+      worker.terminate();
+      reject(new Error(event.message || 'File worker failed'));
+    };
+    worker.postMessage({ type: 'read', requestId, file });
+  });
+};
@@ -0,0 +1,30 @@
+// Dedicated worker that reads save files off the main thread.
+//
+// Messages in:  { type: 'read', requestId, file }   (a File or Blob)
+// Messages out: { type: 'progress', requestId, phase, done, total }
+//               { type: 'result', requestId, data }   (validated app data, see readAppDataFile)
+//               { type: 'error', requestId, message, invalid }
+import { isInvalidAppDataFile, readAppDataFile } from './appDataFile.mjs';
+
+// Minimum interval between progress messages so the main thread is not flooded
+const PROGRESS_INTERVAL_MS = 50;
+
+self.onmessage = async (event) => {
+  const { type, requestId, file } = event.data;
+  if (type !== 'read') return;
+
+  let lastProgressAt = 0;
+  const onProgress = ({ phase, done, total }) => {
+    const now = Date.now();
+    if (phase === 'read' && done < total && now - lastProgressAt < PROGRESS_INTERVAL_MS) return;
+    lastProgressAt = now;
+    self.postMessage({ type: 'progress', requestId, phase, done, total });
+  };
+
+  try {
+    const data = await readAppDataFile(file, { onProgress });
+    self.postMessage({ type: 'result', requestId, data });
+  } catch (error) {
+    self.postMessage({ type: 'error', requestId, message: error?.message || String(error), invalid: isInvalidAppDataFile(error) });
+  }
+};
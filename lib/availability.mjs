@@ -0,0 +1,83 @@
+// Availability of flexible staff, stored as one bitmask per month: { 'YYYY-MM': mask }.
+// Bit (day - 1) is set when the staff member can work that day, so membership tests and
+// toggles are O(1) and a whole year of history is at most twelve numbers.
+
+const MONTH_KEY_PATTERN = /^\d{4}-\d{2}$/;
+
+const splitDateKey = (dateKey) => ({ monthKey: dateKey.slice(0, 7), bit: 1 << (Number(dateKey.slice(8, 10)) - 1) });
+
+// Whether the staff member is available on a 'YYYY-MM-DD' date
+export const isDateAvailable = (availability, dateKey) => {
+  const { monthKey, bit } = splitDateKey(dateKey);
+  return ((availability?.[monthKey] ?? 0) & bit) !== 0;
+};
+
+// Returns a new availability with the date flipped. Months without any available day are dropped.
+export const toggleDateAvailability = (availability, dateKey) => {
+  const { monthKey, bit } = splitDateKey(dateKey);
+  const mask = ((availability[monthKey] ?? 0) ^ bit) >>> 0;
+  const { [monthKey]: _previous, ...otherMonths } = availability;
+  return mask === 0 ? otherMonths : { ...otherMonths, [monthKey]: mask };
+};
+
+// Builds an availability from a list of 'YYYY-MM-DD' dates (the original array format)
+export const availabilityFromDates = (dates) => {
+  const availability = {};
+  dates.forEach(dateKey => {
+    const { monthKey, bit } = splitDateKey(dateKey);
+    availability[monthKey] = ((availability[monthKey] ?? 0) | bit) >>> 0;
+  });
+  return availability;
+};
+
+// Calls `callback(day)` for every available day (1-31) of a month, in ascending order
+export const forEachAvailableDay = (availability, monthKey, callback) => {
+  let mask = availability?.[monthKey] ?? 0;
+  while (mask !== 0) {
+    const lowestBit = mask & -mask;
+    callback(32 - Math.clz32(lowestBit));
+    mask = (mask ^ lowestBit) >>> 0;
+  }
+};
+
+// Lists every available date as 'YYYY-MM-DD', in ascending order
+export const availableDatesOf = (availability) => {
+  const dates = [];
+  Object.keys(availability).sort().forEach(monthKey => {
+    forEachAvailableDay(availability, monthKey, day => {
+      dates.push(`${monthKey}-${String(day).padStart(2, '0')}`);
+    });
+  });
+  return dates;
+};
+
+// Converts any stored form of flexible availability to month bitmasks.
+// Accepts the legacy array of dates (localStorage and files saved by older versions).
+export const normalizeFlexibleAvailability = (availability) => {
+  if (Array.isArray(availability)) {
+    return availabilityFromDates(availability.filter(dateKey => typeof dateKey === 'string'));
+  }
+  const normalized = {};
+  if (availability && typeof availability === 'object') {
+    Object.entries(availability).forEach(([monthKey, mask]) => {
+      if (MONTH_KEY_PATTERN.test(monthKey) && Number.isInteger(mask) && mask !== 0) {
+        normalized[monthKey] = mask >>> 0;
+      }
+    });
+  }
+  return normalized;
+};
+
+// Brings a staff member's availability into the shape its type expects
+// (fixed: weekday map, flexible: month bitmasks, anytime: true)
+export const normalizeStaffAvailability = (staffMember) => {
+  if (staffMember.type === 'flexible') {
+    return { ...staffMember, availability: normalizeFlexibleAvailability(staffMember.availability) };
+  }
+  if (staffMember.type === 'fixed') {
+    const availability = staffMember.availability;
+    const isWeekdayMap = availability && typeof availability === 'object' && !Array.isArray(availability);
+    return isWeekdayMap ? staffMember : { ...staffMember, availability: {} };
+  }
+  return staffMember.availability === true ? staffMember : { ...staffMember, availability: true };
+};
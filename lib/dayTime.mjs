@@ -0,0 +1,43 @@
+// Integer day numbers and minutes of day for the scheduling core.
+// Dates are days since 1970-01-01 and times minutes since midnight, so the engine compares and
+// subtracts numbers; 'YYYY-MM-DD' and 'HH:MM' strings only appear at the UI and storage boundaries.
+
+export const MINUTES_PER_DAY = 1440;
+const MS_PER_DAY = 86400000;
+// 1970-01-01 was a Thursday
+const EPOCH_WEEKDAY = 4;
+
+const pad2 = (value) => String(value).padStart(2, '0');
+
+// Day number of a calendar date (0-based month, like Date)
+export const toDayNumber = (year, month, day) => Math.floor(Date.UTC(year, month, day) / MS_PER_DAY);
+
+// Day number of a 'YYYY-MM-DD' key
+export const dayNumberOfKey = (dateKey) =>
+  toDayNumber(Number(dateKey.slice(0, 4)), Number(dateKey.slice(5, 7)) - 1, Number(dateKey.slice(8, 10)));
+
+// 'YYYY-MM-DD' key of a day number
+export const dateKeyOfDayNumber = (dayNumber) => {
+  const date = new Date(dayNumber * MS_PER_DAY);
+  return `${date.getUTCFullYear()}-${pad2(date.getUTCMonth() + 1)}-${pad2(date.getUTCDate())}`;
+};
+
+// Weekday of a day number (0 = Sunday, as Date.getDay())
+export const weekdayOfDayNumber = (dayNumber) => (((dayNumber + EPOCH_WEEKDAY) % 7) + 7) % 7;
+
+// Minutes since midnight of an 'HH:MM' time; NaN for an empty or malformed time
+export const parseTimeOfDay = (time) => {
+  const match = /^(\d{1,2}):(\d{2})$/.exec(time ?? '');
+  return match ? Number(match[1]) * 60 + Number(match[2]) : NaN;
+};
+
+// 'HH:MM' of a minute of day (wrapped into one day)
+export const formatTimeOfDay = (minutes) => {
+  const wrapped = ((minutes % MINUTES_PER_DAY) + MINUTES_PER_DAY) % MINUTES_PER_DAY;
+  return `${pad2(Math.floor(wrapped / 60))}:${pad2(wrapped % 60)}`;
+};
+
+// Length in minutes of an interval; an end at or before the start is on the next day
+export const intervalDuration = (startMinute, endMinute) =>
+  endMinute > startMinute ? endMinute - startMinute : endMinute + MINUTES_PER_DAY - startMinute;
+
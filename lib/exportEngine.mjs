@@ -0,0 +1,240 @@
+// Streaming export of shift tables.
+// Rows come from an iterable (one array of cell strings per row). Writers serialize them a chunk at a
+// time into Blob parts, yielding to the event loop between chunks, so year-long exports for the whole
+// roster neither build one giant string nor block the page. CSV and XLSX share the same row stream.
+
+import { getMonthModel } from './monthModel.mjs';
+import { buildDateStaffIndex, CLOSED_DAY_STAFF, formatDateKey } from './shiftScheduler.mjs';
+
+const CHUNK_ROWS = 200;
+
+const yieldToEventLoop = () => new Promise(resolve => setTimeout(resolve, 0));
+
+// Rows of the generated shift for every date in [startDate, endDate]: a header row, then one row per day
+// with each staff member's shifts as 'HH:MM-HH:MM' (several joined by ';'). Mondays are closed.
+export function* scheduleExportRows({ schedule, staffList, startDate, endDate, index = buildDateStaffIndex(schedule, staffList) }) {
+  const includeYear = startDate.getFullYear() !== endDate.getFullYear();
+  const firstDateKey = formatDateKey(startDate);
+  const lastDateKey = formatDateKey(endDate);
+  yield ['日付', ...staffList.map(s => s.name)];
+  const lastMonthIndex = endDate.getFullYear() * 12 + endDate.getMonth();
+  for (let monthIndex = startDate.getFullYear() * 12 + startDate.getMonth(); monthIndex <= lastMonthIndex; monthIndex++) {
+    const { year, month, days } = getMonthModel(Math.floor(monthIndex / 12), monthIndex % 12);
+    for (const day of days) {
+      if (day.dateKey < firstDateKey || day.dateKey > lastDateKey) continue;
+      const label = `${includeYear ? `${year}年` : ''}${month + 1}月${day.day}日 (${day.dayOfWeekName})`;
+      if (day.isClosed) {
+        yield [label, ...staffList.map(() => CLOSED_DAY_STAFF)];
+        continue;
+      }
+      const shiftsByStaff = index.get(day.dateKey);
+      yield [label, ...staffList.map(s => (shiftsByStaff?.get(s.id) || [])
+        .map(shift => `${shift.startTime || ''}-${shift.endTime || ''}`)
+        .join(';'))];
+    }
+  }
+}
+
+// Number of rows scheduleExportRows yields for a range (for progress reporting)
+export const countScheduleExportRows = (startDate, endDate) =>
+  Math.round((new Date(endDate.getFullYear(), endDate.getMonth(), endDate.getDate()) -
+    new Date(startDate.getFullYear(), startDate.getMonth(), startDate.getDate())) / 86400000) + 2;
+
+// Serializes rows chunk by chunk; `writeChunk(rows)` turns a chunk into Blob parts
+const writeRowChunks = async (rows, writeChunk, { totalRows, onProgress }) => {
+  let chunk = [];
+  let doneRows = 0;
+  for (const row of rows) {
+    chunk.push(row);
+    if (chunk.length === CHUNK_ROWS) {
+      writeChunk(chunk, doneRows);
+      doneRows += chunk.length;
+      chunk = [];
+      onProgress?.({ done: doneRows, total: totalRows });
+      await yieldToEventLoop();
+    }
+  }
+  if (chunk.length > 0) {
+    writeChunk(chunk, doneRows);
+    doneRows += chunk.length;
+    onProgress?.({ done: doneRows, total: totalRows });
+  }
+};
+
+const escapeCsvCell = (value) => {
+  const text = String(value ?? '');
+  return /[",\n\r]/.test(text) ? `"${text.replace(/"/g, '""')}"` : text;
+};
+
+// CSV (UTF-8 with BOM so spreadsheet apps detect the encoding)
+export const rowsToCsvBlob = async (rows, options = {}) => {
+  const parts = ['\uFEFF'];
+  await writeRowChunks(rows, (chunk) => {
+    parts.push(chunk.map(row => row.map(escapeCsvCell).join(',')).join('\n') + '\n');
+  }, options);
+  return new Blob(parts, { type: 'text/csv;charset=utf-8;' });
+};
+
+// --- XLSX ---------------------------------------------------------------------------------------------
+// A minimal workbook (one sheet of inline strings) in an uncompressed zip. Each file's CRC and size are
+// accumulated while its chunks are encoded, and its local header is filled in once the file is complete.
+
+const CRC_TABLE = (() => {
+  const table = new Uint32Array(256);
+  for (let n = 0; n < 256; n++) {
+    let c = n;
+    for (let k = 0; k < 8; k++) c = c & 1 ? 0xEDB88320 ^ (c >>> 1) : c >>> 1;
+    table[n] = c >>> 0;
+  }
+  return table;
+})();
+
+const updateCrc32 = (crc, bytes) => {
+  let c = crc ^ 0xFFFFFFFF;
+  for (let i = 0; i < bytes.length; i++) c = CRC_TABLE[(c ^ bytes[i]) & 0xFF] ^ (c >>> 8);
+  return (c ^ 0xFFFFFFFF) >>> 0;
+};
+
+const escapeXml = (text) => String(text ?? '')
+  .replace(/&/g, '&amp;').replace(/</g, '&lt;').replace(/>/g, '&gt;').replace(/"/g, '&quot;')
+  // Characters not allowed in XML 1.0
+  .replace(/[\u0000-\u0008\u000B\u000C\u000E-\u001F]/g, '');
+
+const columnName = (index) => {
+  let name = '';
+  for (let n = index + 1; n > 0; n = Math.floor((n - 1) / 26)) {
+    name = String.fromCharCode(65 + ((n - 1) % 26)) + name;
+  }
+  return name;
+};
+
+const createZipWriter = () => {
+  const encoder = new TextEncoder();
+  const parts = [];
+  const entries = [];
+  let offset = 0;
+
+  const header = (size) => {
+    const view = new DataView(new ArrayBuffer(size));
+    return { view, bytes: new Uint8Array(view.buffer) };
+  };
+
+  // Starts a file; returns { write(text), close() }
+  const open = (path) => {
+    const nameBytes = encoder.encode(path);
+    const entry = { nameBytes, crc: 0, size: 0, offset, headerIndex: parts.length };
+    parts.push(null); // local header, filled in by close()
+    offset += 30 + nameBytes.length;
+    return {
+      write: (text) => {
+        const bytes = encoder.encode(text);
+        entry.crc = updateCrc32(entry.crc, bytes);
+        entry.size += bytes.length;
+        offset += bytes.length;
+        parts.push(bytes);
+      },
+      close: () => {
+        const { view, bytes } = header(30 + nameBytes.length);
+        view.setUint32(0, 0x04034B50, true);
+        view.setUint16(4, 20, true); // version needed
+        view.setUint16(6, 0x0800, true); // UTF-8 names
+        view.setUint16(8, 0, true); // stored
+        view.setUint32(14, entry.crc, true);
+        view.setUint32(18, entry.size, true);
+        view.setUint32(22, entry.size, true);
+        view.setUint16(26, nameBytes.length, true);
+        bytes.set(nameBytes, 30);
+        parts[entry.headerIndex] = bytes;
+        entries.push(entry);
+      },
+    };
+  };
+
+  const addFile = (path, text) => {
+    const file = open(path);
+    file.write(text);
+    file.close();
+  };
+
+  const finish = (type) => {
+    const centralStart = offset;
+    entries.forEach(entry => {
+      const { view, bytes } = header(46 + entry.nameBytes.length);
+      view.setUint32(0, 0x02014B50, true);
+      view.setUint16(4, 20, true); // version made by
+      view.setUint16(6, 20, true); // version needed
+      view.setUint16(8, 0x0800, true);
+      view.setUint16(10, 0, true);
+      view.setUint32(16, entry.crc, true);
+      view.setUint32(20, entry.size, true);
+      view.setUint32(24, entry.size, true);
+      view.setUint16(28, entry.nameBytes.length, true);
+      view.setUint32(42, entry.offset, true);
+      bytes.set(entry.nameBytes, 46);
+      parts.push(bytes);
+      offset += bytes.length;
+    });
+    const { view, bytes } = header(22);
+    view.setUint32(0, 0x06054B50, true);
+    view.setUint16(8, entries.length, true);
+    view.setUint16(10, entries.length, true);
+    view.setUint32(12, offset - centralStart, true);
+    view.setUint32(16, centralStart, true);
+    parts.push(bytes);
+    return new Blob(parts, { type });
+  };
+
+  return { open, addFile, finish };
+};
+
+const XML_HEADER = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n';
+const SPREADSHEET_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main';
+const RELATIONSHIP_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships';
+
+// XLSX with a single sheet; the first row is frozen as a header
+export const rowsToXlsxBlob = async (rows, { sheetName = 'Sheet1', ...options } = {}) => {
+  const zip = createZipWriter();
+  zip.addFile('[Content_Types].xml', `${XML_HEADER}<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">`
+    + '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    + '<Default Extension="xml" ContentType="application/xml"/>'
+    + '<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    + '<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    + '</Types>');
+  zip.addFile('_rels/.rels', `${XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">`
+    + '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>'
+    + '</Relationships>');
+  zip.addFile('xl/workbook.xml', `${XML_HEADER}<workbook xmlns="${SPREADSHEET_NS}" xmlns:r="${RELATIONSHIP_NS}">`
+    + `<sheets><sheet name="${escapeXml(sheetName.slice(0, 31))}" sheetId="1" r:id="rId1"/></sheets></workbook>`);
+  zip.addFile('xl/_rels/workbook.xml.rels', `${XML_HEADER}<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">`
+    + '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>'
+    + '</Relationships>');
+
+  const sheet = zip.open('xl/worksheets/sheet1.xml');
+  sheet.write(`${XML_HEADER}<worksheet xmlns="${SPREADSHEET_NS}">`
+    + '<sheetViews><sheetView workbookViewId="0"><pane ySplit="1" topLeftCell="A2" activePane="bottomLeft" state="frozen"/></sheetView></sheetViews>'
+    + '<sheetData>');
+  await writeRowChunks(rows, (chunk, firstRowIndex) => {
+    sheet.write(chunk.map((row, i) => {
+      const rowNumber = firstRowIndex + i + 1;
+      const cells = row.map((value, column) =>
+        `<c r="${columnName(column)}${rowNumber}" t="inlineStr"><is><t xml:space="preserve">${escapeXml(value)}</t></is></c>`);
+      return `<row r="${rowNumber}">${cells.join('')}</row>`;
+    }).join(''));
+  }, options);
+  sheet.write('</sheetData></worksheet>');
+  sheet.close();
+
+  return zip.finish('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet');
+};
+
+// Saves a Blob through a temporary download link
+export const downloadBlob = (blob, filename) => {
+  const url = URL.createObjectURL(blob);
+  const link = document.createElement('a');
+  link.href = url;
+  link.download = filename;
+  document.body.appendChild(link);
+  link.click();
+  document.body.removeChild(link);
+  URL.revokeObjectURL(url);
+};
@@ -0,0 +1,132 @@
+// Data model of the Firestore variant. Under artifacts/{appId}/users/{uid}:
+//   staffs/{staffId}      one document per staff member ({ name, type, canWorkLate, availability, createdAt })
+//   schedules/{YYYY-MM}   { days: { 'YYYY-MM-DD': { staff: [{ name, time }], workingHours } } }
+// 選択 staff availability is keyed by 'YYYY-MM-DD', 固定 by weekday. Older versions kept everything in
+// shift_data/user_data with day-of-month keys, which limited history to a single month.
+
+import { availabilityFromDates } from './availability.mjs';
+import { getMonthModelDay } from './monthModel.mjs';
+import { formatDateKey, UNASSIGNED_STAFF } from './shiftScheduler.mjs';
+import { monthKeyOf } from './shiftStorage.mjs';
+
+export const STAFF_COLLECTION = 'staffs';
+export const SCHEDULE_COLLECTION = 'schedules';
+export const LEGACY_DOCUMENT_PATH = 'shift_data/user_data';
+
+export const staffDocumentPath = (staffId) => `${STAFF_COLLECTION}/${staffId}`;
+export const scheduleDocumentPath = (monthKey) => `${SCHEDULE_COLLECTION}/${monthKey}`;
+export const dayFieldPath = (dateKey) => `days.${dateKey}`;
+
+// Staff documents in the order they were added
+export const sortStaffs = (staffs) => [...staffs].sort((a, b) => (a.createdAt ?? 0) - (b.createdAt ?? 0));
+
+// Working hours shown for each weekday (the scheduler decides the required slots and assignments)
+export const WORKING_HOURS_PER_DAY = {
+  '火': ['18:00-22:00'],
+  '水': ['18:00-22:00'],
+  '木': ['18:00-22:00'],
+  '金': ['17:00-22:00'],
+  '土': ['17:00-22:00', '19:00-23:00'],
+  '日': ['17:00-22:00'],
+  '月': ['定休日'],
+};
+
+// Fields stored in a staff document (the id is the document id)
+export const toStaffDocument = ({ id, ...staff }) => staff;
+
+// Converts the legacy single document into the partitioned model. Day-of-month keys are placed in the
+// given month, since the legacy layout did not record which month they belonged to.
+export const fromLegacyShiftData = (data, year, month) => {
+  const toDateKey = (day) => formatDateKey(new Date(year, month, Number(day)));
+  const staffs = (data.staffs || []).map((staff, index) => ({
+    ...staff,
+    availability: staff.type === '選択'
+      ? Object.fromEntries(Object.entries(staff.availability || {})
+        .filter(([, isAvailable]) => isAvailable)
+        .map(([day]) => [toDateKey(day), true]))
+      : staff.availability || {},
+    createdAt: index,
+  }));
+  const days = Object.fromEntries(Object.entries(data.generatedShift || {}).map(([day, entry]) => [toDateKey(day), entry]));
+  return { staffs, monthKey: monthKeyOf(new Date(year, month, 1)), days };
+};
+
+// Structural equality for Firestore data (plain objects, arrays and primitives)
+const isSameData = (a, b) => {
+  if (a === b) return true;
+  if (typeof a !== 'object' || typeof b !== 'object' || a === null || b === null) return false;
+  if (Array.isArray(a) !== Array.isArray(b)) return false;
+  const keys = Object.keys(a);
+  if (keys.length !== Object.keys(b).length) return false;
+  return keys.every(key => Object.prototype.hasOwnProperty.call(b, key) && isSameData(a[key], b[key]));
+};
+
+// Applies an incoming staff list to the local one: unchanged staff keep their object, and the local
+// array itself is returned when nothing changed, so state updates and memoized rows can be skipped
+export const reconcileStaffs = (localStaffs, incomingStaffs) => {
+  const localById = new Map(localStaffs.map(staff => [staff.id, staff]));
+  let changed = localStaffs.length !== incomingStaffs.length;
+  const staffs = incomingStaffs.map((staff, index) => {
+    const local = localById.get(staff.id);
+    if (local && isSameData(local, staff)) {
+      if (localStaffs[index] !== local) changed = true;
+      return local;
+    }
+    changed = true;
+    return staff;
+  });
+  return changed ? staffs : localStaffs;
+};
+
+// Same for a month's days ({ 'YYYY-MM-DD': entry }): unchanged days keep their entry object
+export const reconcileDays = (localDays = {}, incomingDays) => {
+  let changed = Object.keys(localDays).length !== Object.keys(incomingDays).length;
+  const days = {};
+  Object.entries(incomingDays).forEach(([dateKey, entry]) => {
+    const local = localDays[dateKey];
+    if (local && isSameData(local, entry)) {
+      days[dateKey] = local;
+    } else {
+      days[dateKey] = entry;
+      changed = true;
+    }
+  });
+  return changed ? days : localDays;
+};
+
+// Converts staff documents to the scheduler's input shape (選択 -> flexible, 固定 -> fixed, others -> anytime)
+export const toSchedulerStaff = (staffs) => staffs.map(staff => {
+  const base = { id: staff.id, name: staff.name, canWorkLateShift: staff.canWorkLate, comments: '' };
+  if (staff.type === '選択') {
+    const availableDates = Object.entries(staff.availability || {})
+      .filter(([, isAvailable]) => isAvailable)
+      .map(([dateKey]) => dateKey);
+    return { ...base, type: 'flexible', availability: availabilityFromDates(availableDates) };
+  }
+  if (staff.type === '固定') {
+    return { ...base, type: 'fixed', availability: { ...staff.availability } };
+  }
+  return { ...base, type: 'anytime', availability: true };
+});
+
+// Converts a generated schedule to the days of a schedule document (both keyed by 'YYYY-MM-DD').
+// Mondays are closed; days without any assigned staff are marked 未定.
+export const fromSchedulerSchedule = (schedule) => {
+  const days = {};
+  Object.entries(schedule).forEach(([dateKey, shifts]) => {
+    const dayOfWeek = getMonthModelDay(dateKey).dayOfWeekName;
+    const entry = { staff: [], workingHours: WORKING_HOURS_PER_DAY[dayOfWeek] || ['ー'] };
+    if (dayOfWeek === '月') {
+      entry.staff.push({ name: '定休日', time: '定休日' });
+    } else {
+      shifts
+        .filter(shift => shift.staff !== UNASSIGNED_STAFF)
+        .forEach(shift => entry.staff.push({ name: shift.staff, time: `${shift.startTime}-${shift.endTime}` }));
+      if (entry.staff.length === 0) {
+        entry.staff.push({ name: '未定', time: 'ー' });
+      }
+    }
+    days[dateKey] = entry;
+  });
+  return days;
+};
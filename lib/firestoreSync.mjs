@@ -0,0 +1,143 @@
+// Coalescing write queue for the Firestore variant.
+// Mutations are queued per document as { 'field.path': value } updates (or null to delete the document).
+// Updates arriving within a short window are merged, and each flush sends only the queued field paths of
+// every touched document in one batch. A later update to the same path replaces the earlier one; an update
+// to a parent path replaces queued updates below it.
+
+const DEFAULT_COALESCE_MS = 300;
+
+const isBelow = (path, parentPath) => path.startsWith(`${parentPath}.`);
+
+// Applies a nested update (path relative to `value`) to a copy of a queued map value.
+// Delete markers cannot appear inside a map value, so a deleted path is removed from the copy instead.
+const setNested = (value, relativePath, nestedValue, deleteValue) => {
+  const [head, ...rest] = relativePath.split('.');
+  const copy = { ...(value && typeof value === 'object' ? value : {}) };
+  if (rest.length > 0) {
+    copy[head] = setNested(copy[head], rest.join('.'), nestedValue, deleteValue);
+  } else if (deleteValue !== undefined && nestedValue === deleteValue) {
+    delete copy[head];
+  } else {
+    copy[head] = nestedValue;
+  }
+  return copy;
+};
+
+// Field updates for the days whose entries changed between two shift maps ({ [dateKey]: entry }).
+// Entries are compared by reference; removed days get `deleteValue` (Firestore's deleteField()).
+export const diffShiftFields = (previousShift, nextShift, deleteValue, prefix = 'days') => {
+  const fields = {};
+  Object.keys(nextShift).forEach(day => {
+    if (previousShift[day] !== nextShift[day]) fields[`${prefix}.${day}`] = nextShift[day];
+  });
+  Object.keys(previousShift).forEach(day => {
+    if (!(day in nextShift)) fields[`${prefix}.${day}`] = deleteValue;
+  });
+  return fields;
+};
+
+// Converts { 'a.b': value } field updates into nested data ({ a: { b: value } }) for a merging set,
+// used when the document does not exist yet and cannot be updated by field path
+export const fieldsToNestedData = (fields) => {
+  let data = {};
+  Object.entries(fields).forEach(([path, value]) => {
+    data = setNested(data, path, value);
+  });
+  return data;
+};
+
+// Merges field updates into the fields already queued for one document
+const mergeFields = (queuedFields, fields, deleteValue) => {
+  const merged = { ...queuedFields };
+  Object.entries(fields).forEach(([path, value]) => {
+    Object.keys(merged).forEach(queuedPath => {
+      if (isBelow(queuedPath, path)) delete merged[queuedPath];
+    });
+    const ancestor = Object.keys(merged).find(queuedPath => isBelow(path, queuedPath));
+    if (ancestor) {
+      merged[ancestor] = setNested(merged[ancestor], path.slice(ancestor.length + 1), value, deleteValue);
+    } else {
+      merged[path] = value;
+    }
+  });
+  return merged;
+};
+
+// Creates a queue that sends coalesced updates through `write([[documentPath, fields | null], ...]) -> Promise`.
+// `write` may be null until the connection is ready (see setWrite); updates queued meanwhile are kept and sent
+// once a writer is set. `deleteValue` is the backend's delete marker (deleteField()).
+// onPendingChange(updates) receives every update not yet acknowledged (in flight, then queued, in order) so it
+// can be persisted and replayed with enqueue after a reload. onFlushed({ documents, durationMs }) and
+// onError(error, updates) report the outcome of each write.
+export const createCoalescingWriteQueue = ({
+  write = null,
+  deleteValue,
+  coalesceMs = DEFAULT_COALESCE_MS,
+  onPendingChange = () => {},
+  onFlushed = () => {},
+  onError = () => {},
+}) => {
+  let writer = write;
+  let queued = new Map(); // documentPath -> fields, or null when the document is deleted
+  const inFlightBatches = new Set();
+  let timer = null;
+  let inFlight = Promise.resolve();
+
+  const reportPending = () => {
+    onPendingChange([...[...inFlightBatches].flat(), ...queued]);
+  };
+
+  // Queues field updates for a document; `fields` null deletes the document
+  const enqueue = (documentPath, fields) => {
+    if (fields === null) {
+      queued.set(documentPath, null);
+    } else {
+      queued.set(documentPath, mergeFields(queued.get(documentPath) || {}, fields, deleteValue));
+    }
+    reportPending();
+    clearTimeout(timer);
+    timer = setTimeout(flush, coalesceMs);
+  };
+
+  // Sends everything queued so far; flushes are sent one at a time in queue order
+  const flush = () => {
+    clearTimeout(timer);
+    timer = null;
+    if (!writer || queued.size === 0) return inFlight;
+    const updates = [...queued];
+    const send = writer;
+    queued = new Map();
+    inFlightBatches.add(updates);
+    inFlight = inFlight.then(async () => {
+      const startedAt = performance.now();
+      try {
+        await send(updates);
+        onFlushed({ documents: updates.map(([documentPath]) => documentPath), durationMs: performance.now() - startedAt });
+      } catch (error) {
+        onError(error, updates);
+      } finally {
+        inFlightBatches.delete(updates);
+        reportPending();
+      }
+    });
+    return inFlight;
+  };
+
+  // Sets (or clears, with null) the writer; anything queued while there was none is sent right away
+  const setWrite = (nextWrite) => {
+    writer = nextWrite;
+    if (writer) flush();
+  };
+
+  const hasPending = () => queued.size > 0 || inFlightBatches.size > 0;
+
+  // Drops queued updates that have not been sent (e.g. they belong to another signed-in user)
+  const clear = () => {
+    clearTimeout(timer);
+    timer = null;
+    queued = new Map();
+    reportPending();
+  };
+
+  return { enqueue, flush, setWrite, hasPending, clear };
+};
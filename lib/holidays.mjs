@@ -0,0 +1,145 @@
+// Japanese national holidays computed from the statutory rules (国民の祝日に関する法律).
+// Each year is computed once and cached as a day-of-year bitmap, so lookups are O(1).
+// The rules cover 2000-2099 (equinox formula range); the 2019-2021 one-off changes are included.
+
+const yearCache = new Map();
+
+const pad2 = (value) => String(value).padStart(2, '0');
+
+// Day-of-year index (0-based) used by the bitmap; months are 1-based
+const dayOfYear = (year, month, day) => {
+  const start = Date.UTC(year, 0, 1);
+  return Math.round((Date.UTC(year, month - 1, day) - start) / 86400000);
+};
+
+// Day of month of the n-th Monday
+const nthMonday = (year, month, n) => {
+  const firstWeekday = new Date(Date.UTC(year, month - 1, 1)).getUTCDay();
+  const firstMonday = 1 + ((8 - firstWeekday) % 7);
+  return firstMonday + (n - 1) * 7;
+};
+
+const vernalEquinoxDay = (year) =>
+  Math.floor(20.8431 + 0.242194 * (year - 1980) - Math.floor((year - 1980) / 4));
+
+const autumnalEquinoxDay = (year) =>
+  Math.floor(23.2488 + 0.242194 * (year - 1980) - Math.floor((year - 1980) / 4));
+
+// National holidays proper (祝日) of a year as [month, day, name]
+const statutoryHolidays = (year) => {
+  const holidays = [
+    [1, 1, '元日'],
+    [1, nthMonday(year, 1, 2), '成人の日'],
+    [2, 11, '建国記念の日'],
+    [3, vernalEquinoxDay(year), '春分の日'],
+    [4, 29, year >= 2007 ? '昭和の日' : 'みどりの日'],
+    [5, 3, '憲法記念日'],
+    [5, 5, 'こどもの日'],
+    [9, autumnalEquinoxDay(year), '秋分の日'],
+    [11, 3, '文化の日'],
+    [11, 23, '勤労感謝の日'],
+  ];
+
+  if (year >= 2020) {
+    holidays.push([2, 23, '天皇誕生日']);
+  } else if (year <= 2018) {
+    holidays.push([12, 23, '天皇誕生日']);
+  }
+
+  if (year >= 2007) {
+    holidays.push([5, 4, 'みどりの日']);
+  }
+
+  // Olympic years moved 海の日, 山の日 and スポーツの日
+  if (year === 2020) {
+    holidays.push([7, 23, '海の日'], [7, 24, 'スポーツの日'], [8, 10, '山の日']);
+  } else if (year === 2021) {
+    holidays.push([7, 22, '海の日'], [7, 23, 'スポーツの日'], [8, 8, '山の日']);
+  } else {
+    holidays.push([7, year >= 2003 ? nthMonday(year, 7, 3) : 20, '海の日']);
+    holidays.push([10, nthMonday(year, 10, 2), year >= 2020 ? 'スポーツの日' : '体育の日']);
+    if (year >= 2016) {
+      holidays.push([8, 11, '山の日']);
+    }
+  }
+
+  holidays.push([9, year >= 2003 ? nthMonday(year, 9, 3) : 15, '敬老の日']);
+
+  if (year === 2019) {
+    holidays.push([5, 1, '天皇の即位の日'], [10, 22, '即位礼正殿の儀の行われる日']);
+  }
+  return holidays;
+};
+
+// Computes every holiday of a year, including 国民の休日 and 振替休日
+const computeYear = (year) => {
+  const daysInYear = dayOfYear(year, 12, 31) + 1;
+  const names = new Map();
+  statutoryHolidays(year).forEach(([month, day, name]) => {
+    names.set(dayOfYear(year, month, day), name);
+  });
+  const statutory = new Set(names.keys());
+
+  // A day between two national holidays is itself a holiday
+  statutory.forEach(index => {
+    if (statutory.has(index + 2) && !statutory.has(index + 1) && index + 1 < daysInYear) {
+      names.set(index + 1, '国民の休日');
+    }
+  });
+
+  // A national holiday on a Sunday moves to the next day that is not a national holiday
+  const jan1Weekday = new Date(Date.UTC(year, 0, 1)).getUTCDay();
+  statutory.forEach(index => {
+    if ((jan1Weekday + index) % 7 !== 0) return;
+    let substitute = index + 1;
+    while (statutory.has(substitute)) substitute++;
+    if (substitute < daysInYear) {
+      names.set(substitute, '振替休日');
+    }
+  });
+
+  const bitmap = new Uint8Array(daysInYear);
+  names.forEach((_name, index) => {
+    bitmap[index] = 1;
+  });
+  return { bitmap, names };
+};
+
+const getYear = (year) => {
+  let entry = yearCache.get(year);
+  if (!entry) {
+    entry = computeYear(year);
+    yearCache.set(year, entry);
+  }
+  return entry;
+};
+
+// Whether a local Date falls on a Japanese holiday
+export const isJapaneseHoliday = (date) => {
+  if (!date) return false;
+  const year = date.getFullYear();
+  return getYear(year).bitmap[dayOfYear(year, date.getMonth() + 1, date.getDate())] === 1;
+};
+
+// Whether a 'YYYY-MM-DD' date is a Japanese holiday
+export const isJapaneseHolidayKey = (dateKey) => {
+  const year = Number(dateKey.slice(0, 4));
+  return getYear(year).bitmap[dayOfYear(year, Number(dateKey.slice(5, 7)), Number(dateKey.slice(8, 10)))] === 1;
+};
+
+// Name of the holiday on a 'YYYY-MM-DD' date, or null
+export const getJapaneseHolidayName = (dateKey) => {
+  const year = Number(dateKey.slice(0, 4));
+  return getYear(year).names.get(dayOfYear(year, Number(dateKey.slice(5, 7)), Number(dateKey.slice(8, 10)))) ?? null;
+};
+
+// All holidays of a year as [{ date: 'YYYY-MM-DD', name }], in date order
+export const getJapaneseHolidays = (year) => {
+  const { names } = getYear(year);
+  return [...names.entries()]
+    .sort(([a], [b]) => a - b)
+    .map(([index, name]) => {
+      const date = new Date(Date.UTC(year, 0, 1 + index));
+      return { date: `${year}-${pad2(date.getUTCMonth() + 1)}-${pad2(date.getUTCDate())}`, name };
+    });
+};
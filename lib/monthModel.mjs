@@ -0,0 +1,79 @@
+// Calendar facts of a month (date keys, weekdays, holidays, half-period), computed once per month.
+// Models are immutable and kept in a small LRU cache, so rendering, month navigation and shift
+// generation share them instead of re-deriving Dates and keys for every cell and slot.
+import { toDayNumber } from './dayTime.mjs';
+import { getJapaneseHolidayName, isJapaneseHolidayKey } from './holidays.mjs';
+
+// List of days of the week (corresponds to Date.getDay() result)
+export const DAYS_OF_WEEK = ['日', '月', '火', '水', '木', '金', '土'];
+// Weekday of the regular closing day (Monday)
+export const CLOSED_WEEKDAY = 1;
+// Cells of a six-week calendar grid
+export const CALENDAR_CELL_COUNT = 42;
+
+// Months kept in the cache (a year on either side of normal navigation is plenty)
+const MONTH_MODEL_CACHE_SIZE = 24;
+const cache = new Map();
+
+const pad2 = (value) => String(value).padStart(2, '0');
+
+const buildMonthModel = (year, month) => {
+  const monthKey = `${year}-${pad2(month + 1)}`;
+  const daysInMonth = new Date(year, month + 1, 0).getDate();
+  const firstWeekday = new Date(year, month, 1).getDay();
+  const firstDayNumber = toDayNumber(year, month, 1);
+  // Last day of the first half, as used by the first_half / second_half generation periods
+  const firstHalfEndDay = Math.floor(daysInMonth / 2);
+
+  const days = [];
+  for (let day = 1; day <= daysInMonth; day++) {
+    const dateKey = `${monthKey}-${pad2(day)}`;
+    const weekday = (firstWeekday + day - 1) % 7;
+    const isHoliday = isJapaneseHolidayKey(dateKey);
+    days.push(Object.freeze({
+      day,
+      dateKey,
+      // Days since 1970-01-01, for arithmetic on dates
+      dayNumber: firstDayNumber + day - 1,
+      date: new Date(year, month, day),
+      weekday,
+      dayOfWeekName: DAYS_OF_WEEK[weekday],
+      isClosed: weekday === CLOSED_WEEKDAY,
+      isHoliday,
+      holidayName: isHoliday ? getJapaneseHolidayName(dateKey) : null,
+      half: day <= firstHalfEndDay ? 'first_half' : 'second_half',
+    }));
+  }
+
+  const calendarCells = Array.from({ length: CALENDAR_CELL_COUNT }, (_, index) => days[index - firstWeekday] || null);
+
+  return Object.freeze({
+    year,
+    month,
+    monthKey,
+    daysInMonth,
+    firstWeekday,
+    firstHalfEndDay,
+    days: Object.freeze(days),
+    calendarCells: Object.freeze(calendarCells),
+  });
+};
+
+// The model of a month (0-based `month`; out-of-range months roll over like Date does)
+export const getMonthModel = (year, month) => {
+  const key = year * 12 + month;
+  let model = cache.get(key);
+  if (model) {
+    // Move to the most recently used end
+    cache.delete(key);
+  } else {
+    model = buildMonthModel(Math.floor(key / 12), ((key % 12) + 12) % 12);
+    if (cache.size >= MONTH_MODEL_CACHE_SIZE) cache.delete(cache.keys().next().value);
+  }
+  cache.set(key, model);
+  return model;
+};
+
+// The model entry of one 'YYYY-MM-DD' date
+export const getMonthModelDay = (dateKey) =>
+  getMonthModel(Number(dateKey.slice(0, 4)), Number(dateKey.slice(5, 7)) - 1).days[Number(dateKey.slice(8, 10)) - 1];
@@ -0,0 +1,69 @@
+// Offline copy of the Firestore variant's data, kept in IndexedDB (localStorage as a fallback).
+// The app renders from it at startup without waiting for sign-in or the network, then reconciles with
+// Firestore snapshots in the background. It holds the staff list, every month seen so far, the updates
+// not yet acknowledged by Firestore (replayed after a reload) and the user the data belongs to.
+// The cache is stamped with OFFLINE_CACHE_VERSION; a cache written by another version is not read.
+// Pending writes are stored with field deletes as DELETED_FIELD_MARKER: the backend's delete sentinel
+// (deleteField()) does not survive structured clone or JSON, so it is swapped in and out around storage.
+
+import { shiftMonthStorageKey } from './shiftStorage.mjs';
+
+// 2: field deletes in pending writes are stored as DELETED_FIELD_MARKER
+export const OFFLINE_CACHE_VERSION = 2;
+
+export const OFFLINE_CACHE_BACKEND_OPTIONS = {
+  dbName: 'shiftAutoGenerationCache',
+  keyPrefix: 'shiftAutoGeneration:',
+  migrateLocalStorage: false,
+};
+
+export const CACHE_VERSION_KEY = 'cacheVersion';
+export const CACHE_OWNER_KEY = 'cacheOwner';
+export const CACHE_STAFF_KEY = 'staff';
+export const CACHE_PENDING_WRITES_KEY = 'pendingWrites';
+export const cacheMonthKey = shiftMonthStorageKey;
+
+export const DELETED_FIELD_MARKER = Object.freeze({ $offlineCache: 'deleteField' });
+
+const isDeletedFieldMarker = (value) => value?.$offlineCache === DELETED_FIELD_MARKER.$offlineCache;
+
+// Maps the field values of [[documentPath, fields | null], ...] updates (null deletes the document)
+const mapPendingFields = (updates, mapValue) => updates.map(([documentPath, fields]) => [
+  documentPath,
+  fields === null
+    ? null
+    : Object.fromEntries(Object.entries(fields).map(([path, value]) => [path, mapValue(value)])),
+]);
+
+// Pending writes in their storable form: field values equal to `deleteValue` become DELETED_FIELD_MARKER
+export const encodePendingWrites = (updates, deleteValue) =>
+  mapPendingFields(updates, value => (value === deleteValue ? DELETED_FIELD_MARKER : value));
+
+// Pending writes read from the cache, with DELETED_FIELD_MARKER turned back into `deleteValue`
+export const decodePendingWrites = (updates, deleteValue) =>
+  mapPendingFields(updates, value => (isDeletedFieldMarker(value) ? deleteValue : value));
+
+// Reads the cached staff, the given months and pending writes (still encoded, see decodePendingWrites);
+// null when there is no usable cache
+export const readOfflineCache = async (backend, monthKeys) => {
+  if ((await backend.read(CACHE_VERSION_KEY)) !== OFFLINE_CACHE_VERSION) {
+    await backend.writeBatch([
+      [CACHE_VERSION_KEY, OFFLINE_CACHE_VERSION],
+      [CACHE_OWNER_KEY, undefined],
+      [CACHE_STAFF_KEY, undefined],
+      [CACHE_PENDING_WRITES_KEY, undefined],
+    ]);
+    return null;
+  }
+  const [ownerId, staffs, pendingWrites, ...months] = await Promise.all([
+    backend.read(CACHE_OWNER_KEY),
+    backend.read(CACHE_STAFF_KEY),
+    backend.read(CACHE_PENDING_WRITES_KEY),
+    ...monthKeys.map(monthKey => backend.read(cacheMonthKey(monthKey))),
+  ]);
+  const shiftMonths = {};
+  monthKeys.forEach((monthKey, i) => {
+    if (months[i]) shiftMonths[monthKey] = months[i];
+  });
+  return { ownerId: ownerId || null, staffs: staffs || [], pendingWrites: pendingWrites || [], shiftMonths };
+};
@@ -0,0 +1,113 @@
+// Write-behind persistence for app state.
+// Callers hand over the latest value of a partition (one storage key) on every change; nothing is
+// written until a flush, which runs once changes have settled and the browser is idle, or right
+// away when the page is hidden or unloaded. Only partitions that changed since the last flush are written,
+// as one batch to the storage backend (see storageBackend.mjs).
+
+const DEFAULT_DELAY_MS = 400;
+const IDLE_TIMEOUT_MS = 2000;
+// Delay before a failed batch is written again
+const RETRY_DELAY_MS = 5000;
+
+const now = () => (typeof performance !== 'undefined' ? performance.now() : Date.now());
+
+// Creates a write-behind store on top of a storage backend.
+// onFlush({ keys, entries, durationMs, error }) is called after every flush that wrote something;
+// `entries` are the [key, value] pairs of the batch.
+export const createWriteBehindStore = ({ backend, delayMs = DEFAULT_DELAY_MS, onFlush = () => {} }) => {
+  const pending = new Map(); // key -> latest value (undefined removes the key)
+  const lastWritten = new Map(); // key -> value reference that is already in storage
+  const stats = { flushCount: 0, totalDurationMs: 0, lastFlush: null };
+  let delayTimer = null;
+  let idleHandle = null;
+
+  const cancelScheduledFlush = () => {
+    clearTimeout(delayTimer);
+    delayTimer = null;
+    if (idleHandle !== null && typeof cancelIdleCallback === 'function') {
+      cancelIdleCallback(idleHandle);
+    }
+    idleHandle = null;
+  };
+
+  // Writes all pending partitions in one batch; resolves with the flush report (null if nothing was pending)
+  const flush = () => {
+    cancelScheduledFlush();
+    if (pending.size === 0) return Promise.resolve(null);
+
+    const entries = [...pending];
+    pending.clear();
+    const startedAt = now();
+    const finish = (error) => {
+      if (error) {
+        // Typically a quota error; the batch is queued again unless newer values replaced it meanwhile
+        console.error(`Failed to persist ${entries.map(([key]) => key).join(', ')}:`, error);
+        entries.forEach(([key, value]) => {
+          if (!pending.has(key)) pending.set(key, value);
+        });
+        scheduleFlush(RETRY_DELAY_MS);
+      } else {
+        entries.forEach(([key, value]) => lastWritten.set(key, value));
+      }
+      const report = { keys: entries.map(([key]) => key), entries, durationMs: now() - startedAt, error: error || null };
+      stats.flushCount++;
+      stats.totalDurationMs += report.durationMs;
+      stats.lastFlush = report;
+      onFlush(report);
+      return report;
+    };
+    try {
+      return Promise.resolve(backend.writeBatch(entries)).then(() => finish(null), finish);
+    } catch (error) {
+      return Promise.resolve(finish(error));
+    }
+  };
+
+  const scheduleFlush = (delay = delayMs) => {
+    cancelScheduledFlush();
+    delayTimer = setTimeout(() => {
+      delayTimer = null;
+      if (typeof requestIdleCallback === 'function') {
+        idleHandle = requestIdleCallback(() => {
+          idleHandle = null;
+          flush();
+        }, { timeout: IDLE_TIMEOUT_MS });
+      } else {
+        flush();
+      }
+    }, delay);
+  };
+
+  // Records the latest value of a partition; it is written on the next flush
+  const set = (key, value) => {
+    if (!pending.has(key) && lastWritten.has(key) && lastWritten.get(key) === value) return;
+    pending.set(key, value);
+    scheduleFlush();
+  };
+
+  // Removes a partition from storage on the next flush
+  const remove = (key) => set(key, undefined);
+
+  // Marks values as already stored (e.g. just read at startup) so they are not written back unchanged
+  const seed = (values) => {
+    Object.entries(values).forEach(([key, value]) => lastWritten.set(key, value));
+  };
+
+  // Flushes when the page is hidden or unloaded; returns a function that removes the listeners
+  const attachPageLifecycle = () => {
+    if (typeof document === 'undefined') return () => {};
+    const handleVisibilityChange = () => {
+      if (document.visibilityState === 'hidden') flush();
+    };
+    document.addEventListener('visibilitychange', handleVisibilityChange);
+    window.addEventListener('pagehide', flush);
+    return () => {
+      document.removeEventListener('visibilitychange', handleVisibilityChange);
+      window.removeEventListener('pagehide', flush);
+    };
+  };
+
+  const getStats = () => ({ ...stats, pendingKeys: [...pending.keys()] });
+
+  return { set, remove, seed, flush, attachPageLifecycle, getStats };
+};
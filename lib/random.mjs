@@ -0,0 +1,27 @@
+// Seedable pseudo-random numbers for shift generation.
+// The same seed always gives the same sequence, so a generated schedule can be reproduced exactly.
+
+// Seeds are unsigned 32-bit integers
+export const normalizeSeed = (seed) => Number(seed) >>> 0;
+
+// Parses a seed typed by the user; returns null for an empty or invalid value
+export const parseSeed = (text) => {
+  const trimmed = String(text ?? '').trim();
+  if (!/^\d+$/.test(trimmed)) return null;
+  return normalizeSeed(trimmed);
+};
+
+// A fresh seed for runs where none was given
+export const createRandomSeed = () => Math.floor(Math.random() * 0x100000000);
+
+// Returns a mulberry32 generator: () -> float in [0, 1), like Math.random
+export const createSeededRandom = (seed) => {
+  let state = normalizeSeed(seed);
+  return () => {
+    state = (state + 0x6d2b79f5) >>> 0;
+    let t = state;
+    t = Math.imul(t ^ (t >>> 15), t | 1);
+    t ^= t + Math.imul(t ^ (t >>> 7), t | 61);
+    return ((t ^ (t >>> 14)) >>> 0) / 0x100000000;
+  };
+};
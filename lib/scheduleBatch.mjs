@@ -0,0 +1,54 @@
+// Batch scheduling of many stores and months from plain JSON jobs (used by bin/generate-schedules.mjs).
+//
+// A job file holds one job or an array of jobs:
+//   { name, months: ['YYYY-MM'], staff | staffs, period?, mode?, holidays?, seed? }
+// `staff` is the app's staff list (as in its saved files); `staffs` is the Firestore variant's staff
+// documents, whose results are returned as schedule document days. Every (job, month) is one task.
+// App staff is normalized like a loaded save file, so rosters of earlier versions (flexible availability
+// as date arrays) schedule correctly.
+import { normalizeAppStaffMember } from './appDataFile.mjs';
+import { fromSchedulerSchedule, toSchedulerStaff } from './firestoreModel.mjs';
+import { generateSchedule } from './shiftScheduler.mjs';
+
+const MONTH_KEY_PATTERN = /^\d{4}-\d{2}$/;
+
+// Splits the jobs of one file into tasks; throws on a job that cannot be scheduled
+export const expandScheduleJobs = (jobs, sourceName) => (Array.isArray(jobs) ? jobs : [jobs]).flatMap((job, jobIndex) => {
+  const name = job.name || (Array.isArray(jobs) ? `${sourceName}#${jobIndex + 1}` : sourceName);
+  const format = Array.isArray(job.staffs) ? 'firestore' : 'app';
+  if (format === 'app' && !Array.isArray(job.staff)) {
+    throw new Error(`${name}: a job needs a "staff" or "staffs" list`);
+  }
+  if (format === 'app' && job.staff.some(member => !member || typeof member.name !== 'string')) {
+    throw new Error(`${name}: every staff member needs a name`);
+  }
+  const months = job.months || [];
+  const staff = format === 'firestore' ? toSchedulerStaff(job.staffs) : job.staff.map(normalizeAppStaffMember);
+  if (months.length === 0 || !months.every(monthKey => MONTH_KEY_PATTERN.test(monthKey))) {
+    throw new Error(`${name}: "months" must list 'YYYY-MM' keys`);
+  }
+
+  return months.map(monthKey => ({
+    name,
+    format,
+    monthKey,
+    input: {
+      staff,
+      year: Number(monthKey.slice(0, 4)),
+      month: Number(monthKey.slice(5, 7)) - 1,
+      // The Firestore variant schedules whole months without public holidays
+      period: format === 'firestore' ? 'full_month' : job.period,
+      holidays: format === 'firestore' ? job.holidays ?? [] : job.holidays,
+      mode: job.mode,
+      seed: job.seed,
+    },
+  }));
+});
+
+// Runs one task: { name, monthKey, schedule (or days for Firestore jobs), stats }
+export const runScheduleTask = ({ name, format, monthKey, input }) => {
+  const { schedule, stats } = generateSchedule(input);
+  return format === 'firestore'
+    ? { name, monthKey, days: fromSchedulerSchedule(schedule), stats }
+    : { name, monthKey, schedule, stats };
+};
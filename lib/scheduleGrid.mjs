@@ -0,0 +1,192 @@
+// Compact schedule representation: a days x slots grid of typed arrays with side tables for strings.
+//
+// Days are stored in day-number order with a CSR layout: the slots of day d are
+// [slotOffsets[d], slotOffsets[d + 1]). Each slot holds an index into `staffNames`, into `times`
+// ([startTime, endTime] pairs) and into `comments` (0 is always ''), so a year for a large roster is a few
+// flat arrays instead of tens of thousands of shift objects. The JSON shape
+// ({ [date]: [{ staff, startTime, endTime, comments }] }) converts to and from it without loss.
+//
+// The binary file format stores app data around the grid (little-endian):
+//   'SHFT' | u16 version | u16 reserved | u32 meta length | meta JSON (UTF-8)
+//   | u32 day count | u32 slot count | pad to 4 bytes
+//   | i32 dayNumbers[days] | u32 slotOffsets[days + 1] | u32 staffRefs[slots] | u32 timeRefs[slots] | u32 commentRefs[slots]
+// The meta JSON holds the string tables and any other app data passed to encodeScheduleFile.
+import { dateKeyOfDayNumber, dayNumberOfKey } from './dayTime.mjs';
+
+export const SCHEDULE_FILE_MAGIC = 'SHFT';
+export const SCHEDULE_FILE_VERSION = 1;
+// File extension used by the apps for the binary format
+export const SCHEDULE_FILE_EXTENSION = '.shiftdata';
+
+const HEADER_BYTES = 12;
+
+// Builds the grid from the JSON shape
+export const scheduleToGrid = (schedule) => {
+  const dates = Object.keys(schedule).sort();
+  const slotCount = dates.reduce((sum, date) => sum + schedule[date].length, 0);
+
+  const dayNumbers = new Int32Array(dates.length);
+  const slotOffsets = new Uint32Array(dates.length + 1);
+  const staffRefs = new Uint32Array(slotCount);
+  const timeRefs = new Uint32Array(slotCount);
+  const commentRefs = new Uint32Array(slotCount);
+
+  const staffNames = [];
+  const times = [];
+  const comments = [''];
+  const staffIndex = new Map();
+  const timeIndex = new Map();
+  const commentIndex = new Map([['', 0]]);
+  const intern = (table, index, key, value) => {
+    let ref = index.get(key);
+    if (ref === undefined) {
+      ref = table.length;
+      table.push(value);
+      index.set(key, ref);
+    }
+    return ref;
+  };
+
+  let slot = 0;
+  dates.forEach((date, dayIndex) => {
+    dayNumbers[dayIndex] = dayNumberOfKey(date);
+    slotOffsets[dayIndex] = slot;
+    schedule[date].forEach(shift => {
+      const startTime = shift.startTime || '';
+      const endTime = shift.endTime || '';
+      staffRefs[slot] = intern(staffNames, staffIndex, shift.staff, shift.staff);
+      timeRefs[slot] = intern(times, timeIndex, `${startTime}-${endTime}`, [startTime, endTime]);
+      commentRefs[slot] = intern(comments, commentIndex, shift.comments || '', shift.comments || '');
+      slot++;
+    });
+  });
+  slotOffsets[dates.length] = slot;
+
+  return { dayNumbers, slotOffsets, staffRefs, timeRefs, commentRefs, staffNames, times, comments };
+};
+
+// Rebuilds the JSON shape from a grid
+export const gridToSchedule = (grid) => {
+  const { dayNumbers, slotOffsets, staffRefs, timeRefs, commentRefs, staffNames, times, comments } = grid;
+  const schedule = {};
+  for (let dayIndex = 0; dayIndex < dayNumbers.length; dayIndex++) {
+    const shifts = [];
+    for (let slot = slotOffsets[dayIndex]; slot < slotOffsets[dayIndex + 1]; slot++) {
+      const [startTime, endTime] = times[timeRefs[slot]];
+      shifts.push({ staff: staffNames[staffRefs[slot]], startTime, endTime, comments: comments[commentRefs[slot]] });
+    }
+    schedule[dateKeyOfDayNumber(dayNumbers[dayIndex])] = shifts;
+  }
+  return schedule;
+};
+
+// Whether `bytes` (Uint8Array or ArrayBuffer) starts with the binary file header
+export const isScheduleFile = (bytes) => {
+  const view = bytes instanceof Uint8Array ? bytes : new Uint8Array(bytes);
+  return view.length >= HEADER_BYTES && String.fromCharCode(...view.subarray(0, 4)) === SCHEDULE_FILE_MAGIC;
+};
+
+// Encodes a schedule and other app data (any JSON-compatible object) as one binary file
+export const encodeScheduleFile = (schedule, appData = {}) => {
+  const grid = scheduleToGrid(schedule);
+  const meta = new TextEncoder().encode(JSON.stringify({
+    ...appData,
+    staffNames: grid.staffNames,
+    times: grid.times,
+    comments: grid.comments,
+  }));
+  const dayCount = grid.dayNumbers.length;
+  const slotCount = grid.staffRefs.length;
+  const arraysOffset = Math.ceil((HEADER_BYTES + meta.length + 8) / 4) * 4;
+  const totalBytes = arraysOffset + 4 * (dayCount + dayCount + 1 + slotCount * 3);
+
+  const bytes = new Uint8Array(totalBytes);
+  const view = new DataView(bytes.buffer);
+  bytes.set([...SCHEDULE_FILE_MAGIC].map(char => char.charCodeAt(0)), 0);
+  view.setUint16(4, SCHEDULE_FILE_VERSION, true);
+  view.setUint32(8, meta.length, true);
+  bytes.set(meta, HEADER_BYTES);
+  view.setUint32(HEADER_BYTES + meta.length, dayCount, true);
+  view.setUint32(HEADER_BYTES + meta.length + 4, slotCount, true);
+
+  let offset = arraysOffset;
+  [grid.dayNumbers, grid.slotOffsets, grid.staffRefs, grid.timeRefs, grid.commentRefs].forEach(array => {
+    for (let i = 0; i < array.length; i++, offset += 4) {
+      if (array instanceof Int32Array) {
+        view.setInt32(offset, array[i], true);
+      } else {
+        view.setUint32(offset, array[i], true);
+      }
+    }
+  });
+  return bytes;
+};
+
+// Checks that every reference of a grid points into its tables; throws otherwise
+const validateGrid = ({ slotOffsets, staffRefs, timeRefs, commentRefs, staffNames, times, comments }) => {
+  if (!Array.isArray(staffNames) || staffNames.some(name => typeof name !== 'string')) {
+    throw new Error('Schedule file has an invalid staff table');
+  }
+  if (!Array.isArray(times) || times.some(time => !Array.isArray(time) || time.length !== 2 || time.some(part => typeof part !== 'string'))) {
+    throw new Error('Schedule file has an invalid time table');
+  }
+  if (!Array.isArray(comments) || comments.some(comment => typeof comment !== 'string')) {
+    throw new Error('Schedule file has an invalid comment table');
+  }
+  if (slotOffsets[0] !== 0 || slotOffsets[slotOffsets.length - 1] !== staffRefs.length) {
+    throw new Error('Schedule file has invalid slot offsets');
+  }
+  for (let dayIndex = 1; dayIndex < slotOffsets.length; dayIndex++) {
+    if (slotOffsets[dayIndex] < slotOffsets[dayIndex - 1]) throw new Error('Schedule file has invalid slot offsets');
+  }
+  for (let slot = 0; slot < staffRefs.length; slot++) {
+    if (staffRefs[slot] >= staffNames.length || timeRefs[slot] >= times.length || commentRefs[slot] >= comments.length) {
+      throw new Error(`Schedule file has an invalid reference in slot ${slot}`);
+    }
+  }
+};
+
+// Decodes a binary file into { schedule, appData }. Throws an Error describing the problem on a file that
+// is not in this format, is truncated or refers outside its tables.
+export const decodeScheduleFile = (input) => {
+  const bytes = input instanceof Uint8Array ? input : new Uint8Array(input);
+  if (!isScheduleFile(bytes)) throw new Error('Not a schedule file');
+  const view = new DataView(bytes.buffer, bytes.byteOffset, bytes.byteLength);
+  const version = view.getUint16(4, true);
+  if (version > SCHEDULE_FILE_VERSION) throw new Error(`Unsupported schedule file version ${version}`);
+
+  const metaLength = view.getUint32(8, true);
+  if (HEADER_BYTES + metaLength + 8 > bytes.length) throw new Error('Schedule file is truncated');
+  let meta;
+  try {
+    meta = JSON.parse(new TextDecoder().decode(bytes.subarray(HEADER_BYTES, HEADER_BYTES + metaLength)));
+  } catch (error) {
+    throw new Error('Schedule file has invalid metadata');
+  }
+  if (meta === null || typeof meta !== 'object' || Array.isArray(meta)) throw new Error('Schedule file has invalid metadata');
+  const { staffNames, times, comments, ...appData } = meta;
+  const dayCount = view.getUint32(HEADER_BYTES + metaLength, true);
+  const slotCount = view.getUint32(HEADER_BYTES + metaLength + 4, true);
+
+  let offset = Math.ceil((HEADER_BYTES + metaLength + 8) / 4) * 4;
+  if (offset + 4 * (dayCount * 2 + 1 + slotCount * 3) > bytes.length) throw new Error('Schedule file is truncated');
+  const readArray = (ArrayType, length) => {
+    const array = new ArrayType(length);
+    for (let i = 0; i < length; i++, offset += 4) {
+      array[i] = ArrayType === Int32Array ? view.getInt32(offset, true) : view.getUint32(offset, true);
+    }
+    return array;
+  };
+  const grid = {
+    dayNumbers: readArray(Int32Array, dayCount),
+    slotOffsets: readArray(Uint32Array, dayCount + 1),
+    staffRefs: readArray(Uint32Array, slotCount),
+    timeRefs: readArray(Uint32Array, slotCount),
+    commentRefs: readArray(Uint32Array, slotCount),
+    staffNames,
+    times,
+    comments,
+  };
+  validateGrid(grid);
+  return { schedule: gridToSchedule(grid), appData };
+};
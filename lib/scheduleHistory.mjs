@@ -0,0 +1,144 @@
+// Schedule state with bounded undo/redo, for use with React's useReducer.
+// The pinned dates and the seed of each generated month belong to the schedule, so they are kept and undone
+// together with it: undoing a generation brings back the hand-edited days with their pins.
+// Schedules are plain { [date]: shifts } maps that are never mutated: an update builds a new map that shares
+// every unchanged day with the previous one, so unchanged days keep their identity (memoized rows, the
+// WeakMap caches and the month store's shard comparison all rely on that) and "did anything change" is a
+// reference check. History keeps patches of the changed days, not snapshots, so a step costs memory only
+// for the days it touched.
+
+// Undo steps kept by default
+export const SCHEDULE_HISTORY_LIMIT = 50;
+
+// Applies a patch ({ [date]: shifts, or undefined to delete the day }). Returns `schedule` itself when
+// the patch changes nothing.
+export const applySchedulePatch = (schedule, patch) => {
+  let next = schedule;
+  Object.entries(patch).forEach(([date, shifts]) => {
+    if (schedule[date] === shifts && (shifts !== undefined || !(date in schedule))) return;
+    if (next === schedule) next = { ...schedule };
+    if (shifts === undefined) {
+      delete next[date];
+    } else {
+      next[date] = shifts;
+    }
+  });
+  return next;
+};
+
+// The patch that takes the result of `patch` back to `schedule`
+export const invertSchedulePatch = (schedule, patch) =>
+  Object.fromEntries(Object.keys(patch).map(date => [date, schedule[date]]));
+
+// The part of `patch` computed from `base` whose days are still the same in `schedule`: days that were
+// edited, regenerated or undone since are left out, so a late result never overwrites a newer change
+export const keepUnchangedDays = (schedule, base, patch) =>
+  Object.fromEntries(Object.entries(patch).filter(([date]) => schedule[date] === base[date]));
+
+// Applies a pin patch ({ [date]: true to pin, false to unpin }) to a list of pinned dates. Returns
+// `pinnedDates` itself when the patch changes nothing.
+export const applyPinPatch = (pinnedDates, pins) => {
+  const pinned = new Set(pinnedDates);
+  const changed = Object.entries(pins).filter(([date, isPinned]) => pinned.has(date) !== isPinned);
+  if (changed.length === 0) return pinnedDates;
+  changed.forEach(([date, isPinned]) => (isPinned ? pinned.add(date) : pinned.delete(date)));
+  return [...pinned];
+};
+
+const invertPinPatch = (pinnedDates, pins) => {
+  const pinned = new Set(pinnedDates);
+  return Object.fromEntries(Object.keys(pins).map(date => [date, pinned.has(date)]));
+};
+
+// Patch that removes every date for which `predicate(date)` holds
+export const removeDatesPatch = (schedule, predicate) =>
+  Object.fromEntries(Object.keys(schedule).filter(predicate).map(date => [date, undefined]));
+
+export const createScheduleHistory = (schedule = {}, limit = SCHEDULE_HISTORY_LIMIT, { pinnedDates = [], seeds = {} } = {}) => ({
+  schedule,
+  // Dates edited by hand and { 'YYYY-MM': seed } of the generated months
+  pinnedDates,
+  seeds,
+  // Each step is { undo, redo }, each { schedule: patch, pins: pin patch, seeds: patch }
+  past: [],
+  future: [],
+  limit,
+});
+
+export const canUndoSchedule = (history) => history.past.length > 0;
+export const canRedoSchedule = (history) => history.future.length > 0;
+
+// Applies one side of a step ({ schedule, pins, seeds } patches) to the history's state
+const applyStepPatches = (history, patches) => ({
+  ...history,
+  schedule: applySchedulePatch(history.schedule, patches.schedule),
+  pinnedDates: applyPinPatch(history.pinnedDates, patches.pins),
+  seeds: applySchedulePatch(history.seeds, patches.seeds),
+});
+
+// Actions:
+//   { type: 'edit', patch, pins?, seeds? }  an undoable change (generation, hand edits, re-solves, clearing
+//                                a month); `pins` is a pin patch, `seeds` a { 'YYYY-MM': seed } patch
+//   { type: 'edit', patch, base, ... }  the same for a patch computed from the older schedule `base`; only
+//                                the days that did not change since are applied (see keepUnchangedDays)
+//   { type: 'pins', pins }       pins or unpins dates; not recorded
+//   { type: 'load', schedule }   adds days read from storage that are not in the schedule yet; not recorded
+//   { type: 'reset', schedule, pinnedDates?, seeds? }  replaces everything and forgets the history (stored
+//                                data at startup, file load, clear all data)
+//   { type: 'undo' } / { type: 'redo' }
+export const scheduleHistoryReducer = (history, action) => {
+  switch (action.type) {
+    case 'edit': {
+      const redo = {
+        schedule: action.base ? keepUnchangedDays(history.schedule, action.base, action.patch) : action.patch,
+        pins: action.pins || {},
+        seeds: action.seeds || {},
+      };
+      const next = applyStepPatches(history, redo);
+      if (next.schedule === history.schedule && next.pinnedDates === history.pinnedDates && next.seeds === history.seeds) {
+        return history;
+      }
+      const undo = {
+        schedule: invertSchedulePatch(history.schedule, redo.schedule),
+        pins: invertPinPatch(history.pinnedDates, redo.pins),
+        seeds: invertSchedulePatch(history.seeds, redo.seeds),
+      };
+      return {
+        ...next,
+        past: [...history.past, { undo, redo }].slice(-history.limit),
+        future: [],
+      };
+    }
+    case 'pins': {
+      const pinnedDates = applyPinPatch(history.pinnedDates, action.pins);
+      return pinnedDates === history.pinnedDates ? history : { ...history, pinnedDates };
+    }
+    case 'load': {
+      const missing = Object.entries(action.schedule).filter(([date]) => !(date in history.schedule));
+      if (missing.length === 0) return history;
+      return { ...history, schedule: applySchedulePatch(history.schedule, Object.fromEntries(missing)) };
+    }
+    case 'reset':
+      return createScheduleHistory(action.schedule, history.limit, { pinnedDates: action.pinnedDates, seeds: action.seeds });
+    case 'undo': {
+      if (!canUndoSchedule(history)) return history;
+      const step = history.past[history.past.length - 1];
+      return {
+        ...applyStepPatches(history, step.undo),
+        past: history.past.slice(0, -1),
+        future: [step, ...history.future],
+      };
+    }
+    case 'redo': {
+      if (!canRedoSchedule(history)) return history;
+      const [step, ...future] = history.future;
+      return {
+        ...applyStepPatches(history, step.redo),
+        past: [...history.past, step].slice(-history.limit),
+        future,
+      };
+    }
+    default:
+      return history;
+  }
+};
@@ -0,0 +1,665 @@
+// Shift scheduling core shared by the app, its worker and the Firestore variant.
+// Everything here works on plain data (no React, no DOM) so it can run in a Web Worker.
+import { forEachAvailableDay, isDateAvailable } from './availability.mjs';
+import { isJapaneseHolidayKey } from './holidays.mjs';
+import { DAYS_OF_WEEK, getMonthModel, getMonthModelDay } from './monthModel.mjs';
+import { dayNumberOfKey, formatTimeOfDay, intervalDuration, parseTimeOfDay } from './dayTime.mjs';
+import { createRandomSeed, createSeededRandom, normalizeSeed } from './random.mjs';
+
+export { DAYS_OF_WEEK };
+export const UNASSIGNED_STAFF = '未割り当て';
+export const CLOSED_DAY_STAFF = '定休日';
+
+// Formats a date as a 'YYYY-MM-DD' string
+export const formatDateKey = (date) => {
+  const year = date.getFullYear();
+  const month = String(date.getMonth() + 1).padStart(2, '0');
+  const day = String(date.getDate()).padStart(2, '0');
+  return `${year}-${month}-${day}`;
+};
+
+// Parses a 'YYYY-MM-DD' string into a local Date
+export const parseDateKey = (dateKey) => {
+  const [year, month, day] = dateKey.split('-').map(Number);
+  return new Date(year, month - 1, day);
+};
+
+// Holiday lookup for a run: an explicit list of 'YYYY-MM-DD' dates when given,
+// otherwise the rule-based Japanese holiday calendar
+export const toHolidayLookup = (holidays) => {
+  if (!holidays) return isJapaneseHolidayKey;
+  const holidaySet = new Set(holidays);
+  return (dateKey) => holidaySet.has(dateKey);
+};
+
+// Returns the first and last day of month covered by a generation period (full_month, first_half, second_half)
+export const getPeriodDayRange = (year, month, period) => {
+  const { daysInMonth, firstHalfEndDay } = getMonthModel(year, month);
+  if (period === 'first_half') {
+    return { startDay: 1, endDay: firstHalfEndDay };
+  }
+  if (period === 'second_half') {
+    return { startDay: firstHalfEndDay + 1, endDay: daysInMonth };
+  }
+  return { startDay: 1, endDay: daysInMonth };
+};
+
+// A slot to staff, in minutes of day. Slots are shared between days and never modified.
+const requiredSlot = (startTime, endTime) => Object.freeze({ startMinute: parseTimeOfDay(startTime), endMinute: parseTimeOfDay(endTime) });
+
+// Slots by weekday (0 = Sunday); Monday is the regular closing day
+const REQUIRED_SLOTS_BY_WEEKDAY = [
+  [requiredSlot('17:00', '22:00')],
+  [],
+  [requiredSlot('18:00', '22:00')],
+  [requiredSlot('18:00', '22:00')],
+  [requiredSlot('18:00', '22:00')],
+  [requiredSlot('17:00', '22:00')],
+  [requiredSlot('19:00', '23:00'), requiredSlot('17:00', '22:00')],
+].map(Object.freeze);
+
+// On holidays every slot starts at 17:00
+const HOLIDAY_START_MINUTE = 17 * 60;
+const HOLIDAY_SLOTS_BY_WEEKDAY = REQUIRED_SLOTS_BY_WEEKDAY.map(slots =>
+  Object.freeze(slots.map(slot => Object.freeze({ ...slot, startMinute: HOLIDAY_START_MINUTE }))));
+
+// Slots that must be staffed on a weekday (0 = Sunday)
+export const getRequiredSlots = (weekday, isHoliday) =>
+  (isHoliday ? HOLIDAY_SLOTS_BY_WEEKDAY : REQUIRED_SLOTS_BY_WEEKDAY)[weekday];
+
+// Slot of a stored shift ({ startTime, endTime } strings)
+export const shiftToSlot = (shift) => ({ startMinute: parseTimeOfDay(shift.startTime), endMinute: parseTimeOfDay(shift.endTime) });
+
+// Lists every day of the period in calendar order.
+// Mondays are regular holidays and come back with `closed: true` and no slots.
+export const buildShiftDays = (year, month, period, isHolidayKey = isJapaneseHolidayKey) => {
+  const { startDay, endDay } = getPeriodDayRange(year, month, period);
+  return getMonthModel(year, month).days.slice(startDay - 1, endDay).map(modelDay => toShiftDay(modelDay, isHolidayKey));
+};
+
+// Shift day from a month model day; the model already knows the rule-based holidays.
+// `date` is the key of the day in the schedules handed back to the apps; the engine itself groups and
+// indexes days by `dayNumber` and position.
+const toShiftDay = (modelDay, isHolidayKey) => {
+  const { dateKey, dayNumber, weekday, dayOfWeekName, isClosed } = modelDay;
+  const isHoliday = isHolidayKey === isJapaneseHolidayKey ? modelDay.isHoliday : isHolidayKey(dateKey);
+  return {
+    date: dateKey,
+    dayNumber,
+    weekday,
+    dayOfWeekName,
+    closed: isClosed,
+    requiredSlots: getRequiredSlots(weekday, isHoliday),
+  };
+};
+
+// Describes a single day: its key, day number, weekday and the slots that must be staffed
+export const buildShiftDay = (date, isHolidayKey = isJapaneseHolidayKey) =>
+  toShiftDay(getMonthModel(date.getFullYear(), date.getMonth()).days[date.getDate() - 1], isHolidayKey);
+
+// The same for a 'YYYY-MM-DD' key, without going through a Date
+const buildShiftDayOfKey = (dateKey, isHolidayKey = isJapaneseHolidayKey) => toShiftDay(getMonthModelDay(dateKey), isHolidayKey);
+
+// Cost weights for the whole-period assignment solver.
+// The solver always finds the maximum number of filled slots; these costs only decide
+// which of the maximum assignments is picked (balanced load, preferred staff types).
+const SOLVER_LOAD_STEP_COST = 100; // Added for every further shift given to the same staff member
+const SOLVER_STAFF_TYPE_COST = { flexible: 0, fixed: 30, anytime: 60 };
+const SOLVER_TIE_BREAK_COST = 10; // Seeded jitter so equal-cost schedules vary between seeds
+// Upper bound on solver run time; slots left open after it are filled by the greedy path
+const SOLVER_TIME_BUDGET_MS = 1500;
+
+// Binary heap helpers for [priority, value] pairs
+const pushHeap = (heap, item) => {
+  heap.push(item);
+  let i = heap.length - 1;
+  while (i > 0) {
+    const parent = (i - 1) >> 1;
+    if (heap[parent][0] <= heap[i][0]) break;
+    [heap[parent], heap[i]] = [heap[i], heap[parent]];
+    i = parent;
+  }
+};
+
+const popHeap = (heap) => {
+  const top = heap[0];
+  const last = heap.pop();
+  if (heap.length > 0) {
+    heap[0] = last;
+    let i = 0;
+    while (true) {
+      const left = i * 2 + 1;
+      const right = left + 1;
+      let smallest = i;
+      if (left < heap.length && heap[left][0] < heap[smallest][0]) smallest = left;
+      if (right < heap.length && heap[right][0] < heap[smallest][0]) smallest = right;
+      if (smallest === i) break;
+      [heap[smallest], heap[i]] = [heap[i], heap[smallest]];
+      i = smallest;
+    }
+  }
+  return top;
+};
+
+// Creates an empty flow network. Edges are stored in paired slots so that `edge ^ 1` is the reverse edge.
+const createFlowNetwork = () => ({ head: [], to: [], cap: [], cost: [], next: [] });
+
+const addFlowNode = (network) => {
+  network.head.push(-1);
+  return network.head.length - 1;
+};
+
+const addFlowEdge = (network, from, to, capacity, cost) => {
+  const { head } = network;
+  const edge = network.to.length;
+  network.to.push(to, from);
+  network.cap.push(capacity, 0);
+  network.cost.push(cost, -cost);
+  network.next.push(head[from], head[to]);
+  head[from] = edge;
+  head[to] = edge + 1;
+  return edge;
+};
+
+// Min-cost max-flow by successive shortest paths (Dijkstra with node potentials).
+// All edge costs must be non-negative. Stops early once `deadline` (ms timestamp) has passed.
+// `onAugment(flow)` is called after every augmenting path.
+const runMinCostFlow = (network, source, sink, deadline = Infinity, onAugment = () => {}) => {
+  const { head, to, cap, cost, next } = network;
+  const nodeCount = head.length;
+  const potential = new Float64Array(nodeCount);
+  const dist = new Float64Array(nodeCount);
+  const prevEdge = new Int32Array(nodeCount);
+  let flow = 0;
+  let totalCost = 0;
+
+  while (true) {
+    if (Date.now() > deadline) {
+      return { flow, cost: totalCost, timedOut: true };
+    }
+
+    dist.fill(Infinity);
+    prevEdge.fill(-1);
+    dist[source] = 0;
+    const heap = [[0, source]];
+    while (heap.length > 0) {
+      const [d, u] = popHeap(heap);
+      if (d > dist[u]) continue;
+      for (let e = head[u]; e !== -1; e = next[e]) {
+        if (cap[e] <= 0) continue;
+        const v = to[e];
+        const nd = d + cost[e] + potential[u] - potential[v];
+        if (nd < dist[v]) {
+          dist[v] = nd;
+          prevEdge[v] = e;
+          pushHeap(heap, [nd, v]);
+        }
+      }
+    }
+    if (dist[sink] === Infinity) break;
+
+    for (let v = 0; v < nodeCount; v++) {
+      if (dist[v] < Infinity) potential[v] += dist[v];
+    }
+
+    let pushed = Infinity;
+    for (let v = sink; v !== source; v = to[prevEdge[v] ^ 1]) {
+      pushed = Math.min(pushed, cap[prevEdge[v]]);
+    }
+    for (let v = sink; v !== source; v = to[prevEdge[v] ^ 1]) {
+      cap[prevEdge[v]] -= pushed;
+      cap[prevEdge[v] ^ 1] += pushed;
+      totalCost += pushed * cost[prevEdge[v]];
+    }
+    flow += pushed;
+    onAugment(flow);
+  }
+  return { flow, cost: totalCost, timedOut: false };
+};
+
+// Staff types in the order the greedy fill tries them
+export const SHIFT_STAFF_TYPES = ['flexible', 'fixed', 'anytime'];
+export const LATE_SHIFT_START_MINUTE = 19 * 60;
+
+// Slot kind used by the eligibility index: 19:00 starts need late-shift capable staff
+export const getSlotKind = (slot) => (slot.startMinute === LATE_SHIFT_START_MINUTE ? 'late' : 'normal');
+
+// Whether a staff member may take 19:00 starts at all
+const canTakeLateShift = (s) => Boolean(s.canWorkLateShift) && !s.comments?.includes('遅番不可');
+
+// Whether a single staff member may take a slot of the given kind on a day.
+// The eligibility index answers the same question for the whole roster at once.
+export const isStaffEligible = (s, day, slotKind) => {
+  const isAvailableByType =
+    (s.type === 'flexible' && isDateAvailable(s.availability, day.date)) ||
+    (s.type === 'fixed' && Boolean(s.availability[day.dayOfWeekName])) ||
+    (s.type === 'anytime' && s.availability === true);
+  return isAvailableByType && (slotKind !== 'late' || canTakeLateShift(s));
+};
+
+// Builds, once per generation run, the staff eligible on each day for each slot kind.
+// Returns an array parallel to `shiftDays` of { normal: { flexible, fixed, anytime }, late: { ... } } where
+// every leaf is an Int32Array of indices into `staffList`. Days sharing a weekday share arrays.
+export const buildEligibilityIndex = (staffList, shiftDays) => {
+  // Flexible availability is read straight from each month's bitmask: bit (d - 1) of a month is the day
+  // number of its first day plus d - 1, looked up among the period's days
+  const dayIndexByDayNumber = new Map(shiftDays.map((day, dayIndex) => [day.dayNumber, dayIndex]));
+  const firstDayNumber = Math.min(...dayIndexByDayNumber.keys());
+  const lastDayNumber = Math.max(...dayIndexByDayNumber.keys());
+  const monthStartDayNumbers = new Map();
+  const monthStartDayNumberOf = (monthKey) => {
+    if (!monthStartDayNumbers.has(monthKey)) monthStartDayNumbers.set(monthKey, dayNumberOfKey(`${monthKey}-01`));
+    return monthStartDayNumbers.get(monthKey);
+  };
+  const canTakeLate = staffList.map(canTakeLateShift);
+
+  const flexibleByDay = shiftDays.map(() => null);
+  const fixedByWeekday = DAYS_OF_WEEK.map(() => []);
+  const anytime = [];
+  staffList.forEach((s, index) => {
+    if (s.type === 'flexible') {
+      Object.keys(s.availability || {}).forEach(monthKey => {
+        const monthStart = monthStartDayNumberOf(monthKey);
+        // Months that cannot overlap the period (a month has at most 31 days)
+        if (monthStart > lastDayNumber || monthStart + 31 <= firstDayNumber) return;
+        forEachAvailableDay(s.availability, monthKey, dayOfMonth => {
+          const dayIndex = dayIndexByDayNumber.get(monthStart + dayOfMonth - 1);
+          if (dayIndex !== undefined) {
+            (flexibleByDay[dayIndex] ||= []).push(index);
+          }
+        });
+      });
+    } else if (s.type === 'fixed') {
+      DAYS_OF_WEEK.forEach((dayOfWeekName, weekday) => {
+        if (s.availability[dayOfWeekName]) {
+          fixedByWeekday[weekday].push(index);
+        }
+      });
+    } else if (s.type === 'anytime' && s.availability === true) {
+      anytime.push(index);
+    }
+  });
+
+  const cache = new Map();
+  const toEntry = (indices) => {
+    if (!cache.has(indices)) {
+      cache.set(indices, {
+        normal: Int32Array.from(indices),
+        late: Int32Array.from(indices.filter(index => canTakeLate[index])),
+      });
+    }
+    return cache.get(indices);
+  };
+  const noStaff = [];
+
+  return shiftDays.map((day, dayIndex) => {
+    const flexible = toEntry(flexibleByDay[dayIndex] || noStaff);
+    const fixed = toEntry(fixedByWeekday[day.weekday]);
+    const anytimeEntry = toEntry(anytime);
+    return {
+      normal: { flexible: flexible.normal, fixed: fixed.normal, anytime: anytimeEntry.normal },
+      late: { flexible: flexible.late, fixed: fixed.late, anytime: anytimeEntry.late },
+    };
+  });
+};
+
+// Assigns staff to every required slot of the whole period at once.
+// Network: source -> staff (one edge per shift, cost grows with load) -> staff/day (one shift per day)
+//          -> slot (only if eligible) -> sink.
+// `baseLoad[staffIndex]` counts shifts a staff member already holds outside `shiftDays`.
+// `random` breaks ties between equally good staff; pass a seeded generator for reproducible results.
+// Returns { assignments, timedOut } where assignments[dayIndex] lists the staff index (or -1) of every slot.
+export const solveShiftAssignment = (staffList, shiftDays, eligibilityIndex, { timeBudgetMs = SOLVER_TIME_BUDGET_MS, baseLoad = [], random = Math.random, onProgress = () => {} } = {}) => {
+  const deadline = Date.now() + timeBudgetMs;
+  const network = createFlowNetwork();
+  const source = addFlowNode(network);
+  const sink = addFlowNode(network);
+
+  // Collect, per staff member, the slots they can take on each day
+  const eligibleDaysByStaff = staffList.map(() => []);
+  shiftDays.forEach((day, dayIndex) => {
+    const eligibleForDay = eligibilityIndex[dayIndex];
+    day.requiredSlots.forEach((slot, slotIndex) => {
+      const eligibleByType = eligibleForDay[getSlotKind(slot)];
+      SHIFT_STAFF_TYPES.forEach(staffType => {
+        eligibleByType[staffType].forEach(staffIndex => {
+          const eligibleDays = eligibleDaysByStaff[staffIndex];
+          const last = eligibleDays[eligibleDays.length - 1];
+          if (last && last.dayIndex === dayIndex) {
+            last.eligibleSlots.push(slotIndex);
+          } else {
+            eligibleDays.push({ dayIndex, eligibleSlots: [slotIndex] });
+          }
+        });
+      });
+    });
+  });
+
+  const slotNodes = shiftDays.map(day => day.requiredSlots.map(() => {
+    const slotNode = addFlowNode(network);
+    addFlowEdge(network, slotNode, sink, 1, 0);
+    return slotNode;
+  }));
+
+  const slotEdges = [];
+  staffList.forEach((s, staffIndex) => {
+    const eligibleDays = eligibleDaysByStaff[staffIndex];
+    if (eligibleDays.length === 0) return;
+
+    const staffNode = addFlowNode(network);
+    const heldShifts = baseLoad[staffIndex] || 0;
+    for (let k = 0; k < eligibleDays.length; k++) {
+      addFlowEdge(network, source, staffNode, 1, (heldShifts + k) * SOLVER_LOAD_STEP_COST);
+    }
+    const typeCost = SOLVER_STAFF_TYPE_COST[s.type] ?? SOLVER_STAFF_TYPE_COST.anytime;
+    eligibleDays.forEach(({ dayIndex, eligibleSlots }) => {
+      const staffDayNode = addFlowNode(network);
+      const tieBreak = Math.floor(random() * SOLVER_TIE_BREAK_COST);
+      addFlowEdge(network, staffNode, staffDayNode, 1, typeCost + tieBreak);
+      eligibleSlots.forEach(slotIndex => {
+        const edge = addFlowEdge(network, staffDayNode, slotNodes[dayIndex][slotIndex], 1, 0);
+        slotEdges.push({ edge, staffIndex, dayIndex, slotIndex });
+      });
+    });
+  });
+
+  const totalSlots = slotNodes.reduce((sum, nodes) => sum + nodes.length, 0);
+  const { timedOut } = runMinCostFlow(network, source, sink, deadline, flow => onProgress(flow, totalSlots));
+
+  const assignments = shiftDays.map(day => day.requiredSlots.map(() => -1));
+  slotEdges.forEach(({ edge, staffIndex, dayIndex, slotIndex }) => {
+    if (network.cap[edge] === 0) {
+      assignments[dayIndex][slotIndex] = staffIndex;
+    }
+  });
+  return { assignments, timedOut };
+};
+
+// Load priority: shift count first, then minutes worked, then a per-staff jitter in [0, 1)
+const SELECTOR_SHIFT_WEIGHT = 100000;
+
+// Picks the least-loaded staff member from a candidate list in O(log n) per pick.
+// Each candidate list (the Int32Arrays of the eligibility index, shared between days) gets its own heap of
+// [load, staffIndex]. Loads only grow, so entries are refreshed lazily: a stale top is re-pushed with the
+// current load instead of updating every heap the staff member is in.
+// `baseLoad[staffIndex]` counts shifts already held; `random` orders staff with equal load.
+export const createLeastLoadedSelector = (staffCount, { baseLoad = [], random = Math.random } = {}) => {
+  const load = new Float64Array(staffCount);
+  for (let staffIndex = 0; staffIndex < staffCount; staffIndex++) {
+    load[staffIndex] = (baseLoad[staffIndex] || 0) * SELECTOR_SHIFT_WEIGHT + random();
+  }
+  const heaps = new WeakMap();
+
+  const heapFor = (candidates) => {
+    let heap = heaps.get(candidates);
+    if (!heap) {
+      heap = [];
+      candidates.forEach(staffIndex => pushHeap(heap, [load[staffIndex], staffIndex]));
+      heaps.set(candidates, heap);
+    }
+    return heap;
+  };
+
+  // Least-loaded candidate not in `excluded` (a Set), or -1
+  const pick = (candidates, excluded) => {
+    const heap = heapFor(candidates);
+    const skipped = [];
+    let picked = -1;
+    while (heap.length > 0) {
+      const [entryLoad, staffIndex] = heap[0];
+      if (entryLoad < load[staffIndex]) {
+        popHeap(heap);
+        pushHeap(heap, [load[staffIndex], staffIndex]);
+      } else if (excluded.has(staffIndex)) {
+        skipped.push(popHeap(heap));
+      } else {
+        picked = staffIndex;
+        break;
+      }
+    }
+    skipped.forEach(entry => pushHeap(heap, entry));
+    return picked;
+  };
+
+  const record = (staffIndex, slot) => {
+    load[staffIndex] += SELECTOR_SHIFT_WEIGHT + intervalDuration(slot.startMinute, slot.endMinute);
+  };
+
+  return { pick, record };
+};
+
+// Fills the open slots of a day one at a time (flexible, then fixed, then anytime staff), giving each slot
+// to the least-loaded eligible staff member of the first type that has one.
+// `presetStaff` holds the staff index already placed by the solver for each slot (-1 if open).
+// `selector` (createLeastLoadedSelector) carries the load across days; every pick made here is recorded in it.
+export const fillDayGreedily = (staffList, day, eligibleForDay, presetStaff = [], selector = createLeastLoadedSelector(staffList.length)) => {
+  const assignedStaffIndices = new Set(presetStaff.filter(staffIndex => staffIndex !== -1));
+
+  return day.requiredSlots.map((slot, slotIndex) => {
+    let staffIndexToAssign = presetStaff[slotIndex] ?? -1;
+
+    const eligibleByType = eligibleForDay[getSlotKind(slot)];
+    for (const staffType of SHIFT_STAFF_TYPES) {
+      if (staffIndexToAssign !== -1) break;
+      staffIndexToAssign = selector.pick(eligibleByType[staffType], assignedStaffIndices);
+      if (staffIndexToAssign !== -1) selector.record(staffIndexToAssign, slot);
+    }
+
+    // Times become 'HH:MM' strings only here, in the schedule handed back to the apps
+    const startTime = formatTimeOfDay(slot.startMinute);
+    const endTime = formatTimeOfDay(slot.endMinute);
+    if (staffIndexToAssign !== -1) {
+      assignedStaffIndices.add(staffIndexToAssign);
+      return { staff: staffList[staffIndexToAssign].name, startTime, endTime, comments: '' };
+    }
+    return { staff: UNASSIGNED_STAFF, startTime, endTime, comments: '' };
+  });
+};
+
+// Assigns all slots of the given (open) days with the solver or the greedy fill.
+// Returns { shiftsByDay: [shifts per day, parallel to shiftDays], timedOut }.
+const assignShiftDays = (staff, shiftDays, { mode, baseLoad, seed, onProgress }) => {
+  const eligibilityIndex = buildEligibilityIndex(staff, shiftDays);
+  const random = createSeededRandom(seed);
+
+  let presetAssignments = [];
+  let timedOut = false;
+  if (mode === 'optimal') {
+    const result = solveShiftAssignment(staff, shiftDays, eligibilityIndex, {
+      baseLoad,
+      random,
+      onProgress: (done, total) => onProgress({ phase: 'solve', done, total }),
+    });
+    presetAssignments = result.assignments;
+    timedOut = result.timedOut;
+  }
+
+  // Slots the solver filled count towards the load the greedy fill balances
+  const selector = createLeastLoadedSelector(staff.length, { baseLoad, random });
+  shiftDays.forEach((day, dayIndex) => {
+    (presetAssignments[dayIndex] || []).forEach((staffIndex, slotIndex) => {
+      if (staffIndex !== -1) selector.record(staffIndex, day.requiredSlots[slotIndex]);
+    });
+  });
+
+  const shiftsByDay = shiftDays.map((day, dayIndex) => {
+    const shifts = fillDayGreedily(staff, day, eligibilityIndex[dayIndex], presetAssignments[dayIndex], selector);
+    onProgress({ phase: 'fill', done: dayIndex + 1, total: shiftDays.length });
+    return shifts;
+  });
+  return { shiftsByDay, timedOut };
+};
+
+const closedDayShifts = () => [{ staff: CLOSED_DAY_STAFF, startTime: '', endTime: '', comments: '' }];
+
+const countUnassigned = (shifts) => shifts.filter(shift => shift.staff === UNASSIGNED_STAFF).length;
+
+// Generates the schedule for one period.
+// input: { staff, year, month (0-based), period, holidays?: ['YYYY-MM-DD'], mode: 'optimal' | 'greedy', seed? }
+// Without `holidays` the rule-based Japanese holiday calendar is used. The same input and `seed` give the
+// same schedule (unless the solver runs out of time); without a seed a random one is chosen and reported in stats.seed.
+// onProgress({ phase: 'solve' | 'fill', done, total }) is called while the run progresses.
+// Returns { schedule: { [date]: [{ staff, startTime, endTime, comments }] }, stats }.
+export const generateSchedule = (input, { onProgress = () => {} } = {}) => {
+  const startedAt = Date.now();
+  const { staff, year, month, period = 'full_month', holidays, mode = 'optimal' } = input;
+  const seed = input.seed == null ? createRandomSeed() : normalizeSeed(input.seed);
+
+  const periodDays = buildShiftDays(year, month, period, toHolidayLookup(holidays));
+  const shiftDays = periodDays.filter(day => !day.closed);
+  const { shiftsByDay, timedOut } = assignShiftDays(staff, shiftDays, { mode, seed, onProgress });
+
+  // Day keys are only attached here, in the schedule handed back to the apps
+  const schedule = {};
+  let totalSlots = 0;
+  let unassignedSlots = 0;
+  let shiftDayIndex = 0;
+  periodDays.forEach(day => {
+    if (day.closed) {
+      schedule[day.date] = closedDayShifts();
+      return;
+    }
+    const shifts = shiftsByDay[shiftDayIndex++];
+    totalSlots += shifts.length;
+    unassignedSlots += countUnassigned(shifts);
+    schedule[day.date] = shifts;
+  });
+
+  return {
+    schedule,
+    stats: {
+      mode,
+      seed,
+      days: periodDays.length,
+      totalSlots,
+      unassignedSlots,
+      solverTimedOut: timedOut,
+      elapsedMs: Date.now() - startedAt,
+    },
+  };
+};
+
+// Maps every staff name in a schedule to the slots it fills: { [name]: [{ date, slotIndex }] }.
+// Open slots are listed under UNASSIGNED_STAFF, so they can be found without scanning the schedule.
+export const buildAssignmentIndex = (schedule) => {
+  const index = {};
+  Object.entries(schedule).forEach(([date, shifts]) => {
+    shifts.forEach((shift, slotIndex) => {
+      (index[shift.staff] ||= []).push({ date, slotIndex });
+    });
+  });
+  return index;
+};
+
+// Groups each date's shifts by staff id for table rendering: Map(date -> Map(staffId -> shifts)).
+// Shifts name their staff, so names are resolved through `staffList`. `cache` (a WeakMap keyed by a date's
+// shift array) lets unchanged dates keep their map across rebuilds; use a new cache when staffList changes.
+export const buildDateStaffIndex = (schedule, staffList, cache = new WeakMap()) => {
+  const staffIdByName = new Map(staffList.map(s => [s.name, s.id]));
+  const index = new Map();
+  Object.entries(schedule).forEach(([date, shifts]) => {
+    let shiftsByStaff = cache.get(shifts);
+    if (!shiftsByStaff) {
+      shiftsByStaff = new Map();
+      shifts.forEach(shift => {
+        const staffId = staffIdByName.get(shift.staff);
+        if (staffId === undefined) return;
+        if (!shiftsByStaff.has(staffId)) shiftsByStaff.set(staffId, []);
+        shiftsByStaff.get(staffId).push(shift);
+      });
+      cache.set(shifts, shiftsByStaff);
+    }
+    index.set(date, shiftsByStaff);
+  });
+  return index;
+};
+
+// Finds the generated dates whose assignment depends on a change to one staff member:
+// days where they hold a slot they can no longer take, and days with an open slot they can newly take.
+// `pinnedDates` (Set) are never returned.
+export const findAffectedDates = ({ previousStaffMember, nextStaffMember, schedule, assignmentIndex, pinnedDates = new Set() }) => {
+  const index = assignmentIndex || buildAssignmentIndex(schedule);
+  const affected = new Set();
+  // Each date is described once, however many slots of it are checked
+  const shiftDayByDate = new Map();
+  const shiftDayOf = (date) => {
+    if (!shiftDayByDate.has(date)) shiftDayByDate.set(date, buildShiftDayOfKey(date));
+    return shiftDayByDate.get(date);
+  };
+  const isEligibleOn = (staffMember, date, shift) =>
+    Boolean(staffMember) && isStaffEligible(staffMember, shiftDayOf(date), getSlotKind(shiftToSlot(shift)));
+
+  (index[previousStaffMember?.name] || []).forEach(({ date, slotIndex }) => {
+    const shift = schedule[date][slotIndex];
+    if (nextStaffMember?.name !== previousStaffMember.name || !isEligibleOn(nextStaffMember, date, shift)) {
+      affected.add(date);
+    }
+  });
+
+  (index[UNASSIGNED_STAFF] || []).forEach(({ date, slotIndex }) => {
+    const shift = schedule[date][slotIndex];
+    if (isEligibleOn(nextStaffMember, date, shift) && !isEligibleOn(previousStaffMember, date, shift)) {
+      affected.add(date);
+    }
+  });
+
+  return [...affected].filter(date => !pinnedDates.has(date)).sort();
+};
+
+// Re-solves only `dates` of an existing schedule, keeping every other day as it is.
+// Dates are solved month by month, as generateSchedule does: shifts held on the other days of the same month
+// count as existing load, so the solver keeps balancing within the month. Other months are not counted.
+// input: { staff, schedule, dates: ['YYYY-MM-DD'], holidays?, mode, seed? }
+// Returns { schedule: { [date]: shifts } for the re-solved dates only, stats }.
+export const resolveScheduleDays = (input, { onProgress = () => {} } = {}) => {
+  const startedAt = Date.now();
+  const { staff, schedule, dates, holidays, mode = 'optimal' } = input;
+  const seed = input.seed == null ? createRandomSeed() : normalizeSeed(input.seed);
+  const isHolidayKey = toHolidayLookup(holidays);
+  const staffIndexByName = new Map(staff.map((s, staffIndex) => [s.name, staffIndex]));
+
+  const datesByMonth = new Map();
+  dates.forEach(date => {
+    const monthKey = date.slice(0, 7);
+    if (!datesByMonth.has(monthKey)) datesByMonth.set(monthKey, []);
+    datesByMonth.get(monthKey).push(date);
+  });
+
+  const resolved = {};
+  let unassignedSlots = 0;
+  let timedOut = false;
+  datesByMonth.forEach((monthDates, monthKey) => {
+    const resolvedDates = new Set(monthDates);
+    const baseLoad = staff.map(() => 0);
+    Object.entries(schedule).forEach(([date, shifts]) => {
+      if (!date.startsWith(monthKey) || resolvedDates.has(date)) return;
+      shifts.forEach(shift => {
+        const staffIndex = staffIndexByName.get(shift.staff);
+        if (staffIndex !== undefined) baseLoad[staffIndex]++;
+      });
+    });
+
+    const days = monthDates.map(date => buildShiftDayOfKey(date, isHolidayKey));
+    const shiftDays = days.filter(day => !day.closed);
+    const result = assignShiftDays(staff, shiftDays, { mode, baseLoad, seed, onProgress });
+    timedOut = timedOut || result.timedOut;
+
+    let shiftDayIndex = 0;
+    days.forEach(day => {
+      resolved[day.date] = day.closed ? closedDayShifts() : result.shiftsByDay[shiftDayIndex++];
+      unassignedSlots += countUnassigned(resolved[day.date]);
+    });
+  });
+
+  return {
+    schedule: resolved,
+    stats: {
+      mode,
+      seed,
+      days: dates.length,
+      unassignedSlots,
+      solverTimedOut: timedOut,
+      elapsedMs: Date.now() - startedAt,
+    },
+  };
+};
@@ -0,0 +1,177 @@
+// Month-sharded storage for the generated shift.
+// Each month is stored under its own key ('generatedShift:YYYY-MM') and listed in a small index, so
+// startup only parses the months around the visible one and a change rewrites only the months it touched.
+// Older versions stored every generated date in one 'generatedShift' key; it is split on first start.
+// All reads and writes go through a storage backend (see storageBackend.mjs).
+
+export const LEGACY_SHIFT_KEY = 'generatedShift';
+export const SHIFT_MONTH_INDEX_KEY = 'generatedShiftMonths';
+export const SHIFT_MONTH_KEY_PREFIX = `${LEGACY_SHIFT_KEY}:`;
+
+export const shiftMonthStorageKey = (monthKey) => `${SHIFT_MONTH_KEY_PREFIX}${monthKey}`;
+
+// 'YYYY-MM-DD' -> 'YYYY-MM'
+export const monthKeyOfDate = (dateKey) => dateKey.slice(0, 7);
+
+export const monthKeyOf = (date) =>
+  `${date.getFullYear()}-${String(date.getMonth() + 1).padStart(2, '0')}`;
+
+// Month keys of the given month and `radius` months on each side
+export const monthKeysAround = (date, radius = 1) => {
+  const monthKeys = [];
+  for (let offset = -radius; offset <= radius; offset++) {
+    monthKeys.push(monthKeyOf(new Date(date.getFullYear(), date.getMonth() + offset, 1)));
+  }
+  return monthKeys;
+};
+
+// Month keys from the month of startDate through the month of endDate
+export const monthKeysBetween = (startDate, endDate) => {
+  const monthKeys = [];
+  for (let date = new Date(startDate.getFullYear(), startDate.getMonth(), 1); date <= endDate; date.setMonth(date.getMonth() + 1)) {
+    monthKeys.push(monthKeyOf(date));
+  }
+  return monthKeys;
+};
+
+// Splits a flat { date: shifts } schedule into Map(monthKey -> { date: shifts })
+export const splitScheduleByMonth = (schedule) => {
+  const shards = new Map();
+  for (const dateKey in schedule) {
+    const monthKey = monthKeyOfDate(dateKey);
+    if (!shards.has(monthKey)) shards.set(monthKey, {});
+    shards.get(monthKey)[dateKey] = schedule[dateKey];
+  }
+  return shards;
+};
+
+// Shards are compared by the identity of their per-date entries; untouched dates keep their arrays
+const isSameShard = (a, b) => {
+  if (!a || !b) return false;
+  const keys = Object.keys(a);
+  if (keys.length !== Object.keys(b).length) return false;
+  return keys.every(dateKey => a[dateKey] === b[dateKey]);
+};
+
+const migrateLegacyShiftStorage = async (backend) => {
+  const legacySchedule = await backend.read(LEGACY_SHIFT_KEY);
+  if (!legacySchedule) return;
+  const storedMonths = new Set((await backend.read(SHIFT_MONTH_INDEX_KEY)) || []);
+  const entries = [];
+  splitScheduleByMonth(legacySchedule).forEach((shard, monthKey) => {
+    // Shards written by this version win over the legacy copy
+    if (storedMonths.has(monthKey)) return;
+    entries.push([shiftMonthStorageKey(monthKey), shard]);
+    storedMonths.add(monthKey);
+  });
+  entries.push([SHIFT_MONTH_INDEX_KEY, [...storedMonths].sort()], [LEGACY_SHIFT_KEY, undefined]);
+  await backend.writeBatch(entries);
+};
+
+// Creates the shard store. Reads go straight to the backend; writes are handed to `write(key, value)`
+// (value undefined removes the key) so they can go through the write-behind store. A written shard only
+// counts as stored once confirmWrites() reports it, so a month whose write failed is written again.
+export const createShiftMonthStore = async ({ backend, write }) => {
+  await migrateLegacyShiftStorage(backend);
+
+  const storedMonths = new Set((await backend.read(SHIFT_MONTH_INDEX_KEY)) || []);
+  // monthKey -> shard as last read or written; null when storage must be overwritten on the next sync
+  const loadedShards = new Map();
+  // monthKey -> shard known to be in storage (read, or confirmed written); what sync compares against
+  const storedShards = new Map();
+  const loadingMonths = new Set();
+
+  // Loads the months that are not loaded yet and resolves with their dates as one flat schedule
+  const load = async (monthKeys) => {
+    const monthsToLoad = monthKeys.filter(monthKey => !loadedShards.has(monthKey) && !loadingMonths.has(monthKey));
+    monthsToLoad.forEach(monthKey => loadingMonths.add(monthKey));
+    const shards = await Promise.all(monthsToLoad.map(monthKey =>
+      (storedMonths.has(monthKey) ? backend.read(shiftMonthStorageKey(monthKey)) : undefined)));
+    const schedule = {};
+    monthsToLoad.forEach((monthKey, i) => {
+      loadingMonths.delete(monthKey);
+      const shard = shards[i] || {};
+      // A sync that ran while the month was loading already owns the stored shard
+      if (!loadedShards.has(monthKey)) {
+        loadedShards.set(monthKey, shard);
+        storedShards.set(monthKey, shard);
+      }
+      Object.assign(schedule, shard);
+    });
+    return schedule;
+  };
+
+  const isLoaded = (monthKey) => loadedShards.has(monthKey) || loadingMonths.has(monthKey);
+
+  const hasStoredMonths = () => storedMonths.size > 0;
+
+  const hasUnloadedMonths = () => [...storedMonths].some(monthKey => !loadedShards.has(monthKey));
+
+  // Writes the months of `schedule` that changed since the last sync. Loaded months missing from
+  // `schedule` are removed; months that were never loaded are left as stored.
+  const sync = (schedule) => {
+    const shards = splitScheduleByMonth(schedule);
+    const monthKeys = new Set([...loadedShards.keys(), ...shards.keys()]);
+    let indexChanged = false;
+    monthKeys.forEach(monthKey => {
+      const shard = shards.get(monthKey);
+      if (!shard) {
+        loadedShards.set(monthKey, {});
+        storedShards.set(monthKey, {});
+        if (storedMonths.delete(monthKey)) {
+          write(shiftMonthStorageKey(monthKey), undefined);
+          indexChanged = true;
+        }
+        return;
+      }
+      loadedShards.set(monthKey, shard);
+      if (isSameShard(shard, storedShards.get(monthKey))) return;
+      write(shiftMonthStorageKey(monthKey), shard);
+      if (!storedMonths.has(monthKey)) {
+        storedMonths.add(monthKey);
+        indexChanged = true;
+      }
+    });
+    if (indexChanged) {
+      write(SHIFT_MONTH_INDEX_KEY, [...storedMonths].sort());
+    }
+  };
+
+  // Records the [key, value] pairs of a successful write batch (the write-behind store's flush report)
+  const confirmWrites = (entries) => {
+    entries.forEach(([key, value]) => {
+      if (!key.startsWith(SHIFT_MONTH_KEY_PREFIX) || value === undefined) return;
+      storedShards.set(key.slice(SHIFT_MONTH_KEY_PREFIX.length), value);
+    });
+  };
+
+  // Makes the next sync treat `schedule` as the complete history (file load, clear all data)
+  const replaceAll = () => {
+    storedMonths.forEach(monthKey => {
+      loadedShards.set(monthKey, null);
+      storedShards.set(monthKey, null);
+    });
+  };
+
+  // Full history: stored months that are not loaded, overlaid with the in-memory schedule
+  const readAll = async (schedule) => {
+    const unloadedMonths = [...storedMonths].filter(monthKey => !loadedShards.has(monthKey));
+    const shards = await Promise.all(unloadedMonths.map(monthKey => backend.read(shiftMonthStorageKey(monthKey))));
+    return Object.assign({}, ...shards.map(shard => shard || {}), schedule);
+  };
+
+  // Shifts of the given months without keeping them in memory: loaded months are taken from `schedule`,
+  // the others are read from storage (used by exports that span many months)
+  const readMonths = async (monthKeys, schedule) => {
+    const wanted = new Set(monthKeys);
+    const unloadedMonths = monthKeys.filter(monthKey => storedMonths.has(monthKey) && !loadedShards.has(monthKey));
+    const shards = await Promise.all(unloadedMonths.map(monthKey => backend.read(shiftMonthStorageKey(monthKey))));
+    const result = Object.assign({}, ...shards.map(shard => shard || {}));
+    for (const dateKey in schedule) {
+      if (wanted.has(monthKeyOfDate(dateKey))) result[dateKey] = schedule[dateKey];
+    }
+    return result;
+  };
+
+  return { load, isLoaded, readMonths, hasStoredMonths, hasUnloadedMonths, sync, confirmWrites, replaceAll, readAll };
+};
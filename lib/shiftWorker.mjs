@@ -0,0 +1,34 @@
+// Dedicated worker that runs shift generation off the main thread.
+//
+// Messages in:  { type: 'generate', requestId, input }   (input as for generateSchedule;
+//               omit input.holidays to use the rule-based Japanese holiday calendar)
+//               { type: 'resolve', requestId, input }    (input as for resolveScheduleDays)
+// Messages out: { type: 'progress', requestId, phase, done, total }
+//               { type: 'result', requestId, schedule, stats }
+//               { type: 'error', requestId, message }
+// Cancellation is done by the client terminating the worker.
+import { generateSchedule, resolveScheduleDays } from './shiftScheduler.mjs';
+
+// Minimum interval between progress messages so the main thread is not flooded
+const PROGRESS_INTERVAL_MS = 50;
+
+self.onmessage = (event) => {
+  const { type, requestId, input } = event.data;
+  const run = { generate: generateSchedule, resolve: resolveScheduleDays }[type];
+  if (!run) return;
+
+  let lastProgressAt = 0;
+  const onProgress = ({ phase, done, total }) => {
+    const now = Date.now();
+    if (done < total && now - lastProgressAt < PROGRESS_INTERVAL_MS) return;
+    lastProgressAt = now;
+    self.postMessage({ type: 'progress', requestId, phase, done, total });
+  };
+
+  try {
+    const { schedule, stats } = run(input, { onProgress });
+    self.postMessage({ type: 'result', requestId, schedule, stats });
+  } catch (error) {
+    self.postMessage({ type: 'error', requestId, message: error?.message || String(error) });
+  }
+};
@@ -0,0 +1,129 @@
+// Promise-based client for shiftWorker.mjs.
+// Falls back to running on the main thread when module workers are not available.
+import { generateSchedule, resolveScheduleDays } from './shiftScheduler.mjs';
+
+const CANCELLED_ERROR_NAME = 'ShiftGenerationCancelledError';
+// Number of seeded results kept for repeated generate() calls with the same input
+const RESULT_CACHE_SIZE = 8;
+
+// True for the error a generate() promise rejects with after cancel()
+export const isShiftGenerationCancelled = (error) => error?.name === CANCELLED_ERROR_NAME;
+
+const createCancelledError = () => {
+  const error = new Error('Shift generation was cancelled');
+  error.name = CANCELLED_ERROR_NAME;
+  return error;
+};
+
+const spawnShiftWorker = () => {
+  if (typeof Worker === 'undefined') return null;
+  try {
+    return new Worker(new URL('./shiftWorker.mjs', import.meta.url), { type: 'module' });
+  } catch (error) {
+    console.warn('Shift worker could not be started, generating on the main thread:', error);
+    return null;
+  }
+};
+
+// Creates a client with generate(input, { onProgress }) -> Promise<{ schedule, stats }>,
+// resolve(input, { onProgress }) (the same for resolveScheduleDays), cancel() and dispose().
+// Only one request runs at a time; starting a new one cancels the previous.
+// Inputs with a seed are deterministic, so their results are cached by (input, seed) and returned without
+// running again; results where the solver ran out of time are not cached.
+export const createShiftWorkerClient = () => {
+  let worker = null;
+  let pending = null;
+  let nextRequestId = 1;
+  const resultCache = new Map();
+
+  const cacheResult = (cacheKey, result) => {
+    if (cacheKey === null || result.stats.solverTimedOut) return result;
+    resultCache.delete(cacheKey);
+    resultCache.set(cacheKey, result);
+    if (resultCache.size > RESULT_CACHE_SIZE) resultCache.delete(resultCache.keys().next().value);
+    return result;
+  };
+
+  const settle = () => {
+    const current = pending;
+    pending = null;
+    return current;
+  };
+
+  const handleMessage = (event) => {
+    const { type, requestId } = event.data;
+    if (!pending || pending.requestId !== requestId) return;
+    if (type === 'progress') {
+      const { phase, done, total } = event.data;
+      pending.onProgress({ phase, done, total });
+    } else if (type === 'result') {
+      settle().resolve({ schedule: event.data.schedule, stats: event.data.stats });
+    } else if (type === 'error') {
+      settle().reject(new Error(event.data.message));
+    }
+  };
+
+  const handleError = (event) => {
+    // A crashed worker cannot be reused
+    worker?.terminate();
+    worker = null;
+    settle()?.reject(new Error(event.message || 'Shift worker failed'));
+  };
+
+  const cancel = () => {
+    if (!pending) return;
+    // The worker is busy in a synchronous run, so the only way to stop it is to terminate it
+    worker?.terminate();
+    worker = null;
+    settle().reject(createCancelledError());
+  };
+
+  const run = (type, input, onProgress) => {
+    cancel();
+    // Re-solves carry the whole schedule and are not repeated with the same input, so only generations are cached
+    const cacheKey = type !== 'generate' || input.seed == null ? null : JSON.stringify(input);
+    if (cacheKey !== null && resultCache.has(cacheKey)) {
+      const result = resultCache.get(cacheKey);
+      resultCache.delete(cacheKey);
+      resultCache.set(cacheKey, result);
+      return Promise.resolve(result);
+    }
+
+    if (!worker) {
+      worker = spawnShiftWorker();
+      if (worker) {
+        worker.onmessage = handleMessage;
+        worker.onerror = handleError;
+      }
+    }
+
+    if (!worker) {
+      return new Promise((resolve, reject) => {
+        try {
+          const solve = type === 'resolve' ? resolveScheduleDays : generateSchedule;
+          resolve(cacheResult(cacheKey, solve(input, { onProgress })));
+        } catch (error) {
+          reject(error);
+        }
+      });
+    }
+
+    const requestId = nextRequestId++;
+    return new Promise((resolve, reject) => {
+      pending = { requestId, resolve: result => resolve(cacheResult(cacheKey, result)), reject, onProgress };
+      worker.postMessage({ type, requestId, input });
+    });
+  };
+
+  const generate = (input, { onProgress = () => {} } = {}) => run('generate', input, onProgress);
+  const resolve = (input, { onProgress = () => {} } = {}) => run('resolve', input, onProgress);
+
+  const dispose = () => {
+    cancel();
+    resultCache.clear();
+    worker?.terminate();
+    worker = null;
+  };
+
+  return { generate, resolve, cancel, dispose };
+};
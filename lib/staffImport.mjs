@@ -0,0 +1,250 @@
+// Bulk staff import from CSV or TSV rosters.
+//
+// The file is decoded and split into rows as it streams in, so a large roster never exists as one string.
+// The first row is a header; columns are recognised by name (Japanese or English) and unknown columns
+// are ignored:
+//   名前 / name          required
+//   ID / id              optional; a row whose ID is already registered is skipped
+//   タイプ / 種別 / type    固定 / 変動 / いつでも可 (or fixed / flexible / anytime); default 固定
+//   曜日 / weekdays       fixed staff only: the weekdays they work, e.g. 火木土 (月, the closing day, is
+//                         ignored and reported as a warning)
+//   遅番不可              marked (○, 1, true, はい, ...) when the staff member cannot take the late shift
+//   遅番 / late           可 / 不可 (or true / false), the opposite sense of 遅番不可
+//   特記事項 / comments    free text; "遅番不可" in it also marks the staff member as unable to work late
+// Rows are deduplicated against the existing staff and within the file by ID and by normalized name.
+import { CLOSED_WEEKDAY, DAYS_OF_WEEK } from './monthModel.mjs';
+
+const COLUMN_ALIASES = {
+  id: ['id', 'ｉｄ', 'スタッフid'],
+  name: ['名前', '氏名', 'スタッフ名', 'name'],
+  type: ['タイプ', '種別', 'type'],
+  weekdays: ['曜日', '出勤曜日', 'weekdays'],
+  lateShiftUnavailable: ['遅番不可'],
+  lateShift: ['遅番', '遅番可', 'late', 'canworklateshift'],
+  comments: ['特記事項', 'コメント', '備考', 'comments'],
+};
+
+const TYPE_ALIASES = {
+  fixed: ['固定', '固定シフト', 'fixed'],
+  flexible: ['変動', '変動シフト', 'flexible'],
+  anytime: ['いつでも可', 'いつでも', 'anytime'],
+};
+
+const TRUE_VALUES = new Set(['○', '◯', '〇', '✓', '✔', '1', 'true', 'yes', 'y', 'はい']);
+const FALSE_VALUES = new Set(['', '-', '0', 'false', 'no', 'n', 'いいえ']);
+
+// Name used for duplicate checks: width-normalized, trimmed, runs of whitespace collapsed to one space
+// ('山田　太郎' and '山田  太郎' match '山田 太郎', but '山田太郎' is a different name)
+export const normalizeStaffName = (name) => String(name ?? '').normalize('NFKC').trim().replace(/\s+/g, ' ');
+
+const normalizeCell = (cell) => cell.normalize('NFKC').trim().toLowerCase().replace(/\s+/g, '');
+
+// Creates a streaming parser for delimited text (RFC 4180 quoting). push(text) returns the rows completed by
+// that chunk, end() the last one. The delimiter is ',' or, if the first line contains a tab, '\t'.
+export const createDelimitedParser = () => {
+  let delimiter = null;
+  let row = [];
+  let cell = '';
+  let inQuotes = false;
+  // A '"' inside quotes that may be the first half of an escaped '""'
+  let pendingQuote = false;
+  let lastWasCarriageReturn = false;
+
+  const push = (text) => {
+    const rows = [];
+    if (delimiter === null) delimiter = text.split(/\r?\n/, 1)[0].includes('\t') ? '\t' : ',';
+    for (let i = 0; i < text.length; i++) {
+      const char = text[i];
+      if (pendingQuote) {
+        pendingQuote = false;
+        if (char === '"') {
+          cell += '"';
+          continue;
+        }
+        inQuotes = false;
+      }
+      if (inQuotes) {
+        if (char === '"') {
+          pendingQuote = true;
+        } else {
+          cell += char;
+        }
+        continue;
+      }
+      if (char === '\n' && lastWasCarriageReturn) {
+        lastWasCarriageReturn = false;
+        continue;
+      }
+      lastWasCarriageReturn = char === '\r';
+      if (char === '"' && cell === '') {
+        inQuotes = true;
+      } else if (char === delimiter) {
+        row.push(cell);
+        cell = '';
+      } else if (char === '\n' || char === '\r') {
+        row.push(cell);
+        rows.push(row);
+        row = [];
+        cell = '';
+      } else {
+        cell += char;
+      }
+    }
+    return rows;
+  };
+
+  const end = () => {
+    if (pendingQuote) inQuotes = false;
+    if (cell === '' && row.length === 0) return [];
+    row.push(cell);
+    const last = row;
+    row = [];
+    cell = '';
+    return [last];
+  };
+
+  return { push, end };
+};
+
+// Maps header cells to { field: column index }; throws when there is no name column
+const resolveColumns = (header) => {
+  const normalized = header.map(normalizeCell);
+  const columns = {};
+  Object.entries(COLUMN_ALIASES).forEach(([field, aliases]) => {
+    const index = normalized.findIndex(cell => aliases.includes(cell));
+    if (index !== -1) columns[field] = index;
+  });
+  if (columns.name === undefined) throw new Error('The roster has no 名前 (name) column');
+  return columns;
+};
+
+const parseType = (value) => {
+  const normalized = normalizeCell(value);
+  return Object.keys(TYPE_ALIASES).find(type => TYPE_ALIASES[type].includes(normalized)) ?? null;
+};
+
+// true / false for a checkbox-like cell, null when it is neither
+const parseFlag = (value) => {
+  const normalized = normalizeCell(value);
+  if (TRUE_VALUES.has(normalized)) return true;
+  if (FALSE_VALUES.has(normalized)) return false;
+  return null;
+};
+
+// Whether the late-shift cells of a row say the staff member cannot work late
+const isLateShiftUnavailable = (unavailableCell, lateShiftCell) => {
+  const unavailable = normalizeCell(unavailableCell);
+  const lateShift = normalizeCell(lateShiftCell);
+  return unavailable === '不可' || parseFlag(unavailable) === true ||
+    lateShift === '不可' || (lateShift !== '' && parseFlag(lateShift) === false);
+};
+
+// Converts one data row to { staff, warning? }, or returns { error } for a row that cannot be imported
+const rowToStaff = (row, columns, createId) => {
+  const cellOf = (field) => (columns[field] === undefined ? '' : (row[columns[field]] ?? '').trim());
+  const name = cellOf('name').normalize('NFKC').trim();
+  if (name === '') return { error: 'no name' };
+
+  const typeCell = cellOf('type');
+  const type = typeCell === '' ? 'fixed' : parseType(typeCell);
+  if (type === null) return { error: `unknown type ${typeCell}` };
+
+  const comments = cellOf('comments');
+  const canWorkLateShift = !comments.includes('遅番不可') &&
+    !isLateShiftUnavailable(cellOf('lateShiftUnavailable'), cellOf('lateShift'));
+
+  let availability = true;
+  let warning;
+  if (type === 'fixed') {
+    const weekdays = cellOf('weekdays');
+    const closedDay = DAYS_OF_WEEK[CLOSED_WEEKDAY];
+    // The closing day cannot be worked (the app does not let it be selected either)
+    if (weekdays.includes(closedDay)) warning = `${closedDay} is the closing day and was ignored`;
+    availability = Object.fromEntries(DAYS_OF_WEEK.map((day, weekday) =>
+      [day, weekday !== CLOSED_WEEKDAY && weekdays.includes(day)]));
+  } else if (type === 'flexible') {
+    availability = {};
+  }
+
+  return {
+    staff: {
+      id: cellOf('id') || createId(),
+      name,
+      type,
+      availability,
+      canWorkLateShift,
+      comments,
+    },
+    warning,
+  };
+};
+
+// Index of registered staff for duplicate checks, by ID and by normalized name
+export const createStaffIndex = (staff = []) => {
+  const ids = new Set();
+  const names = new Set();
+  const add = (member) => {
+    ids.add(member.id);
+    names.add(normalizeStaffName(member.name));
+  };
+  staff.forEach(add);
+  return {
+    has: (member) => ids.has(member.id) || names.has(normalizeStaffName(member.name)),
+    add,
+  };
+};
+
+// Returns `names` with `additions` merged in, sorted and without duplicates. Returns `names` itself when
+// nothing is new, so a state update with the result is a no-op.
+export const mergeStaffNames = (names, additions) => {
+  const known = new Set(names);
+  const newNames = [...new Set(additions)].filter(name => !known.has(name));
+  if (newNames.length === 0) return names;
+  return [...names, ...newNames].sort();
+};
+
+// Reads a CSV/TSV roster (Blob or File, UTF-8). Returns { added, skipped, warnings }: the new staff
+// members, [{ row, name, reason }] (row 1 is the header) for rows that were left out ('duplicate' or a
+// parse problem) and the same for imported rows with a problem that was corrected (e.g. the closing day
+// as a working day). Nothing is added to `existingStaff`; the caller commits `added` in one update.
+export const importStaffRoster = async (file, existingStaff, { createId = () => crypto.randomUUID() } = {}) => {
+  const index = createStaffIndex(existingStaff);
+  const parser = createDelimitedParser();
+  const added = [];
+  const skipped = [];
+  const warnings = [];
+  let columns = null;
+  let rowNumber = 0;
+
+  const handleRows = (rows) => {
+    rows.forEach(row => {
+      rowNumber++;
+      if (columns === null) {
+        columns = resolveColumns(row);
+        return;
+      }
+      if (row.every(cell => cell.trim() === '')) return;
+      const { staff, warning, error } = rowToStaff(row, columns, createId);
+      if (error) {
+        skipped.push({ row: rowNumber, name: row[columns.name] ?? '', reason: error });
+      } else if (index.has(staff)) {
+        skipped.push({ row: rowNumber, name: staff.name, reason: 'duplicate' });
+      } else {
+        index.add(staff);
+        added.push(staff);
+        if (warning) warnings.push({ row: rowNumber, name: staff.name, reason: warning });
+      }
+    });
+  };
+
+  const reader = file.stream().pipeThrough(new TextDecoderStream()).getReader();
+  for (;;) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    handleRows(parser.push(value));
+  }
+  handleRows(parser.end());
+  if (columns === null) throw new Error('The roster is empty');
+
+  return { added, skipped, warnings };
+};
@@ -0,0 +1,135 @@
+// Storage backends for app persistence.
+// A backend stores values by partition key ('staff', 'previousStaffNames', 'generatedShift:YYYY-MM', ...):
+//   read(key) -> Promise<value | undefined>
+//   writeBatch([[key, value | undefined], ...]) -> Promise; undefined removes the key
+// IndexedDB is the default; localStorage is the fallback when IndexedDB cannot be opened.
+
+import { SHIFT_MONTH_KEY_PREFIX } from './shiftStorage.mjs';
+
+const DB_NAME = 'shiftManagementApp';
+const DB_VERSION = 1;
+const MIGRATION_FLAG_KEY = 'migratedFromLocalStorage';
+const STAFF_STORE = 'staff';
+const SCHEDULE_STORE = 'schedules';
+const NAME_STORE = 'names';
+const META_STORE = 'meta';
+
+// Keys owned by the app in localStorage (copied to IndexedDB on first start)
+const isAppStorageKey = (key) =>
+  ['staff', 'previousStaffNames', 'pinnedShiftDates', 'generatedShift', 'generatedShiftMonths', 'shiftSeeds'].includes(key) ||
+  key.startsWith(SHIFT_MONTH_KEY_PREFIX);
+
+// Partition key -> [object store, key in that store]; each month of shifts is its own record
+const locate = (key) => {
+  if (key.startsWith(SHIFT_MONTH_KEY_PREFIX)) return [SCHEDULE_STORE, key.slice(SHIFT_MONTH_KEY_PREFIX.length)];
+  if (key === 'staff') return [STAFF_STORE, key];
+  if (key === 'previousStaffNames') return [NAME_STORE, key];
+  return [META_STORE, key];
+};
+
+// Synchronous localStorage wrapped in the async backend interface; `keyPrefix` separates apps on one origin
+export const createLocalStorageBackend = (storage = globalThis.localStorage, keyPrefix = '') => ({
+  name: 'localStorage',
+  read: async (key) => {
+    const json = storage.getItem(keyPrefix + key);
+    return json ? JSON.parse(json) : undefined;
+  },
+  writeBatch: async (entries) => {
+    let firstError = null;
+    entries.forEach(([key, value]) => {
+      try {
+        if (value === undefined) {
+          storage.removeItem(keyPrefix + key);
+        } else {
+          storage.setItem(keyPrefix + key, JSON.stringify(value));
+        }
+      } catch (error) {
+        firstError = firstError || error;
+      }
+    });
+    if (firstError) throw firstError;
+  },
+});
+
+const requestToPromise = (request) => new Promise((resolve, reject) => {
+  request.onsuccess = () => resolve(request.result);
+  request.onerror = () => reject(request.error);
+});
+
+const transactionToPromise = (transaction) => new Promise((resolve, reject) => {
+  transaction.oncomplete = () => resolve();
+  transaction.onerror = () => reject(transaction.error);
+  transaction.onabort = () => reject(transaction.error || new Error('IndexedDB transaction aborted'));
+});
+
+const openDatabase = (dbName) => new Promise((resolve, reject) => {
+  const request = indexedDB.open(dbName, DB_VERSION);
+  request.onupgradeneeded = () => {
+    const db = request.result;
+    [STAFF_STORE, SCHEDULE_STORE, NAME_STORE, META_STORE].forEach(storeName => {
+      if (!db.objectStoreNames.contains(storeName)) db.createObjectStore(storeName);
+    });
+  };
+  request.onsuccess = () => resolve(request.result);
+  request.onerror = () => reject(request.error);
+  request.onblocked = () => reject(new Error('IndexedDB open blocked'));
+});
+
+// IndexedDB backend; every flush is one readwrite transaction across the object stores it touches
+export const createIndexedDbBackend = async ({ dbName = DB_NAME } = {}) => {
+  const db = await openDatabase(dbName);
+
+  const writeBatch = (entries) => {
+    const storeNames = [...new Set(entries.map(([key]) => locate(key)[0]))];
+    const transaction = db.transaction(storeNames, 'readwrite');
+    entries.forEach(([key, value]) => {
+      const [storeName, storeKey] = locate(key);
+      const objectStore = transaction.objectStore(storeName);
+      if (value === undefined) {
+        objectStore.delete(storeKey);
+      } else {
+        objectStore.put(value, storeKey);
+      }
+    });
+    return transactionToPromise(transaction);
+  };
+
+  const read = (key) => {
+    const [storeName, storeKey] = locate(key);
+    return requestToPromise(db.transaction(storeName, 'readonly').objectStore(storeName).get(storeKey));
+  };
+
+  return { name: 'indexedDB', read, writeBatch };
+};
+
+// Copies the app's localStorage data into IndexedDB once, then frees localStorage.
+// The flag is written in the same transaction, so an interrupted migration is retried on the next start.
+const migrateFromLocalStorage = async (backend, storage) => {
+  if (await backend.read(MIGRATION_FLAG_KEY)) return;
+  const entries = [[MIGRATION_FLAG_KEY, true]];
+  for (let i = 0; i < storage.length; i++) {
+    const key = storage.key(i);
+    if (isAppStorageKey(key)) entries.push([key, JSON.parse(storage.getItem(key))]);
+  }
+  await backend.writeBatch(entries);
+  entries.slice(1).forEach(([key]) => storage.removeItem(key));
+};
+
+// Opens the preferred backend: IndexedDB when available, otherwise localStorage.
+// Other apps on the same origin pass their own dbName and keyPrefix and skip the localStorage migration.
+export const openStorageBackend = async ({ dbName = DB_NAME, keyPrefix = '', migrateLocalStorage = true } = {}) => {
+  const storage = globalThis.localStorage;
+  if (typeof indexedDB === 'undefined') {
+    return createLocalStorageBackend(storage, keyPrefix);
+  }
+  try {
+    const backend = await createIndexedDbBackend({ dbName });
+    if (storage && migrateLocalStorage) {
+      await migrateFromLocalStorage(backend, storage);
+    }
+    return backend;
+  } catch (error) {
+    console.warn('IndexedDB is unavailable; falling back to localStorage:', error);
+    return createLocalStorageBackend(storage, keyPrefix);
+  }
+};